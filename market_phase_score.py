@@ -12,9 +12,10 @@ from pathlib import Path
 import json
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
-import time
-from data_cache import get_cache
+import os
+from timing_terminal.providers.chartinspect import fetch_chartinspect_data as _fetch_cached
+from timing_terminal.providers.http_cache import ResponseCache
+from timing_terminal.scoring.rolling_rank import rolling_percentile_rank
 
 # Logging
 logging.basicConfig(
@@ -23,61 +24,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Same env flag as the pipeline (TT_HTTP_CACHE_DIR), defaulting to a local dir.
+_RESPONSE_CACHE = ResponseCache(Path(os.getenv("TT_HTTP_CACHE_DIR", ".cache/chartinspect")))
+
 # ============================================================
 # DATA FETCHING
 # ============================================================
 
 def fetch_chartinspect_data(url: str, metric_name: str) -> pd.DataFrame:
-    """Fetch data from ChartInspect API with caching."""
-    cache = get_cache()
-
-    # Check cache first
-    cached_data = cache.get_api_data(url, ttl_hours=24)
-    if cached_data is not None:
-        logger.info(f"Using cached data for {metric_name}")
-        if isinstance(cached_data, dict) and 'data' in cached_data:
-            df = pd.DataFrame(cached_data['data'])
-            # Try timestamp first, fall back to date string
-            try:
-                df['date'] = pd.to_datetime(df['date'], unit='ms')
-            except:
-                df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
-            df.sort_index(inplace=True)
-            return df
-
-    logger.info(f"Fetching {metric_name} from ChartInspect...")
-
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            # Cache the response
-            cache.set_api_data(url, data, data_type=f"chartinspect_{metric_name}", ttl_hours=24)
-
-            if 'data' in data and isinstance(data['data'], list):
-                df = pd.DataFrame(data['data'])
-                # Try timestamp first, fall back to date string
-                try:
-                    df['date'] = pd.to_datetime(df['date'], unit='ms')
-                except:
-                    df['date'] = pd.to_datetime(df['date'])
-                df.set_index('date', inplace=True)
-                df.sort_index(inplace=True)
-                logger.info(f"✓ Fetched {len(df)} records for {metric_name}")
-                return df
-            else:
-                raise ValueError(f"Unexpected data format from {url}")
-
-        except Exception as e:
-            logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-            else:
-                raise
+    """Fetch data from ChartInspect API with caching.
+
+    Shares the pipeline's conditional-request cache: responses younger than
+    24h are served from disk, older ones are revalidated (ETag /
+    Last-Modified) and a 304 reuses the stored, already-parsed arrays.
+    """
+    df = _fetch_cached(url, metric_name, cache=_RESPONSE_CACHE)
+    # Research charts work with naive (UTC) timestamps.
+    df = df.copy()
+    df.index = df.index.tz_convert(None)
+    return df
 
 # ============================================================
 # SMOOTHING FUNCTIONS
@@ -127,13 +92,13 @@ def savitzky_golay_smooth(series: pd.Series, window: int = 21, poly_order: int =
 # ============================================================
 
 def percentile_rank(series: pd.Series, window: int) -> pd.Series:
-    """Calculate rolling percentile rank (0-100)."""
-    def rank_pct(x):
-        if len(x) < 2 or pd.isna(x.iloc[-1]):
-            return np.nan
-        return (x < x.iloc[-1]).sum() / len(x) * 100
+    """Calculate rolling percentile rank (0-100).
 
-    return series.rolling(window=window, min_periods=window//2).apply(rank_pct, raw=False)
+    Uses the pipeline's sorted-window engine (O(n log w)); semantics match
+    the previous `rolling(...).apply(rank_pct)` implementation.
+    """
+    ranks = rolling_percentile_rank(series.to_numpy(dtype=float), window, window // 2)
+    return pd.Series(ranks, index=series.index)
 
 def market_phase_score(
     lth_sopr: pd.Series,
@@ -0,0 +1,119 @@
+"""Tests for the read-only aligned buffer and its memory-mapped snapshot."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal.providers import aligned
+from timing_terminal.providers.chartinspect import ChartInspectMarketDataProvider
+
+
+def _frames():
+    idx = pd.date_range("2024-01-01", periods=6, freq="D", tz="UTC", name="date")
+    sopr = pd.DataFrame({"lth_sopr": [1.0, 1.1, np.nan, 1.3, 1.4, 1.5]}, index=idx).iloc[::-1]
+    mvrv = pd.DataFrame(
+        {
+            "lth_mvrv": [2.0, 2.1, 2.2, 2.3, 2.4],
+            "btc_price": [40000.0, np.nan, 42000.0, 43000.0, 44000.0],
+        },
+        index=idx[:5],
+    )
+    return sopr, mvrv
+
+
+def _reference_aligned(sopr_df, mvrv_df):
+    """Previous DataFrame-based alignment, kept as the oracle."""
+
+    sopr_df, mvrv_df = sopr_df.sort_index(), mvrv_df.sort_index()
+    aligned = pd.DataFrame(
+        {"lth_sopr": sopr_df["lth_sopr"], "lth_mvrv": mvrv_df["lth_mvrv"].reindex(sopr_df.index)}
+    ).dropna()
+    aligned["btc_price"] = mvrv_df["btc_price"].reindex(aligned.index)
+    return aligned.dropna()
+
+
+def test_aligned_frame_matches_previous_alignment():
+    sopr, mvrv = _frames()
+    provider = ChartInspectMarketDataProvider(sopr, mvrv)
+
+    pd.testing.assert_frame_equal(provider.aligned_frame, _reference_aligned(sopr, mvrv))
+
+
+def test_aligned_frame_is_a_shared_read_only_view():
+    provider = ChartInspectMarketDataProvider(*_frames())
+
+    first, second = provider.aligned_frame, provider.aligned_frame
+
+    assert np.shares_memory(first["lth_sopr"].to_numpy(), second["lth_sopr"].to_numpy())
+    with pytest.raises(ValueError, match="read-only"):
+        first.iloc[0, 0] = 0.0
+
+
+def test_snapshot_round_trip_is_memory_mapped(tmp_path):
+    provider = ChartInspectMarketDataProvider(*_frames())
+    provider.save_snapshot(tmp_path / "aligned")
+
+    reopened = ChartInspectMarketDataProvider.from_snapshot(tmp_path / "aligned")
+
+    assert isinstance(reopened._buffer.values, np.memmap)
+    pd.testing.assert_frame_equal(reopened.aligned_frame, provider.aligned_frame)
+    np.testing.assert_array_equal(
+        reopened.get_btc_price_arrays().timestamp, provider.get_btc_price_arrays().timestamp
+    )
+
+
+def test_inconsistent_snapshot_raises(tmp_path):
+    provider = ChartInspectMarketDataProvider(*_frames())
+    provider.save_snapshot(tmp_path)
+    (index_path,) = tmp_path.glob("index.*.npy")
+    np.save(index_path, np.zeros(1, dtype="int64"))
+
+    with pytest.raises(ValueError):
+        ChartInspectMarketDataProvider.from_snapshot(tmp_path)
+
+
+def test_snapshot_is_published_as_a_whole(tmp_path, monkeypatch):
+    sopr, mvrv = _frames()
+    first = ChartInspectMarketDataProvider(sopr, mvrv)
+    second = ChartInspectMarketDataProvider(sopr * 2, mvrv * 2)  # same rows, other values
+    first.save_snapshot(tmp_path)
+
+    # A save that dies after writing its arrays but before publishing meta.json
+    # leaves the previous snapshot intact.
+    replace = Path.replace
+
+    def crash_on_meta(self, target):
+        if Path(target).name == "meta.json":
+            raise OSError("crashed before publishing")
+        return replace(self, target)
+
+    with monkeypatch.context() as m:
+        m.setattr(Path, "replace", crash_on_meta)
+        with pytest.raises(OSError):
+            second.save_snapshot(tmp_path)
+    pd.testing.assert_frame_equal(
+        ChartInspectMarketDataProvider.from_snapshot(tmp_path).aligned_frame, first.aligned_frame
+    )
+
+    second.save_snapshot(tmp_path)
+    pd.testing.assert_frame_equal(
+        ChartInspectMarketDataProvider.from_snapshot(tmp_path).aligned_frame, second.aligned_frame
+    )
+
+
+def test_snapshot_keeps_current_and_previous_arrays(tmp_path, monkeypatch):
+    provider = ChartInspectMarketDataProvider(*_frames())
+    for _ in range(3):
+        provider.save_snapshot(tmp_path)
+    assert len(list(tmp_path.glob("values.*.npy"))) == 2
+
+    # Arrays left by a writer that died before publishing are swept too.
+    provider.save_snapshot(tmp_path)
+    (tmp_path / "values.1.999999.1.npy").write_bytes(b"")
+    monkeypatch.setattr(aligned, "writer_alive", lambda pid: pid != 999999)
+    provider.save_snapshot(tmp_path)
+
+    assert len(list(tmp_path.glob("values.*.npy"))) == 2
+    assert len(list(tmp_path.glob("index.*.npy"))) == 2
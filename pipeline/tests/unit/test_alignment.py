@@ -0,0 +1,125 @@
+"""Tests for the sorted-merge alignment engine and its gap policies."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal.providers.alignment import (
+    AlignmentConfig,
+    GapPolicy,
+    align_columns,
+    last_at_or_before,
+)
+from timing_terminal.providers.chartinspect import ChartInspectMarketDataProvider
+
+
+def _legacy_aligned(sopr_df: pd.DataFrame, mvrv_df: pd.DataFrame) -> pd.DataFrame:
+    """The previous reindex-onto-SOPR + dropna alignment."""
+
+    sopr = sopr_df["lth_sopr"].sort_index()
+    return pd.DataFrame(
+        {
+            "lth_sopr": sopr,
+            "lth_mvrv": mvrv_df["lth_mvrv"].reindex(sopr.index),
+            "btc_price": mvrv_df["btc_price"].reindex(sopr.index),
+        }
+    ).dropna()
+
+
+def _frames(seed: int = 0, n: int = 200):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2023-01-01", periods=n, freq="D", tz="UTC", name="date")
+    sopr = pd.DataFrame({"lth_sopr": rng.normal(1, 0.1, n)}, index=idx)
+    sopr.iloc[rng.choice(n, 10, replace=False), 0] = np.nan
+    sopr = sopr.drop(idx[rng.choice(n, 10, replace=False)]).sample(frac=1, random_state=seed)
+    # MVRV lags SOPR by two days and has its own holes.
+    keep = np.sort(rng.choice(n - 2, n - 20, replace=False))
+    mvrv = pd.DataFrame(
+        {"lth_mvrv": rng.normal(2, 0.3, n - 20), "btc_price": rng.uniform(1e4, 6e4, n - 20)}, index=idx[keep]
+    )
+    mvrv.iloc[:5, 1] = np.nan
+    return sopr, mvrv
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_default_policy_reproduces_legacy_alignment(seed):
+    sopr, mvrv = _frames(seed)
+
+    provider = ChartInspectMarketDataProvider(sopr, mvrv)
+
+    expected = _legacy_aligned(sopr, mvrv)
+    pd.testing.assert_frame_equal(provider.aligned_frame, expected, check_freq=False)
+    report = provider.alignment_report
+    assert report.rows == len(expected) and report.dropped > 0
+    assert report.metrics["lth_mvrv"].tail_lag_days == 2.0
+
+
+def test_ffill_keeps_days_where_a_metric_lags():
+    idx = pd.date_range("2024-01-01", periods=5, freq="D", tz="UTC")
+    columns = {
+        "lth_sopr": pd.Series([1.0, 1.1, 1.2, 1.3, 1.4], index=idx),
+        "lth_mvrv": pd.Series([2.0, 2.2], index=idx[[0, 2]]),
+    }
+
+    index, aligned, report = align_columns(columns, AlignmentConfig(policies={"lth_mvrv": GapPolicy.parse("ffill:1")}))
+
+    assert list(index) == list(idx[:4])
+    np.testing.assert_array_equal(aligned["lth_mvrv"], [2.0, 2.0, 2.2, 2.2])
+    gaps = report.metrics["lth_mvrv"]
+    assert (gaps.exact, gaps.filled, gaps.missing, gaps.max_fill_days) == (2, 2, 1, 1.0)
+    assert report.dropped == 1
+
+
+def test_asof_uses_latest_observation_within_tolerance():
+    grid = pd.date_range("2024-01-01", periods=4, freq="D", tz="UTC")
+    # Observations land at 06:00, i.e. never exactly on the daily grid.
+    offset = grid - pd.Timedelta(hours=18)
+    columns = {
+        "lth_sopr": pd.Series([1.0, 1.1, 1.2, 1.3], index=grid),
+        "lth_mvrv": pd.Series([2.0, 2.1, 2.3], index=offset[[0, 1, 3]]),
+    }
+
+    drop_index, _, _ = align_columns(columns)
+    index, aligned, report = align_columns(
+        columns, AlignmentConfig(policies={"lth_mvrv": GapPolicy.parse("asof:1")})
+    )
+
+    assert len(drop_index) == 0
+    assert list(index) == list(grid[[0, 1, 3]])  # day 3's latest value is 1.75 days old
+    np.testing.assert_array_equal(aligned["lth_mvrv"], [2.0, 2.1, 2.3])
+    assert report.metrics["lth_mvrv"].max_fill_days == 0.75
+
+
+def test_union_grid_merges_all_timestamps():
+    idx = pd.date_range("2024-01-01", periods=4, freq="D", tz="UTC")
+    columns = {
+        "lth_sopr": pd.Series([1.0, 1.2], index=idx[[0, 2]]),
+        "lth_mvrv": pd.Series([2.0, 2.1, 2.3], index=idx[[0, 1, 3]]),
+    }
+
+    index, aligned, report = align_columns(columns, AlignmentConfig(grid="union", default=GapPolicy("asof")))
+
+    assert list(index) == list(idx)
+    np.testing.assert_array_equal(aligned["lth_sopr"], [1.0, 1.0, 1.2, 1.2])
+    np.testing.assert_array_equal(aligned["lth_mvrv"], [2.0, 2.1, 2.1, 2.3])
+    assert report.grid_rows == 4
+
+
+def test_last_at_or_before_matches_searchsorted():
+    rng = np.random.default_rng(3)
+    source = np.sort(rng.integers(0, 1000, 300))
+    grid = np.sort(rng.integers(-50, 1050, 400))
+
+    expected = np.searchsorted(source, grid, side="right") - 1
+    np.testing.assert_array_equal(last_at_or_before(source, grid), expected)
+
+
+@pytest.mark.parametrize("spec", ["ffill", "bogus", "asof:-1", "ffill:x"])
+def test_invalid_policies_are_rejected(spec):
+    with pytest.raises(ValueError):
+        GapPolicy.parse(spec)
+
+
+def test_unknown_grid_is_rejected():
+    with pytest.raises(ValueError, match="grid"):
+        align_columns({"lth_sopr": pd.Series(dtype="float64")}, AlignmentConfig(grid="lth_mvrv"))
@@ -0,0 +1,126 @@
+"""Tests for ChartInspect fetching (concurrency, response cache) against a local HTTP stand-in."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from timing_terminal.providers.chartinspect import (
+    METRIC_PATHS,
+    ChartInspectMarketDataProvider,
+    fetch_chartinspect_data,
+    fetch_chartinspect_metrics,
+)
+from timing_terminal.providers.alignment import AlignmentConfig
+from timing_terminal.providers.http_cache import ResponseCache
+from timing_terminal.providers.standin import ChartInspectStandIn, FaultConfig, synthetic_payloads
+
+DELAY = 0.3
+SOPR_PATH = METRIC_PATHS["LTH-SOPR"]
+MVRV_PATH = METRIC_PATHS["LTH-MVRV"]
+
+
+@pytest.fixture
+def standin():
+    with ChartInspectStandIn(synthetic_payloads(5), FaultConfig(latency=DELAY)) as server:
+        yield server
+
+
+@pytest.fixture
+def base_url(standin):
+    return standin.base_url
+
+
+def test_metrics_are_fetched_concurrently(standin, base_url):
+    urls = {"sopr": f"{base_url}{SOPR_PATH}", "mvrv": f"{base_url}{MVRV_PATH}"}
+
+    frames = fetch_chartinspect_metrics(urls)
+
+    assert set(frames) == {"sopr", "mvrv"}
+    assert len(frames["sopr"]) == 5 and "lth_mvrv" in frames["mvrv"].columns
+    # Both requests were in flight at once: each started before the other finished.
+    first, second = standin.requests
+    assert max(first.started, second.started) < min(first.finished, second.finished)
+
+
+def test_from_config_uses_base_url(base_url, monkeypatch):
+    monkeypatch.setenv("TT_CHARTINSPECT_BASE_URL", base_url)
+
+    provider = ChartInspectMarketDataProvider.from_config()
+
+    frame = provider.aligned_frame
+    assert list(frame.columns) == ["lth_sopr", "lth_mvrv", "btc_price"]
+    assert len(frame) == 5
+
+
+def test_fresh_snapshot_is_reused_without_fetching(standin, base_url, tmp_path):
+    snapshot = tmp_path / "aligned"
+
+    first = ChartInspectMarketDataProvider.from_config(snapshot=snapshot, snapshot_ttl=3600, base_url=base_url)
+    second = ChartInspectMarketDataProvider.from_config(snapshot=snapshot, snapshot_ttl=3600, base_url=base_url)
+
+    assert len(standin.requests) == 2
+    pd.testing.assert_frame_equal(second.aligned_frame, first.aligned_frame)
+
+    # Without a TTL, or for other alignment settings, it is rebuilt.
+    ChartInspectMarketDataProvider.from_config(snapshot=snapshot, base_url=base_url)
+    ChartInspectMarketDataProvider.from_config(
+        snapshot=snapshot, snapshot_ttl=3600, alignment=AlignmentConfig(grid="union"), base_url=base_url
+    )
+    assert len(standin.requests) == 6
+
+
+def test_failed_metric_raises(base_url):
+    with pytest.raises(RuntimeError, match="missing"):
+        fetch_chartinspect_metrics({"missing": f"{base_url}/nope"}, max_retries=1)
+
+
+def test_cache_serves_fresh_entries_without_network(standin, base_url, tmp_path):
+    cache = ResponseCache(tmp_path)
+    url = f"{base_url}{SOPR_PATH}"
+
+    first = fetch_chartinspect_data(url, "LTH-SOPR", cache=cache)
+    second = fetch_chartinspect_data(url, "LTH-SOPR", cache=cache)
+
+    assert len(standin.requests) == 1
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+
+def test_stale_entry_is_revalidated_with_etag(standin, base_url, tmp_path):
+    cache = ResponseCache(tmp_path, ttl_seconds=0)
+    url = f"{base_url}{MVRV_PATH}"
+    etag = standin.etag(standin.payloads[MVRV_PATH])
+
+    first = fetch_chartinspect_data(url, "LTH-MVRV", cache=cache)
+    second = fetch_chartinspect_data(url, "LTH-MVRV", cache=cache)
+
+    assert [(r.if_none_match, r.status) for r in standin.requests] == [(None, 200), (etag, 304)]
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert cache.load(url).etag == etag
+
+
+def test_cache_entries_of_another_version_are_misses(base_url, tmp_path):
+    cache = ResponseCache(tmp_path)
+    url = f"{base_url}{SOPR_PATH}"
+    fetch_chartinspect_data(url, "LTH-SOPR", cache=cache)
+    (meta_path,) = tmp_path.glob("*.json")
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta_path.write_text(json.dumps({**meta, "version": 1}), encoding="utf-8")
+
+    assert cache.load(url) is None
+
+
+@pytest.mark.parametrize("torn", ["empty", "truncated"])
+def test_torn_cache_entry_is_refetched(standin, base_url, tmp_path, torn):
+    cache = ResponseCache(tmp_path)
+    url = f"{base_url}{SOPR_PATH}"
+    first = fetch_chartinspect_data(url, "LTH-SOPR", cache=cache)
+    (data_path,) = tmp_path.glob("*.npz")
+    data_path.write_bytes(b"" if torn == "empty" else data_path.read_bytes()[:100])
+
+    assert cache.load(url) is None
+    second = fetch_chartinspect_data(url, "LTH-SOPR", cache=cache)
+
+    assert len(standin.requests) == 2
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert cache.load(url) is not None
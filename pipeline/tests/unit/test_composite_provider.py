@@ -0,0 +1,171 @@
+"""Tests for the multi-source composite provider (hedging, failover, priority merge)."""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal import config
+from timing_terminal.providers.chartinspect import ChartInspectMarketDataProvider
+from timing_terminal.providers.composite import (
+    CompositeMarketDataProvider,
+    HedgePolicy,
+    LatencyTracker,
+    ProviderSource,
+)
+from timing_terminal.providers.http_cache import ResponseCache
+from timing_terminal.providers.retry import CircuitBreaker, FetchControl, RetryPolicy
+from timing_terminal.providers.series_store import RawSeriesStore
+from timing_terminal.providers.standin import ChartInspectStandIn, FaultConfig, synthetic_payloads
+
+FAST_HEDGE = HedgePolicy(default_delay=0.1, min_delay=0.0)
+
+
+def _provider(start: str, periods: int, offset: float) -> ChartInspectMarketDataProvider:
+    idx = pd.date_range(start, periods=periods, freq="D", tz="UTC", name="date")
+    sopr = pd.DataFrame({"lth_sopr": np.arange(periods) + offset}, index=idx)
+    mvrv = pd.DataFrame(
+        {"lth_mvrv": np.arange(periods) + offset + 0.5, "btc_price": np.arange(periods) + offset + 100},
+        index=idx,
+    )
+    return ChartInspectMarketDataProvider(sopr, mvrv)
+
+
+def _slow(provider, seconds):
+    def factory():
+        time.sleep(seconds)
+        return provider
+
+    return factory
+
+
+def test_priority_merge_prefers_earlier_sources():
+    live = _provider("2024-01-03", 3, offset=10.0)  # Jan 3-5
+    snapshot = _provider("2024-01-01", 4, offset=0.0)  # Jan 1-4
+
+    composite = CompositeMarketDataProvider([("live", live), ("snapshot", snapshot)])
+
+    aligned = composite.aligned_frame
+    assert list(aligned.index.day) == [1, 2, 3, 4, 5]
+    np.testing.assert_array_equal(aligned["lth_sopr"], [0.0, 1.0, 10.0, 11.0, 12.0])
+    assert str(aligned.index.tz) == "UTC"
+    btc = composite.get_btc_price_arrays()
+    np.testing.assert_array_equal(btc.value, [100.0, 101.0, 110.0, 111.0, 112.0])
+    assert composite.served_by["btc_price"] == {"live": 3, "snapshot": 2}
+    assert composite.served_by["aligned"] == {"live": 3, "snapshot": 2}
+    assert composite.get_lth_metric_series()[-1].value == 12.5
+
+
+def test_slow_source_is_hedged():
+    requests, builds = [], []
+    lock = threading.Lock()
+    control = FetchControl()
+
+    def request():
+        with lock:
+            requests.append(None)
+            first = len(requests) == 1
+        time.sleep(2.0 if first else 0.0)
+        return 3
+
+    def factory():
+        builds.append(None)
+        return _provider("2024-01-01", control.run(request), 0.0)
+
+    started = time.perf_counter()
+    composite = CompositeMarketDataProvider.gather(
+        [ProviderSource("live", factory, hedge=True, control=control)], deadline=5.0, policy=FAST_HEDGE
+    )
+
+    assert time.perf_counter() - started < 1.0
+    (outcome,) = composite.outcomes
+    assert (outcome.status, outcome.hedged, outcome.winner) == ("ok", True, "hedge")
+    assert (len(requests), len(builds)) == (2, 1)  # only the request was duplicated
+
+
+def test_hedging_needs_a_fetch_control():
+    with pytest.raises(ValueError, match="FetchControl"):
+        ProviderSource("live", lambda: _provider("2024-01-01", 3, 0.0), hedge=True)
+
+
+@pytest.mark.parametrize("error_rate", [0.0, 1.0])
+def test_abandoned_source_stops_retrying_and_writing(tmp_path, error_rate):
+    control = FetchControl()
+    cache, store = ResponseCache(tmp_path / "cache"), RawSeriesStore(tmp_path / "store")
+    breaker = CircuitBreaker(tmp_path / "breaker.json", failure_threshold=1)
+    retry = RetryPolicy(max_attempts=5, base_delay=0.0, max_delay=0.0, breaker=breaker, control=control)
+
+    with ChartInspectStandIn(synthetic_payloads(5), FaultConfig(latency=0.5, error_rate=error_rate)) as standin:
+
+        def factory():
+            return ChartInspectMarketDataProvider.from_config(
+                cache=cache, store=store, retry=retry, base_url=standin.base_url
+            )
+
+        with pytest.raises(RuntimeError, match="live: timeout"):
+            CompositeMarketDataProvider.gather([ProviderSource("live", factory, control=control)], deadline=0.2)
+        time.sleep(0.8)  # the abandoned requests get their responses meanwhile
+
+    assert len(standin.requests) == 2  # one per metric, never retried
+    assert not (tmp_path / "cache").exists() and not (tmp_path / "store").exists()
+    assert not breaker.path.exists()
+
+
+def test_deadline_fails_over_to_fallback():
+    sources = [
+        ProviderSource("live", _slow(_provider("2024-01-01", 3, 10.0), 5.0)),
+        ProviderSource("snapshot", lambda: _provider("2024-01-01", 2, 0.0)),
+    ]
+
+    started = time.perf_counter()
+    composite = CompositeMarketDataProvider.gather(sources, deadline=0.3)
+
+    assert time.perf_counter() - started < 1.0
+    assert [o.status for o in composite.outcomes] == ["timeout", "ok"]
+    assert composite.served_by["btc_price"] == {"snapshot": 2}
+
+
+def test_all_sources_failing_raises():
+    def broken():
+        raise ConnectionError("down")
+
+    with pytest.raises(RuntimeError, match="live: failed"):
+        CompositeMarketDataProvider.gather([ProviderSource("live", broken)], deadline=1.0)
+
+
+def test_latency_tracker_percentile_and_persistence(tmp_path):
+    path = tmp_path / "latency.json"
+    tracker = LatencyTracker(path, window=4)
+    policy = HedgePolicy(percentile=50.0, min_samples=3, default_delay=7.0, min_delay=0.0)
+
+    assert tracker.hedge_delay("live", policy) == 7.0
+    for seconds in (9.0, 1.0, 2.0, 3.0, 4.0):
+        tracker.record("live", seconds)
+    tracker.save()
+
+    reloaded = LatencyTracker(path, window=4)
+    assert reloaded.samples("live") == [1.0, 2.0, 3.0, 4.0]
+    assert reloaded.hedge_delay("live", policy) == 2.5
+
+
+def test_config_falls_back_to_snapshot_when_chartinspect_fails(tmp_path, monkeypatch):
+    snapshot = tmp_path / "aligned"
+    _provider("2024-01-01", 4, 0.0).save_snapshot(snapshot)
+
+    with ChartInspectStandIn(synthetic_payloads(5), FaultConfig(error_rate=1.0)) as standin:
+        monkeypatch.setenv("TT_PIPELINE_MODE", "provider")
+        monkeypatch.setenv("TT_CHARTINSPECT_MODE", "live")
+        monkeypatch.setenv("TT_CHARTINSPECT_BASE_URL", standin.base_url)
+        monkeypatch.setenv("TT_ALIGNED_SNAPSHOT_DIR", str(snapshot))
+        monkeypatch.setenv("TT_PROVIDER_DEADLINE_S", "0.5")
+
+        started = time.perf_counter()
+        provider = config.get_market_data_provider()
+        elapsed = time.perf_counter() - started
+
+    assert isinstance(provider, CompositeMarketDataProvider)
+    assert elapsed < 1.5
+    assert [(o.name, o.status) for o in provider.outcomes] == [("chartinspect", "timeout"), ("snapshot", "ok")]
+    assert len(provider.aligned_frame) == 4
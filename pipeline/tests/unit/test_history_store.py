@@ -0,0 +1,448 @@
+"""Tests for the segmented columnar LSD history store."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal import history
+from timing_terminal.history import (
+    HistoryConfig,
+    open_lsd_history,
+    recover_lsd_history,
+    store_lsd_history,
+    update_lsd_history,
+)
+from timing_terminal.history_store import (
+    ColumnarHistoryStore,
+    HistoryColumns,
+    HistoryLock,
+    HistoryReader,
+    HistoryWAL,
+    Rollup,
+    import_csv_history,
+    main,
+    open_history,
+    period_start,
+)
+from timing_terminal.models import PhaseFrame
+
+
+def _frame(start: str, periods: int, offset: float = 0.0) -> PhaseFrame:
+    ts = pd.date_range(start, periods=periods, freq="D", tz="UTC").as_unit("s").asi8
+    values = np.arange(periods, dtype="float64") + offset
+    return PhaseFrame.from_columns(timestamp=ts, btc_price=values * 100.0, phase_score=values)
+
+
+def _rows(start: str, periods: int, offset: float = 0.0) -> HistoryColumns:
+    frame = _frame(start, periods, offset)
+    return HistoryColumns(frame.timestamp, frame.phase_score, frame.btc_price, np.zeros(periods, dtype=bool))
+
+
+def _configs(tmp_path):
+    csv = HistoryConfig(path=tmp_path / "csv" / "history.csv")
+    columnar = HistoryConfig(path=tmp_path / "none.csv", backend="columnar", store_dir=tmp_path / "store")
+    return csv, columnar
+
+
+def _read(config: HistoryConfig) -> pd.DataFrame:
+    if config.backend == "columnar":
+        return ColumnarHistoryStore(config.store_dir).read().to_frame()
+    frame = pd.read_csv(config.path)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+    return frame
+
+
+def test_columnar_backend_matches_csv_backend(tmp_path):
+    csv, columnar = _configs(tmp_path)
+    batches = [
+        (_frame("2022-12-01", 60), None),
+        (_frame("2023-01-15", 30, offset=0.5), None),  # overlaps: newer values win
+        (_frame("2023-02-10", 5, offset=7.0), int(pd.Timestamp("2023-02-13", tz="UTC").timestamp())),
+    ]
+
+    for frame, provisional_since in batches:
+        expected = update_lsd_history(frame, config=csv, provisional_since=provisional_since)
+        result = update_lsd_history(frame, config=columnar, provisional_since=provisional_since)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    assert result["provisional"].sum() == 2
+
+    # Real values for the nowcast days clear the flag in both backends.
+    real = _frame("2023-02-13", 2, offset=9.0)
+    result = update_lsd_history(real, config=columnar)
+    assert list(result.columns) == ["timestamp", "lsd", "btc_price"]
+    pd.testing.assert_frame_equal(result, update_lsd_history(real, config=csv), check_dtype=False)
+
+
+def test_upsert_rewrites_only_touched_segments(tmp_path):
+    _, config = _configs(tmp_path)
+    update_lsd_history(_frame("2021-06-01", 800), config=config)
+    store = ColumnarHistoryStore(config.store_dir)
+    before = {entry["key"]: entry["dir"] for entry in store.manifest()["segments"]}
+    assert sorted(before) == [2021, 2022, 2023]
+
+    update_lsd_history(_frame("2023-08-09", 3, offset=1000.0), config=config)
+
+    after = {entry["key"]: entry["dir"] for entry in store.manifest()["segments"]}
+    assert after[2021] == before[2021] and after[2022] == before[2022]
+    assert after[2023] != before[2023]
+    retired = {Path(d).name for r in store.manifest()["retired"] for d in r["dirs"] if d.startswith("segments/")}
+    assert retired == {before[2023]}
+    assert sorted(p.name for p in store.segments_dir.iterdir()) == sorted({*after.values(), *retired})
+    assert len(store.read()) == 800 + 2  # 2023-08-09 was the last stored day
+
+
+def test_csv_is_imported_on_first_use(tmp_path, capsys):
+    csv, _ = _configs(tmp_path)
+    update_lsd_history(_frame("2020-01-01", 400), config=csv)
+    columnar = HistoryConfig(path=csv.path, backend="columnar", store_dir=tmp_path / "store")
+
+    result = update_lsd_history(_frame("2021-02-03", 2, offset=0.25), config=columnar)
+
+    assert len(result) == 401
+    assert result["timestamp"].iloc[0] == pd.Timestamp("2020-01-01", tz="UTC")
+
+    main(["import", str(csv.path), str(tmp_path / "cli_store")])
+    assert "400 rows in 2 segments" in capsys.readouterr().out
+
+
+def test_import_rejects_non_history_csv(tmp_path):
+    path = tmp_path / "other.csv"
+    pd.DataFrame({"timestamp": ["2024-01-01"], "price": [1.0]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="lsd"):
+        import_csv_history(path, tmp_path / "store")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="backend"):
+        HistoryConfig(backend="parquet")
+
+
+@pytest.mark.parametrize("backend", ["csv", "columnar"])
+def test_interrupted_update_is_replayed_from_wal(tmp_path, monkeypatch, backend):
+    config = HistoryConfig(path=tmp_path / "history.csv", backend=backend, store_dir=tmp_path / "store")
+    update_lsd_history(_frame("2024-01-01", 30), config=config)
+    published = update_lsd_history(PhaseFrame.empty(), config=config)
+
+    def crash(rows, config):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(history, "_apply_history", crash)
+        with pytest.raises(KeyboardInterrupt):
+            update_lsd_history(_frame("2024-01-30", 3, offset=50.0), config=config)
+
+    # The published history is untouched; the batch waits in the WAL.
+    pd.testing.assert_frame_equal(_read(config), published, check_dtype=False)
+    assert len(list(config.wal_dir.glob("*.wal"))) == 1
+
+    assert recover_lsd_history(config) == 1
+    assert list(config.wal_dir.glob("*.wal")) == []
+    recovered = _read(config)
+    assert len(recovered) == 32
+    assert recovered["lsd"].iloc[-1] == 52.0
+
+
+def test_batch_is_logged_before_recovery_can_fail(tmp_path, monkeypatch):
+    config = HistoryConfig(path=tmp_path / "history.csv")
+
+    def locked_out(config=None):
+        raise TimeoutError("history lock busy")
+
+    with monkeypatch.context() as m:
+        m.setattr(history, "recover_lsd_history", locked_out)
+        with pytest.raises(TimeoutError):
+            update_lsd_history(_frame("2024-01-01", 3), config=config)
+
+    assert not config.path.exists()
+    assert recover_lsd_history(config) == 1
+    assert len(_read(config)) == 3
+
+
+def test_wal_ignores_torn_tail(tmp_path):
+    wal = HistoryWAL(tmp_path / "history.wal")
+    rows = HistoryColumns(
+        np.array([1, 2], dtype="int64"), np.array([0.5, np.nan]), np.array([10.0, 20.0]), np.array([False, True])
+    )
+    wal.append(rows)
+    wal.append(rows)
+    data = wal.path.read_bytes()
+    wal.path.write_bytes(data[:-5])
+
+    records = wal.records()
+
+    assert len(records) == 1
+    np.testing.assert_array_equal(records[0].timestamp, rows.timestamp)
+    np.testing.assert_array_equal(records[0].lsd, rows.lsd)
+    np.testing.assert_array_equal(records[0].provisional, rows.provisional)
+
+
+def test_failed_csv_write_keeps_previous_file(tmp_path, monkeypatch):
+    config = HistoryConfig(path=tmp_path / "history.csv")
+    update_lsd_history(_frame("2024-01-01", 10), config=config)
+    before = config.path.read_bytes()
+
+    def torn_write(self, fh, **kwargs):
+        fh.write("timestamp,lsd,btc")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_csv", torn_write)
+    with pytest.raises(OSError):
+        update_lsd_history(_frame("2024-01-11", 1), config=config)
+
+    assert config.path.read_bytes() == before
+    assert not list(tmp_path.glob("*.tmp"))
+    assert len(list(config.wal_dir.glob("*.wal"))) == 1
+
+
+@pytest.mark.parametrize("backend", ["csv", "columnar"])
+def test_reader_range_matches_mask(tmp_path, backend):
+    config = HistoryConfig(path=tmp_path / "history.csv", backend=backend, store_dir=tmp_path / "store")
+    reader = store_lsd_history(_frame("2021-03-01", 1000), config=config)
+    full = update_lsd_history(PhaseFrame.empty(), config=config)
+    ts = full["timestamp"]
+
+    for start, end in [("2021-12-30", "2022-01-03"), ("2020-01-01", "2021-03-03"), ("2023-11-20", None), (None, None)]:
+        rows = reader.range(start, end)
+        mask = np.ones(len(full), dtype=bool)
+        if start is not None:
+            mask &= ts >= pd.Timestamp(start, tz="UTC")
+        if end is not None:
+            mask &= ts < pd.Timestamp(end, tz="UTC")
+        pd.testing.assert_frame_equal(rows.to_frame(), full[mask].reset_index(drop=True), check_dtype=False)
+
+    assert len(open_lsd_history(config).tail(10)) == 11
+    assert reader.query(max_points=50).resolution == "month"
+    assert len(reader.range("2030-01-01")) == 0
+
+
+def test_recent_window_is_a_view_of_one_segment(tmp_path):
+    _, config = _configs(tmp_path)
+    store_lsd_history(_frame("2022-01-01", 700), config=config)
+
+    window = open_lsd_history(config).tail(30)
+
+    assert len(window) == 31
+    assert isinstance(window.lsd, np.memmap)
+    assert window.lsd[-1] == 699.0
+
+
+def test_query_cli_prints_range(tmp_path, capsys):
+    _, config = _configs(tmp_path)
+    store_lsd_history(_frame("2024-01-01", 10), config=config)
+
+    main(["query", str(config.store_dir), "--start", "2024-01-08"])
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "timestamp,lsd,btc_price"
+    assert len(out) == 1 + 3
+
+    main(["query", str(config.store_dir), "--tail", "1"])
+    assert len(capsys.readouterr().out.splitlines()) == 1 + 2
+    assert len(open_history(tmp_path / "missing.csv")) == 0
+
+
+def test_rollups_are_maintained_incrementally(tmp_path):
+    _, config = _configs(tmp_path)
+    store_lsd_history(_frame("2021-11-01", 70), config=config)
+    gappy = _frame("2021-12-27", 10, offset=100.0)
+    gappy.phase_score[3] = np.nan
+    store_lsd_history(gappy, config=config)  # crosses a year, a week and a month
+    store_lsd_history(
+        _frame("2022-01-20", 5, offset=200.0),
+        config=config,
+        provisional_since=int(pd.Timestamp("2022-01-24", tz="UTC").timestamp()),
+    )
+
+    store = ColumnarHistoryStore(config.store_dir)
+    rows = store.read()
+    for resolution in ("week", "month"):
+        stored, rebuilt = store.load_rollup(resolution), Rollup.build(rows, resolution)
+        pd.testing.assert_frame_equal(stored.to_frame(), rebuilt.to_frame())
+    manifest = store.manifest()
+    live = {f"rollups/{entry['dir']}" for entry in manifest["rollups"].values()}
+    retired = {d for r in manifest["retired"] for d in r["dirs"] if d.startswith("rollups/")}
+    assert len(retired) == 4 and {f"rollups/{p.name}" for p in store.rollups_dir.iterdir()} == live | retired
+
+    frame = rows.to_frame().set_index("timestamp")
+    monthly = store.load_rollup("month").to_frame().set_index("period")
+    expected = frame["lsd"].groupby(frame.index.strftime("%Y-%m")).agg(["mean", "min", "max", "first", "last"])
+    np.testing.assert_allclose(monthly["lsd_mean"], expected["mean"])
+    np.testing.assert_allclose(monthly["lsd_min"], expected["min"])
+    np.testing.assert_allclose(monthly["lsd_open"], expected["first"])
+    assert monthly["provisional"].tolist() == [False, False, True]
+
+
+def test_weeks_start_on_monday():
+    ts = pd.date_range("2024-01-01", periods=14, freq="D", tz="UTC").as_unit("s").asi8  # a Monday
+    starts = pd.to_datetime(period_start(ts, "week"), unit="s", utc=True)
+
+    assert set(starts.day_name()) == {"Monday"}
+    assert starts.nunique() == 2
+
+
+@pytest.mark.parametrize(("max_points", "resolution"), [(None, "day"), (4000, "day"), (600, "week"), (200, "month")])
+def test_query_picks_finest_resolution_within_budget(tmp_path, max_points, resolution):
+    _, config = _configs(tmp_path)
+    store_lsd_history(_frame("2014-01-01", 3650), config=config)
+
+    result = open_lsd_history(config).query(max_points=max_points)
+
+    assert result.resolution == resolution
+    assert max_points is None or len(result) <= max_points
+    assert result.count.sum() == 3650
+
+    ranged = open_lsd_history(config).query("2020-03-15", "2021-01-01", max_points=12)
+    assert ranged.resolution == "month" and len(ranged) == 10
+
+
+_WRITER = """
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from timing_terminal.history import HistoryConfig, store_lsd_history
+from timing_terminal.models import PhaseFrame
+
+root, backend, i = Path(sys.argv[1]), sys.argv[2], int(sys.argv[3])
+config = HistoryConfig(path=root / "history.csv", backend=backend, store_dir=root / "store")
+for j in range(3):
+    ts = pd.date_range(f"2024-0{i + 1}-{j * 7 + 1:02d}", periods=5, freq="D", tz="UTC").as_unit("s").asi8
+    values = np.full(5, float(i))
+    store_lsd_history(PhaseFrame.from_columns(timestamp=ts, btc_price=values, phase_score=values), config=config)
+"""
+
+
+@pytest.mark.parametrize("backend", ["csv", "columnar"])
+def test_concurrent_writers_do_not_lose_rows(tmp_path, backend):
+    package_root = Path(__file__).resolve().parents[2]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(package_root), os.environ.get("PYTHONPATH", "")])}
+    command = [sys.executable, "-c", _WRITER, str(tmp_path), backend]
+    writers = [subprocess.Popen([*command, str(i)], env=env, stderr=subprocess.PIPE) for i in range(3)]
+    for proc in writers:
+        _, stderr = proc.communicate(timeout=120)
+        assert proc.returncode == 0, stderr.decode()
+
+    config = HistoryConfig(path=tmp_path / "history.csv", backend=backend, store_dir=tmp_path / "store")
+    assert len(open_lsd_history(config)) == 3 * 3 * 5
+    assert list(config.wal_dir.glob("*.wal")) == []
+
+
+def test_conflicting_upsert_retries_without_rereading_unchanged_segments(tmp_path):
+    store = ColumnarHistoryStore(tmp_path / "store")
+    store.upsert(_rows("2021-12-01", 60))
+    other = ColumnarHistoryStore(tmp_path / "store")
+
+    loads = []
+    load_segment, plan = store._load_segment, store._plan
+
+    def counting_load(entry, mmap=False):
+        if not mmap:  # mmap loads are the rollup pass reading the new segments
+            loads.append(entry["key"])
+        return load_segment(entry, mmap)
+
+    def plan_then_lose_race(manifest, new, cache, written):
+        planned = plan(manifest, new, cache, written)
+        if len(loads) == 2:  # first attempt: a concurrent writer touches 2021 only
+            other.upsert(_rows("2021-12-05", 1, offset=500.0))
+        return planned
+
+    store._load_segment, store._plan = counting_load, plan_then_lose_race
+    manifest = store.upsert(_rows("2021-12-30", 5, offset=100.0))
+
+    assert sorted(loads) == [2021, 2021, 2022]  # 2022 came from the first attempt's cache
+    assert manifest["generation"] == 3
+    rows = store.read().to_frame().set_index("timestamp")
+    assert rows.loc["2021-12-05", "lsd"] == 500.0 and rows.loc["2022-01-01", "lsd"] == 102.0
+    # The losing attempt's directories are gone; superseded ones are retained.
+    live = {f"segments/{entry['dir']}" for entry in manifest["segments"]}
+    retired = {d for r in manifest["retired"] for d in r["dirs"] if d.startswith("segments/")}
+    assert {f"segments/{p.name}" for p in store.segments_dir.iterdir()} == live | retired
+
+
+_COMMIT = """
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from timing_terminal.history_store import ColumnarHistoryStore, HistoryColumns
+
+ts = pd.date_range(sys.argv[2], periods=5, freq="D", tz="UTC").as_unit("s").asi8
+values = np.full(5, 999.0)
+ColumnarHistoryStore(Path(sys.argv[1])).upsert(HistoryColumns(ts, values, values, np.zeros(5, dtype=bool)))
+"""
+
+
+def test_open_reader_survives_commits_from_another_process(tmp_path):
+    package_root = Path(__file__).resolve().parents[2]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(package_root), os.environ.get("PYTHONPATH", "")])}
+    store = ColumnarHistoryStore(tmp_path / "store", retain_generations=2)
+    store.upsert(_rows("2024-01-01", 60))
+    reader = HistoryReader.open(store)
+    expected = store.read().take(slice(-30, None))
+
+    subprocess.run([sys.executable, "-c", _COMMIT, str(store.root), "2024-02-25"], env=env, check=True)
+
+    window = reader.tail(30)  # segments are loaded lazily, after the commit
+    np.testing.assert_array_equal(window.timestamp[-30:], expected.timestamp)
+    np.testing.assert_array_equal(window.lsd[-30:], expected.lsd)
+    assert reader.query(max_points=5).count.sum() == 60
+    assert open_lsd_history(HistoryConfig(backend="columnar", store_dir=store.root)).tail(1).lsd[0] == 999.0
+
+    # Superseded directories go once they fall out of the retention window.
+    first = {d for r in store.manifest()["retired"] for d in r["dirs"]}
+    store.upsert(_rows("2024-03-10", 1))
+    assert all((store.root / d).exists() for d in first)
+    store.upsert(_rows("2024-03-11", 1))
+    assert not any((store.root / d).exists() for d in first)
+
+
+def test_commit_sweeps_files_left_by_crashed_writers(tmp_path):
+    store = ColumnarHistoryStore(tmp_path / "store")
+    store.upsert(_rows("2024-01-01", 10))
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    orphans = [
+        store.segments_dir / f"2024.g2.deadbeef.{dead.stdout.strip()}.1.tmp",  # died while writing
+        store.segments_dir / "2024.g1.0badf00d",  # died between writing and committing
+        store.rollups_dir / "week.g1.0badf00d",
+    ]
+    planning = store.segments_dir / "2024.g3.c0ffee00"  # a live writer's next generation
+    for path in [*orphans, planning]:
+        path.mkdir()
+    (store.root / f"manifest.{dead.stdout.strip()}.1.tmp").write_text("{")
+    live_tmp = store.segments_dir / f"2024.g2.cafe0000.{os.getpid()}.1.tmp"
+    live_tmp.mkdir()
+
+    store.upsert(_rows("2024-01-11", 1))
+
+    assert not any(path.exists() for path in orphans)
+    assert planning.exists() and live_tmp.exists()
+    assert not list(store.root.glob("manifest.*.tmp"))
+    assert len(store.read()) == 11
+
+
+def test_live_writer_wal_is_not_replayed(tmp_path):
+    config = HistoryConfig(path=tmp_path / "history.csv")
+    wal = HistoryWAL.create(config.wal_dir)
+    wal.append(_rows("2024-01-01", 2))
+
+    assert recover_lsd_history(config) == 0
+    wal.close()
+    assert recover_lsd_history(config) == 1
+    assert len(pd.read_csv(config.path)) == 2
+
+
+def test_lock_times_out(tmp_path):
+    with HistoryLock(tmp_path / "h.lock"):
+        with pytest.raises(TimeoutError):
+            with HistoryLock(tmp_path / "h.lock", timeout=0.05):
+                pass
@@ -0,0 +1,95 @@
+"""Equivalence tests for incremental (append-only) LSD computation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal.scoring.incremental import IncrementalLSD, LSDParams, update_incremental_lsd
+from timing_terminal.scoring.lsd import compute_lsd
+
+
+def _inputs(n: int = 300) -> tuple[pd.Series, pd.Series]:
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2021-01-01", periods=n, freq="D", tz="UTC")
+    sopr = pd.Series(1.0 + rng.normal(0, 0.05, n).cumsum() / 5, index=idx)
+    mvrv = pd.Series(2.0 + rng.normal(0, 0.3, n).cumsum() / 3, index=idx)
+    return sopr, mvrv
+
+
+def _upsert(published: pd.Series, update: pd.Series) -> pd.Series:
+    if published.empty:
+        return update
+    return pd.concat([published[~published.index.isin(update.index)], update]).sort_index()
+
+
+def test_chunked_updates_match_batch():
+    sopr, mvrv = _inputs()
+    params = LSDParams(lookback_window=60)
+    batch = compute_lsd(sopr, mvrv, lookback_window=60)
+
+    engine = IncrementalLSD(params)
+    published = pd.Series(dtype="float64")
+    cuts = [0, 5, 30, 31, 32, 120, 121, 299, 300]
+    for start, end in zip(cuts, cuts[1:]):
+        # Round-trip state between chunks, as the CLI does across runs.
+        engine = IncrementalLSD.from_state(engine.to_state())
+        published = _upsert(published, engine.update(sopr.iloc[start:end], mvrv.iloc[start:end]))
+
+    assert published.index.equals(batch.index)
+    np.testing.assert_allclose(published.to_numpy(), batch.to_numpy(), rtol=0, atol=1e-9)
+
+
+def test_update_rejects_points_older_than_state():
+    sopr, mvrv = _inputs(50)
+    engine = IncrementalLSD(LSDParams(lookback_window=20))
+    engine.update(sopr, mvrv)
+
+    with pytest.raises(ValueError):
+        engine.update(sopr.iloc[-1:], mvrv.iloc[-1:])
+
+
+def test_update_incremental_lsd_persists_state(tmp_path):
+    sopr, mvrv = _inputs()
+    params = LSDParams(lookback_window=60)
+    state_path = tmp_path / "lsd_state.json"
+
+    first = update_incremental_lsd(sopr.iloc[:250], mvrv.iloc[:250], state_path, params)
+    assert state_path.exists()
+    assert len(first) == 250
+
+    # Feeding the full series again only processes the 50 new points and
+    # revises the previously edge-smoothed tail.
+    second = update_incremental_lsd(sopr, mvrv, state_path, params)
+    assert len(second) == 50 + 21 // 2
+
+    batch = compute_lsd(sopr, mvrv, lookback_window=60)
+    np.testing.assert_allclose(second.to_numpy(), batch.loc[second.index].to_numpy(), atol=1e-9)
+
+
+def test_update_incremental_lsd_rebuilds_on_param_change(tmp_path):
+    sopr, mvrv = _inputs()
+    state_path = tmp_path / "lsd_state.json"
+
+    update_incremental_lsd(sopr, mvrv, state_path, LSDParams(lookback_window=60))
+    rebuilt = update_incremental_lsd(sopr, mvrv, state_path, LSDParams(lookback_window=90))
+
+    assert len(rebuilt) == len(sopr)
+
+
+def test_update_incremental_lsd_rebuilds_when_history_is_behind_state(tmp_path):
+    sopr, mvrv = _inputs()
+    params = LSDParams(lookback_window=60)
+    state_path = tmp_path / "lsd_state.json"
+    published_through = int(sopr.index[199].timestamp())
+
+    # The state reached day 250, but the run died before publishing it.
+    update_incremental_lsd(sopr.iloc[:250], mvrv.iloc[:250], state_path, params)
+    caught_up = update_incremental_lsd(sopr, mvrv, state_path, params, published_through=published_through)
+
+    assert caught_up.index.equals(sopr.index)
+    batch = compute_lsd(sopr, mvrv, lookback_window=60)
+    np.testing.assert_allclose(caught_up.to_numpy(), batch.to_numpy(), atol=1e-9)
+
+    # A history that is current keeps the incremental path.
+    later = update_incremental_lsd(sopr, mvrv, state_path, params, published_through=int(sopr.index[-1].timestamp()))
+    assert later.empty
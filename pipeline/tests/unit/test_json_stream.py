@@ -0,0 +1,69 @@
+"""Tests for the streaming ChartInspect payload decoder."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal.providers.json_stream import parse_chartinspect_stream
+
+
+def _chunks(body: bytes, size: int):
+    return (body[i : i + size] for i in range(0, len(body), size))
+
+
+def _reference(body: bytes) -> pd.DataFrame:
+    """Previous `response.json()` + DataFrame path, kept as the oracle."""
+
+    df = pd.DataFrame(json.loads(body)["data"])
+    try:
+        df["date"] = pd.to_datetime(df["date"], unit="ms", utc=True)
+    except (ValueError, TypeError):
+        df["date"] = pd.to_datetime(df["date"], utc=True)
+    return df.set_index("date").sort_index()
+
+
+@pytest.mark.parametrize("chunk_size", [7, 100, 1 << 16])
+def test_matches_dataframe_path(chunk_size):
+    rows = [
+        {"date": 1_600_000_000_000 + i * 86_400_000, "lth_sopr": 1.0 + i / 100, "btc_price": 10000.0 + i}
+        for i in range(300)
+    ]
+    rows[5]["lth_sopr"] = None
+    del rows[9]["btc_price"]
+    rows[20]["sth_sopr"] = 0.9  # column first seen mid-stream
+    body = json.dumps({"meta": {"unit": ["x", "y"]}, "data": rows, "count": 300}).encode()
+
+    frame = parse_chartinspect_stream(_chunks(body, chunk_size)).to_frame()
+
+    pd.testing.assert_frame_equal(frame, _reference(body), check_freq=False)
+
+
+def test_string_dates_are_parsed_once_at_the_end():
+    rows = [{"date": f"2024-01-{d:02d}", "lth_mvrv": d} for d in (3, 1, 2)]
+    body = json.dumps({"data": rows}).encode()
+
+    parsed = parse_chartinspect_stream(_chunks(body, 5))
+
+    assert parsed.timestamps.dtype == np.int64
+    pd.testing.assert_frame_equal(parsed.to_frame(), _reference(body).astype("float64"), check_freq=False)
+
+
+def test_nested_records_fall_back_to_per_record_decoding():
+    rows = [{"date": 1_700_000_000_000 + i, "v": i, "tags": {"brace": "}]"}} for i in range(4)]
+    body = json.dumps({"data": rows}).encode()
+
+    parsed = parse_chartinspect_stream(_chunks(body, 16))
+
+    np.testing.assert_array_equal(parsed.columns["v"], [0.0, 1.0, 2.0, 3.0])
+    assert np.isnan(parsed.columns["tags"]).all()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b'{"error": "nope"}', b'{"data": {"a": 1}}', b'{"data": [{"date": 1, "v": 1.0}, {"da', b"[]"],
+)
+def test_malformed_payloads_raise(body):
+    with pytest.raises(ValueError):
+        parse_chartinspect_stream(_chunks(body, 4))
@@ -0,0 +1,38 @@
+"""Tests for multi-series LSD scoring in a process pool."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal.scoring.batch import compute_lsd_batch
+from timing_terminal.scoring.lsd import compute_lsd
+
+
+def _series(seed: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    sopr = 1.0 + rng.normal(0, 0.03, n).cumsum() / 3
+    mvrv = 3.5 + rng.normal(0, 0.2, n).cumsum() / 2
+    return sopr, mvrv
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_batch_rows_match_compute_lsd(max_workers):
+    pairs = [_series(1, 300), _series(2, 180), _series(3, 250)]
+    pairs[0][0][[40, 41]] = np.nan
+
+    result = compute_lsd_batch(pairs, max_workers=max_workers, lookback_window=90)
+
+    assert result.shape == (3, 300)
+    for row, (sopr, mvrv) in enumerate(pairs):
+        expected = compute_lsd(pd.Series(sopr), pd.Series(mvrv), lookback_window=90).to_numpy()
+        np.testing.assert_array_equal(result[row, : len(sopr)], expected)
+        assert np.isnan(result[row, len(sopr) :]).all()
+
+
+def test_batch_rejects_mismatched_pair():
+    with pytest.raises(ValueError):
+        compute_lsd_batch([(np.ones(10), np.ones(9))], max_workers=1)
+
+
+def test_batch_empty_input():
+    assert compute_lsd_batch([]).shape == (0, 0)
@@ -0,0 +1,80 @@
+"""Tests for the content-addressed LSD result cache."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from timing_terminal.scoring.cache import ArrayCache, cached_compute_lsd, cached_savitzky_golay_smooth
+from timing_terminal.scoring.lsd import compute_lsd
+
+
+def _inputs(n: int = 120) -> tuple[pd.Series, pd.Series]:
+    rng = np.random.default_rng(4)
+    idx = pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC")
+    return (
+        pd.Series(1.0 + rng.normal(0, 0.05, n), index=idx),
+        pd.Series(2.0 + rng.normal(0, 0.3, n), index=idx),
+    )
+
+
+def test_cached_compute_lsd_hits_on_identical_inputs(tmp_path):
+    sopr, mvrv = _inputs()
+    cache = ArrayCache(tmp_path)
+
+    first = cached_compute_lsd(sopr, mvrv, cache=cache, lookback_window=30)
+    second = cached_compute_lsd(sopr, mvrv, cache=cache, lookback_window=30)
+
+    assert cache.stats.as_dict() == {"hits": 1, "misses": 1, "evictions": 0}
+    pd.testing.assert_series_equal(first, second)
+    pd.testing.assert_series_equal(second, compute_lsd(sopr, mvrv, lookback_window=30))
+
+
+def test_cache_key_covers_inputs_and_params(tmp_path):
+    sopr, mvrv = _inputs()
+    cache = ArrayCache(tmp_path)
+
+    cached_compute_lsd(sopr, mvrv, cache=cache, lookback_window=30)
+    cached_compute_lsd(sopr, mvrv, cache=cache, lookback_window=31)
+    changed = sopr.copy()
+    changed.iloc[-1] += 1e-9
+    cached_compute_lsd(changed, mvrv, cache=cache, lookback_window=30)
+    cached_savitzky_golay_smooth(sopr * 50, cache=cache)
+
+    assert cache.stats.hits == 0
+    assert cache.stats.misses == 4
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    arr = np.arange(1000, dtype="float64")
+    entry_bytes = arr.nbytes + 128  # payload plus .npy header
+    cache = ArrayCache(tmp_path, max_bytes=2 * entry_bytes)
+
+    keys = [cache.make_key("test", [np.array([float(i)])], {}) for i in range(3)]
+    cache.put(keys[0], arr)
+    cache.put(keys[1], arr)
+    # Make entry 0 recently used and entry 1 stale, then overflow the cache.
+    os.utime(cache._path(keys[1]), (0, 0))
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], arr)
+
+    assert cache.stats.evictions == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_torn_entry_counts_as_miss_and_is_rewritten(tmp_path):
+    sopr, mvrv = _inputs()
+    cache = ArrayCache(tmp_path)
+    expected = cached_compute_lsd(sopr, mvrv, cache=cache, lookback_window=30)
+    (path,) = tmp_path.glob("*/*.npy")
+
+    for torn in (b"", path.read_bytes()[:40]):
+        path.write_bytes(torn)
+        result = cached_compute_lsd(sopr, mvrv, cache=cache, lookback_window=30)
+        pd.testing.assert_series_equal(result, expected)
+        assert np.load(path).shape == (len(sopr),)
+
+    assert cache.stats.as_dict() == {"hits": 0, "misses": 3, "evictions": 0}
+    assert not list(tmp_path.glob("*/*.tmp"))
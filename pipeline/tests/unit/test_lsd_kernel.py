@@ -0,0 +1,48 @@
+"""Tests for the fused two-series LSD kernel."""
+
+import numpy as np
+import pandas as pd
+
+from timing_terminal.scoring.kernel import LSDKernel
+from timing_terminal.scoring.lsd import _percentile_rank, _savitzky_golay_smooth, compute_lsd
+
+
+def _unfused_lsd(sopr: pd.Series, mvrv: pd.Series, lookback: int) -> pd.Series:
+    """Previous multi-pass composition, kept as the oracle."""
+
+    base_score = (_percentile_rank(mvrv, lookback) * 0.6) + (_percentile_rank(sopr, lookback) * 0.4)
+    score = base_score.copy()
+    capitulation_mask = sopr < 0.95
+    score[capitulation_mask] = score[capitulation_mask] * 0.5
+    euphoria_mask = mvrv > 4.0
+    score[euphoria_mask] = score[euphoria_mask] * 1.2
+    score = score.clip(0.0, 100.0)
+    return _savitzky_golay_smooth(score, window=21, poly_order=3)
+
+
+def test_compute_lsd_matches_unfused_composition():
+    rng = np.random.default_rng(21)
+    n = 400
+    idx = pd.date_range("2020-01-01", periods=n, freq="D", tz="UTC")
+    # Wander across both regime thresholds (SOPR < 0.95, MVRV > 4.0)
+    sopr = pd.Series(1.0 + rng.normal(0, 0.03, n).cumsum() / 3, index=idx)
+    mvrv = pd.Series(3.5 + rng.normal(0, 0.2, n).cumsum() / 2, index=idx)
+    sopr.iloc[[50, 51, 200]] = np.nan
+
+    result = compute_lsd(sopr, mvrv, lookback_window=90)
+    expected = _unfused_lsd(sopr, mvrv, 90)
+
+    assert (sopr < 0.95).any() and (mvrv > 4.0).any()
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_kernel_writes_into_preallocated_buffer():
+    sopr = np.linspace(0.9, 1.1, 50)
+    mvrv = np.linspace(1.0, 5.0, 50)
+    out = np.full(50, -1.0)
+
+    result = LSDKernel(lookback_window=10).run(sopr, mvrv, out=out)
+
+    assert result is out
+    assert np.isnan(out[:4]).all()
+    assert ((out[5:] >= 0.0) & (out[5:] <= 100.0)).all()
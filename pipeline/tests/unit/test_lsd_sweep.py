@@ -0,0 +1,53 @@
+"""Tests for the vectorized LSD parameter sweep."""
+
+import numpy as np
+import pandas as pd
+
+from timing_terminal.scoring.lsd import compute_lsd
+from timing_terminal.scoring.sweep import PARAM_COLUMNS, sweep_lsd
+
+
+def _inputs(n: int = 260) -> tuple[pd.Series, pd.Series]:
+    rng = np.random.default_rng(11)
+    idx = pd.date_range("2022-01-01", periods=n, freq="D", tz="UTC")
+    sopr = pd.Series(1.0 + rng.normal(0, 0.05, n).cumsum() / 4, index=idx)
+    mvrv = pd.Series(3.0 + rng.normal(0, 0.4, n).cumsum() / 3, index=idx)
+    return sopr, mvrv
+
+
+def test_sweep_rows_match_compute_lsd():
+    sopr, mvrv = _inputs()
+    result = sweep_lsd(
+        sopr,
+        mvrv,
+        lookback_windows=(40, 90),
+        weights=((0.6, 0.4), (0.5, 0.5)),
+        capitulation_thresholds=(0.95, 1.0),
+        euphoria_thresholds=(3.0, 4.0),
+    )
+
+    assert list(result.params.columns) == PARAM_COLUMNS
+    assert result.scores.shape == (16, len(sopr))
+    assert result.index.equals(sopr.index)
+
+    for row, params in result.params.iterrows():
+        expected = compute_lsd(
+            sopr,
+            mvrv,
+            lookback_window=int(params["lookback_window"]),
+            mvrv_weight=params["mvrv_weight"],
+            sopr_weight=params["sopr_weight"],
+            capitulation_threshold=params["capitulation_threshold"],
+            euphoria_threshold=params["euphoria_threshold"],
+        )
+        np.testing.assert_allclose(result.scores[row], expected.to_numpy(), rtol=0, atol=1e-9)
+
+
+def test_sweep_without_smoothing_returns_clipped_raw_scores():
+    sopr, mvrv = _inputs(80)
+    result = sweep_lsd(sopr, mvrv, lookback_windows=(20,), smooth=False, dtype="float32")
+
+    assert result.scores.dtype == np.float32
+    finite = result.scores[np.isfinite(result.scores)]
+    assert finite.min() >= 0.0 and finite.max() <= 100.0
+    assert result.series(0).index.equals(sopr.index)
@@ -1,6 +1,9 @@
 from datetime import datetime, timezone
 
-from timing_terminal.models import ChartData, TimeValue
+import numpy as np
+import pytest
+
+from timing_terminal.models import ZONE_CODES, ChartData, PhaseFrame, PhasePoint, TimeValue
 
 
 def test_chart_data_to_json_dict_structure():
@@ -26,4 +29,48 @@ def test_chart_data_to_json_dict_structure():
     assert payload["lsd"] == [{"time": ts, "value": 45.2}]
 
     assert payload["lastUpdated"] == "2025-12-05T08:15:00Z"
-    assert payload["dataQuality"] == "complete"
\ No newline at end of file
+    assert payload["dataQuality"] == "complete"
+
+
+def test_phase_frame_roundtrips_phase_points():
+    """PhaseFrame converts to/from PhasePoint lists without loss."""
+
+    points = [
+        PhasePoint(
+            timestamp=datetime(2024, 1, 1 + i, tzinfo=timezone.utc),
+            btc_price=40000.0 + i,
+            phase_score=10.0 * i,
+            zone=zone,
+        )
+        for i, zone in enumerate(["retention", "neutral", "distribution"])
+    ]
+
+    frame = PhaseFrame.from_points(points)
+
+    assert len(frame) == 3
+    assert frame.timestamp.dtype == np.int64
+    assert frame.zone_code.tolist() == [ZONE_CODES["retention"], ZONE_CODES["neutral"], ZONE_CODES["distribution"]]
+    assert frame.to_points() == points
+    assert frame.latest_timestamp() == datetime(2024, 1, 3, tzinfo=timezone.utc)
+    assert len(frame.take(frame.phase_score > 5.0)) == 2
+
+
+def test_phase_frame_rejects_mismatched_columns():
+    with pytest.raises(ValueError):
+        PhaseFrame.from_columns(np.array([1, 2], dtype="int64"), np.array([1.0]))
+
+
+def test_chart_data_emits_causal_series_only_when_present():
+    ts = int(datetime(2024, 1, 1).replace(tzinfo=timezone.utc).timestamp())
+    chart = ChartData(
+        btc_price=[TimeValue(time=ts, value=29000.5)],
+        lsd=[TimeValue(time=ts, value=45.2)],
+        last_updated=datetime(2025, 12, 5, tzinfo=timezone.utc),
+        data_quality="complete",
+        lsd_causal=[TimeValue(time=ts, value=44.0)],
+    )
+
+    payload = chart.to_json_dict()
+
+    assert payload["lsdCausal"] == [{"time": ts, "value": 44.0}]
+    assert list(payload) == ["btcPrice", "lsd", "lsdCausal", "lastUpdated", "dataQuality"]
@@ -0,0 +1,106 @@
+"""Tests for the lag-aware nowcast of a late-publishing metric."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal.history import HistoryConfig, update_lsd_history
+from timing_terminal.models import PhaseFrame
+from timing_terminal.providers.aligned import AlignedBuffer
+from timing_terminal.providers.alignment import AlignmentConfig, NowcastConfig
+from timing_terminal.providers.chartinspect import ChartInspectMarketDataProvider
+from timing_terminal.scoring.incremental import IncrementalLSD, update_incremental_lsd
+
+IDX = pd.date_range("2024-01-01", periods=10, freq="D", tz="UTC", name="date")
+
+
+def _lagging(lag: int):
+    sopr = pd.DataFrame({"lth_sopr": np.linspace(1.0, 1.9, 10)}, index=IDX)
+    mvrv = pd.DataFrame(
+        {"lth_mvrv": np.linspace(2.0, 2.9, 10), "btc_price": np.linspace(100.0, 190.0, 10)}, index=IDX
+    ).iloc[: 10 - lag]
+    return sopr, mvrv
+
+
+def test_default_alignment_drops_lagging_days():
+    provider = ChartInspectMarketDataProvider(*_lagging(2))
+
+    assert len(provider.aligned_frame) == 8
+    assert provider.provisional_since is None
+
+
+@pytest.mark.parametrize(
+    ("method", "expected_mvrv"),
+    [("ffill", [2.7, 2.7]), ("linear", [2.8, 2.9])],
+)
+def test_nowcast_fills_lagging_tail(method, expected_mvrv):
+    alignment = AlignmentConfig(nowcast=NowcastConfig(max_days=2, method=method))
+
+    provider = ChartInspectMarketDataProvider(*_lagging(2), alignment=alignment)
+
+    frame = provider.aligned_frame
+    assert len(frame) == 10
+    np.testing.assert_allclose(frame["lth_mvrv"].to_numpy()[-2:], expected_mvrv)
+    assert provider.provisional_since == int(IDX[8].timestamp())
+    report = provider.alignment_report
+    assert report.provisional == 2
+    assert report.metrics["lth_mvrv"].nowcast == 2 and report.metrics["lth_sopr"].nowcast == 0
+
+
+def test_nowcast_is_bounded_and_extends_grid_for_a_lagging_grid_metric():
+    sopr, mvrv = _lagging(3)
+    # Swap roles: the grid metric (SOPR) is now the one that lags.
+    late = pd.DataFrame({"lth_mvrv": [3.0] * 3, "btc_price": [1.0] * 3}, index=IDX[7:])
+    sopr, mvrv = sopr.iloc[:7], pd.concat([mvrv, late])
+
+    alignment = AlignmentConfig(nowcast=NowcastConfig(max_days=2))
+    provider = ChartInspectMarketDataProvider(sopr, mvrv, alignment=alignment)
+
+    assert list(provider.aligned_frame.index) == list(IDX[:9])  # day 10 is 3 days past SOPR
+    assert provider.alignment_report.provisional == 2
+
+
+def test_provisional_count_survives_snapshot(tmp_path):
+    provider = ChartInspectMarketDataProvider(
+        *_lagging(1), alignment=AlignmentConfig(nowcast=NowcastConfig(max_days=1))
+    )
+    provider.save_snapshot(tmp_path)
+
+    buffer = AlignedBuffer.load(tmp_path)
+
+    assert buffer.provisional == 1
+    assert ChartInspectMarketDataProvider.from_snapshot(tmp_path).provisional_since == provider.provisional_since
+
+
+def test_history_flags_and_clears_provisional_rows(tmp_path):
+    config = HistoryConfig(path=tmp_path / "history.csv")
+    ts = IDX[:3].as_unit("s").asi8
+    frame = PhaseFrame.from_columns(
+        timestamp=ts, btc_price=np.array([1.0, 2.0, 3.0]), phase_score=np.array([10.0, 20.0, 30.0])
+    )
+
+    first = update_lsd_history(frame, config=config, provisional_since=int(ts[2]))
+    assert first["provisional"].tolist() == [False, False, True]
+
+    real = frame.take(np.array([False, False, True]))
+    second = update_lsd_history(real, config=config)
+    assert list(second.columns) == ["timestamp", "lsd", "btc_price"]
+    assert len(second) == 3
+
+
+def test_incremental_state_excludes_provisional_points(tmp_path):
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2020-01-01", periods=120, freq="D", tz="UTC")
+    sopr = pd.Series(rng.normal(1, 0.05, 120), index=idx)
+    mvrv = pd.Series(rng.normal(2, 0.3, 120), index=idx)
+    state = tmp_path / "state.json"
+    nowcast = mvrv.copy()
+    nowcast.iloc[-2:] = nowcast.iloc[-3]
+
+    update_incremental_lsd(sopr, nowcast, state, provisional_since=int(idx[-2].timestamp()))
+    assert IncrementalLSD.load(state).last_timestamp == idx[-3]
+
+    # Real values arrive: the result matches a run that never saw the estimates.
+    result = update_incremental_lsd(sopr, mvrv, state)
+    expected = IncrementalLSD().update(sopr, mvrv)
+    pd.testing.assert_series_equal(result, expected.loc[result.index])
@@ -2,11 +2,12 @@
 
 from datetime import datetime, timezone
 
+import numpy as np
 import pytest
 
 from timing_terminal.models import PhasePoint
 from timing_terminal.scoring import ScoringConfig
-from timing_terminal.scoring.phase_score import compute_phase_score
+from timing_terminal.scoring.phase_score import compute_phase_score, compute_phase_score_array
 
 
 @pytest.fixture
@@ -235,3 +236,43 @@ def test_lth_positive_weight_influences_scores(default_config):
 
     # Still bounded
     assert all(0.0 <= s <= 100.0 for s in scores_with_lth)
+
+
+def test_array_variant_matches_list_wrapper():
+    """Array-in/array-out scoring matches the PhasePoint-based API."""
+    config = ScoringConfig(momentum_window=5, lth_weight=0.3)
+    prices = [30000.0, 0.0, 31000.0, 29000.0, 35000.0, 36000.0, 20000.0, 50000.0, 41000.0]
+    lth = [1.0, 1.2, 1.1, 0.9, 1.5, 1.6, 1.4, 2.0, 1.8]
+    points = [
+        make_phase_point(f"2025-01-{i + 1:02d}T00:00:00", price)
+        for i, price in enumerate(prices)
+    ]
+
+    array_scores = compute_phase_score_array(np.array(prices), config, lth_values=np.array(lth))
+    list_scores = compute_phase_score(points, config, lth_series=lth)
+
+    assert isinstance(array_scores, np.ndarray)
+    assert array_scores.tolist() == list_scores
+    # Zero historical price yields neutral score without LTH blending
+    assert list_scores[6] == 50.0
+    assert all(0.0 <= s <= 100.0 for s in list_scores)
+
+
+def test_array_variant_handles_empty_and_single_inputs(default_config):
+    """Edge cases mirror the list-based function."""
+    assert compute_phase_score_array(np.array([]), default_config).shape == (0,)
+    assert compute_phase_score_array(np.array([30000.0]), default_config).tolist() == [50.0]
+
+
+def test_nan_inputs_clamp_like_scalar_loop(default_config):
+    """NaN prices and LTH values clamp as the original min()/max() loop did."""
+    prices = [100.0, float("nan"), 110.0, 120.0]
+
+    assert compute_phase_score_array(prices, default_config).tolist() == [50.0, 0.0, 55.0, 60.0]
+
+    # NaN LTH values normalize to 100.0; a leading NaN makes every component 100.0
+    cfg_lth = ScoringConfig(lth_weight=0.5)
+    lth_gap = [1.0, float("nan"), 2.0, 3.0]
+    assert compute_phase_score_array(prices, cfg_lth, lth_values=lth_gap).tolist() == [25.0, 50.0, 52.5, 80.0]
+    lth_lead = [float("nan"), 1.0, 2.0, 3.0]
+    assert compute_phase_score_array(prices, cfg_lth, lth_values=lth_lead).tolist() == [75.0, 50.0, 77.5, 80.0]
@@ -0,0 +1,53 @@
+"""Tests for the array-returning MarketDataProvider methods."""
+
+import numpy as np
+import pandas as pd
+
+from timing_terminal.models import to_epoch_seconds
+from timing_terminal.providers import MarketDataProvider, MarketSeriesArrays, MarketSeriesPoint
+from timing_terminal.providers.chartinspect import ChartInspectMarketDataProvider
+from timing_terminal.providers.inmemory import InMemoryFixtureProvider
+
+
+def _assert_matches_points(arrays: MarketSeriesArrays, points) -> None:
+    assert arrays.timestamp.dtype == np.int64
+    assert arrays.value.dtype == np.float64
+    np.testing.assert_array_equal(arrays.timestamp, [to_epoch_seconds(pt.timestamp) for pt in points])
+    np.testing.assert_array_equal(arrays.value, [pt.value for pt in points])
+
+
+def test_chartinspect_arrays_match_point_series():
+    idx = pd.date_range("2024-01-01", periods=6, freq="D", tz="UTC")
+    sopr = pd.DataFrame({"lth_sopr": [1.0, 1.1, 1.2, 1.3, 1.4, 1.5]}, index=idx)
+    mvrv = pd.DataFrame(
+        {
+            "lth_mvrv": [2.0, 2.1, 2.2, 2.3, 2.4, 2.5],
+            "btc_price": [40000.0, 41000.0, np.nan, 43000.0, 44000.0, 45000.0],
+        },
+        index=idx,
+    )
+    provider = ChartInspectMarketDataProvider(sopr, mvrv)
+
+    _assert_matches_points(provider.get_btc_price_arrays(), provider.get_btc_price_series())
+    _assert_matches_points(provider.get_lth_metric_arrays(), provider.get_lth_metric_series())
+
+
+def test_inmemory_arrays_match_point_series():
+    provider = InMemoryFixtureProvider()
+
+    _assert_matches_points(provider.get_btc_price_arrays(), provider.get_btc_price_series())
+    _assert_matches_points(provider.get_lth_metric_arrays(), provider.get_lth_metric_series())
+
+
+def test_protocol_default_converts_points():
+    class PointsOnly(MarketDataProvider):
+        def get_btc_price_series(self):
+            return [MarketSeriesPoint(pd.Timestamp("2024-01-01", tz="UTC").to_pydatetime(), 1.5)]
+
+        def get_lth_metric_series(self):
+            return []
+
+    provider = PointsOnly()
+
+    _assert_matches_points(provider.get_btc_price_arrays(), provider.get_btc_price_series())
+    assert len(provider.get_lth_metric_arrays()) == 0
@@ -0,0 +1,112 @@
+"""Tests for the ChartInspect retry policy and circuit breaker."""
+
+import pytest
+import requests
+
+from timing_terminal.providers import chartinspect
+from timing_terminal.providers.chartinspect import METRIC_PATHS, fetch_chartinspect_data
+from timing_terminal.providers.retry import CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable
+from timing_terminal.providers.standin import ChartInspectStandIn, FaultConfig, synthetic_payloads
+
+SOPR_PATH = METRIC_PATHS["LTH-SOPR"]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Patches the shared ``time`` module; none of these tests inject latency.
+    recorded = []
+    monkeypatch.setattr(chartinspect.time, "sleep", recorded.append)
+    return recorded
+
+
+def _http_error(status: int, retry_after: str | None = None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.HTTPError(response=response)
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (_http_error(503), True),
+        (_http_error(429), True),
+        (_http_error(404), False),
+        (requests.ConnectionError("refused"), True),
+        (requests.Timeout("slow"), True),
+        (requests.exceptions.ChunkedEncodingError("truncated"), True),
+        (requests.exceptions.InvalidURL("bad"), False),
+        (ValueError("Unexpected data format"), False),
+    ],
+)
+def test_error_classification(error, expected):
+    assert is_retryable(error) is expected
+
+
+def test_backoff_uses_decorrelated_jitter_and_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=30.0, seed=1)
+
+    delay = 1.0
+    for _ in range(20):
+        nxt = policy.next_delay(delay)
+        assert 1.0 <= nxt <= min(30.0, 3 * delay)
+        delay = nxt
+    assert policy.next_delay(1.0, _http_error(429, retry_after="7")) >= 7.0
+    assert policy.next_delay(1.0, _http_error(503, retry_after="120")) == 30.0
+
+
+def test_client_errors_fail_without_retry(sleeps):
+    policy = RetryPolicy(seed=0)
+    with ChartInspectStandIn(synthetic_payloads(5)) as standin:
+        with pytest.raises(RuntimeError, match="404"):
+            fetch_chartinspect_data(f"{standin.base_url}/unknown", "LTH-SOPR", retry=policy)
+
+    assert len(standin.requests) == 1
+    assert sleeps == []
+    assert policy.metrics.as_dict()["outcomes"] == {"fatal": 1}
+
+
+def test_server_errors_are_retried_with_metrics(sleeps):
+    policy = RetryPolicy(max_attempts=3, deadline=None, seed=0)
+    with ChartInspectStandIn(synthetic_payloads(5), FaultConfig(error_rate=1.0)) as standin:
+        with pytest.raises(RuntimeError, match="after 3 attempts"):
+            fetch_chartinspect_data(f"{standin.base_url}{SOPR_PATH}", "LTH-SOPR", retry=policy)
+
+    assert len(standin.requests) == 3
+    assert len(sleeps) == 2 and all(1.0 <= s <= 9.0 for s in sleeps)
+    summary = policy.metrics.as_dict()
+    assert summary["outcomes"] == {"retryable": 3}
+    assert summary["backoff_seconds"] == pytest.approx(sum(sleeps), abs=1e-3)
+
+
+def test_deadline_stops_before_backoff(sleeps):
+    policy = RetryPolicy(max_attempts=5, base_delay=1.0, deadline=0.5, seed=0)
+    with ChartInspectStandIn(synthetic_payloads(5), FaultConfig(error_rate=1.0)) as standin:
+        with pytest.raises(RuntimeError, match="after 1 attempts"):
+            fetch_chartinspect_data(f"{standin.base_url}{SOPR_PATH}", "LTH-SOPR", retry=policy)
+
+    assert sleeps == []
+
+
+def test_circuit_breaker_persists_across_runs(tmp_path, sleeps):
+    path = tmp_path / "breaker.json"
+    with ChartInspectStandIn(synthetic_payloads(5), FaultConfig(error_rate=1.0)) as standin:
+        url = f"{standin.base_url}{SOPR_PATH}"
+        first_run = RetryPolicy(max_attempts=2, breaker=CircuitBreaker(path, failure_threshold=1), seed=0)
+        with pytest.raises(RuntimeError):
+            fetch_chartinspect_data(url, "LTH-SOPR", retry=first_run)
+
+        second_run = RetryPolicy(breaker=CircuitBreaker(path, failure_threshold=1), seed=0)
+        with pytest.raises(CircuitOpenError):
+            fetch_chartinspect_data(url, "LTH-SOPR", retry=second_run)
+        assert len(standin.requests) == 2
+        assert second_run.metrics.as_dict()["outcomes"] == {"circuit_open": 1}
+
+        # After reset_after the circuit is half-open; a success closes it.
+        standin.faults = FaultConfig()
+        breaker = CircuitBreaker(path, failure_threshold=1, reset_after=0.0)
+        assert breaker.state(CircuitBreaker.key(url)) == "half-open"
+        fetch_chartinspect_data(url, "LTH-SOPR", retry=RetryPolicy(breaker=breaker))
+
+    assert CircuitBreaker(path).state(CircuitBreaker.key(url)) == "closed"
@@ -0,0 +1,58 @@
+"""Reference-equivalence tests for the rolling percentile-rank engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from timing_terminal.scoring.lsd import _percentile_rank
+from timing_terminal.scoring.rolling_rank import RollingPercentileRank, rolling_percentile_rank
+
+
+def _reference_percentile_rank(series: pd.Series, window: int, min_periods: int) -> pd.Series:
+    """Original pandas implementation (O(n·w)) kept as the oracle."""
+
+    def rank_pct(x: pd.Series) -> float:
+        if len(x) < 2 or pd.isna(x.iloc[-1]):
+            return np.nan
+        return float((x < x.iloc[-1]).sum()) / float(len(x)) * 100.0
+
+    return series.rolling(window=window, min_periods=min_periods).apply(rank_pct, raw=False)
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 30, 200])
+def test_matches_reference_with_nans_and_ties(window):
+    rng = np.random.default_rng(42)
+    # Rounded values produce plenty of ties; sprinkle NaNs throughout.
+    values = np.round(rng.normal(1.0, 0.2, size=400), 1)
+    values[rng.choice(400, size=40, replace=False)] = np.nan
+    series = pd.Series(values)
+    min_periods = max(1, window // 2)
+
+    expected = _reference_percentile_rank(series, window, min_periods)
+    result = rolling_percentile_rank(values, window, min_periods)
+
+    np.testing.assert_array_equal(result, expected.to_numpy())
+
+
+def test_lsd_percentile_rank_preserves_index():
+    idx = pd.date_range("2024-01-01", periods=50, freq="D", tz="UTC")
+    series = pd.Series(np.linspace(1.0, 2.0, 50), index=idx)
+
+    result = _percentile_rank(series, 10)
+    expected = _reference_percentile_rank(series, 10, 5)
+
+    assert result.index.equals(idx)
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_engine_state_roundtrip_continues_identically():
+    values = np.random.default_rng(7).normal(size=120)
+    full = rolling_percentile_rank(values, 30)
+
+    head = RollingPercentileRank(30)
+    for v in values[:80]:
+        head.push(v)
+    resumed = RollingPercentileRank.from_window_values(head.window_values(), 30)
+
+    tail = [resumed.push(v) for v in values[80:]]
+    np.testing.assert_array_equal(np.asarray(tail), full[80:])
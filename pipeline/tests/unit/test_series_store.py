@@ -0,0 +1,76 @@
+"""Tests for incremental ChartInspect fetching via the raw-series store."""
+
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from timing_terminal.providers import chartinspect
+from timing_terminal.providers.chartinspect import fetch_chartinspect_incremental
+from timing_terminal.providers.series_store import RawSeriesStore, merge_tail
+
+URL = "http://stand-in/onchain/lth-mvrv?timeframe=all"
+
+
+def _upstream(days: int) -> pd.DataFrame:
+    idx = pd.date_range("2024-01-01", periods=days, freq="D", tz="UTC", name="date")
+    return pd.DataFrame({"lth_mvrv": [2.0 + i * 0.01 for i in range(days)], "btc_price": 40000.0}, index=idx)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    state = {"frame": _upstream(30), "urls": []}
+
+    def fake_fetch(url, metric_name, timeout=30, max_retries=3, session=None, cache=None, retry=None):
+        state["urls"].append(url)
+        frame = state["frame"]
+        since = parse_qs(urlparse(url).query).get("from")
+        if since:
+            frame = frame[frame.index >= pd.Timestamp(int(since[0]), unit="ms", tz="UTC")]
+        return frame.copy()
+
+    monkeypatch.setattr(chartinspect, "fetch_chartinspect_data", fake_fetch)
+    return state
+
+
+@pytest.mark.parametrize("since_param", ["from", None])
+def test_incremental_fetch_merges_tail(upstream, tmp_path, since_param):
+    store = RawSeriesStore(tmp_path)
+    first = fetch_chartinspect_incremental(URL, "LTH-MVRV", store, since_param)
+    assert len(first) == 30
+
+    # Two new days, and the last stored day is revised upstream.
+    grown = _upstream(32)
+    grown.iloc[29, 0] = 9.99
+    upstream["frame"] = grown
+
+    merged = fetch_chartinspect_incremental(URL, "LTH-MVRV", store, since_param)
+
+    pd.testing.assert_frame_equal(merged, grown, check_freq=False)
+    pd.testing.assert_frame_equal(store.load("LTH-MVRV"), grown, check_freq=False)
+    if since_param:
+        query = parse_qs(urlparse(upstream["urls"][-1]).query)
+        assert query["timeframe"] == ["all"]
+        assert pd.Timestamp(int(query["from"][0]), unit="ms", tz="UTC") == grown.index[27]
+    else:
+        assert upstream["urls"][-1] == URL
+
+
+def test_merge_tail_with_empty_tail_keeps_local():
+    local = _upstream(5)
+    assert merge_tail(local, local.iloc[:0]) is local
+
+
+@pytest.mark.parametrize("torn", ["empty", "truncated"])
+def test_torn_store_falls_back_to_full_fetch(upstream, tmp_path, torn):
+    store = RawSeriesStore(tmp_path)
+    fetch_chartinspect_incremental(URL, "LTH-MVRV", store, "from")
+    (path,) = tmp_path.glob("*.npz")
+    path.write_bytes(b"" if torn == "empty" else path.read_bytes()[:100])
+    upstream["frame"] = _upstream(31)
+
+    merged = fetch_chartinspect_incremental(URL, "LTH-MVRV", store, "from")
+
+    assert upstream["urls"][-1] == URL
+    pd.testing.assert_frame_equal(merged, upstream["frame"], check_freq=False)
+    pd.testing.assert_frame_equal(store.load("LTH-MVRV"), upstream["frame"], check_freq=False)
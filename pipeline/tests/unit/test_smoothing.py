@@ -0,0 +1,66 @@
+"""Tests for the Savitzky-Golay smoothing engine and its edge policies."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.signal import savgol_filter
+
+from timing_terminal.scoring.incremental import IncrementalLSD, LSDParams
+from timing_terminal.scoring.lsd import compute_lsd
+from timing_terminal.scoring.smoothing import EDGE_POLICIES, SavitzkyGolaySmoother
+
+
+def _values(n: int = 120) -> np.ndarray:
+    return np.random.default_rng(5).normal(50.0, 10.0, n).cumsum() / 10
+
+
+def test_centred_matches_scipy_interp():
+    x = _values()
+    result = SavitzkyGolaySmoother(21, 3, edge="centred").smooth_values(x)
+    np.testing.assert_allclose(result, savgol_filter(x, 21, 3), rtol=0, atol=1e-9)
+
+
+def test_mirror_matches_scipy_mirror():
+    x = _values()
+    result = SavitzkyGolaySmoother(21, 3, edge="mirror").smooth_values(x)
+    np.testing.assert_allclose(result, savgol_filter(x, 21, 3, mode="mirror"), rtol=0, atol=1e-9)
+
+
+def test_causal_values_never_revise():
+    x = _values()
+    smoother = SavitzkyGolaySmoother(21, 3, edge="causal")
+    full = smoother.smooth_values(x)
+
+    assert smoother.revision_depth == 0
+    np.testing.assert_array_equal(full[:20], x[:20])
+    for n in (21, 40, 99):
+        np.testing.assert_allclose(smoother.smooth_values(x[:n]), full[:n], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("edge", EDGE_POLICIES)
+def test_smooth_tail_matches_full_series(edge):
+    x = _values()
+    smoother = SavitzkyGolaySmoother(21, 3, edge=edge)
+    full = smoother.smooth_values(x)
+
+    tail = smoother.smooth_tail(x[80:100], x[100:])
+
+    assert len(tail) == smoother.revision_depth + 20
+    np.testing.assert_allclose(tail, full[-len(tail):], rtol=0, atol=1e-12)
+
+
+def test_incremental_causal_lsd_matches_batch():
+    rng = np.random.default_rng(9)
+    idx = pd.date_range("2023-01-01", periods=150, freq="D", tz="UTC")
+    sopr = pd.Series(1.0 + rng.normal(0, 0.05, 150).cumsum() / 4, index=idx)
+    mvrv = pd.Series(2.0 + rng.normal(0, 0.3, 150).cumsum() / 3, index=idx)
+
+    engine = IncrementalLSD(LSDParams(lookback_window=40, edge="causal"))
+    head = engine.update(sopr.iloc[:100], mvrv.iloc[:100])
+    tail = engine.update(sopr.iloc[100:], mvrv.iloc[100:])
+
+    # Causal smoothing never revises published values.
+    assert len(tail) == 50
+    batch = compute_lsd(sopr, mvrv, lookback_window=40, edge="causal")
+    published = pd.concat([head, tail])
+    np.testing.assert_allclose(published.to_numpy(), batch.to_numpy(), rtol=0, atol=1e-9)
@@ -0,0 +1,95 @@
+"""Tests for the local ChartInspect stand-in server and the provider benchmark."""
+
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from timing_terminal import bench
+from timing_terminal.providers import chartinspect
+from timing_terminal.providers.chartinspect import METRIC_PATHS, fetch_chartinspect_data
+from timing_terminal.providers.standin import (
+    ChartInspectStandIn,
+    FaultConfig,
+    load_recordings,
+    record_payloads,
+    resize_payload,
+    synthetic_payloads,
+)
+
+SOPR_PATH = METRIC_PATHS["LTH-SOPR"]
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    # Patches the shared ``time`` module, so the stand-in's latency is off too.
+    monkeypatch.setattr(chartinspect.time, "sleep", lambda s: None)
+
+
+@pytest.mark.parametrize("fault", ["error", "truncate"])
+def test_injected_faults_are_retried(fault, no_backoff):
+    # error_rate/truncate_rate of 1.0 would fail every attempt; flip it off
+    # after the first request instead.
+    faults = FaultConfig(error_rate=1.0) if fault == "error" else FaultConfig(truncate_rate=1.0)
+    with ChartInspectStandIn(synthetic_payloads(50), faults) as standin:
+        original = standin._handle
+
+        def handle_once(handler):
+            original(handler)
+            standin.faults = FaultConfig()
+
+        standin._handle = handle_once
+        frame = fetch_chartinspect_data(f"{standin.base_url}{SOPR_PATH}", "LTH-SOPR")
+
+    assert len(frame) == 50
+    assert [r.fault for r in standin.requests] == [fault, None]
+
+
+def test_latency_is_applied():
+    with ChartInspectStandIn(synthetic_payloads(5), FaultConfig(latency=0.2)) as standin:
+        started = time.perf_counter()
+        fetch_chartinspect_data(f"{standin.base_url}{SOPR_PATH}", "LTH-SOPR")
+        assert time.perf_counter() - started >= 0.2
+
+
+def test_since_param_filters_rows():
+    payloads = synthetic_payloads(10)
+    since = json.loads(payloads[SOPR_PATH])["data"][7]["date"]
+    with ChartInspectStandIn(payloads, since_param="from") as standin:
+        frame = fetch_chartinspect_data(f"{standin.base_url}{SOPR_PATH}?from={since}", "LTH-SOPR")
+
+    assert len(frame) == 3
+    assert frame.index[0] == pd.Timestamp(since, unit="ms", tz="UTC")
+
+
+def test_record_and_replay_resized(tmp_path):
+    with ChartInspectStandIn(synthetic_payloads(20)) as standin:
+        record_payloads(standin.base_url, tmp_path)
+
+    replayed = load_recordings(tmp_path, rows=30)
+    rows = json.loads(replayed[SOPR_PATH])["data"]
+    original = json.loads(synthetic_payloads(20)[SOPR_PATH])["data"]
+
+    assert len(rows) == 30
+    assert rows[10:] == original
+    assert [r["date"] for r in rows] == sorted({r["date"] for r in rows})
+    assert json.loads(resize_payload(replayed[SOPR_PATH], 5))["data"] == original[-5:]
+
+
+def test_benchmark_counts_parsed_rows(monkeypatch):
+    # A top-level field named "date" must not be counted as a row.
+    payloads = {path: b'{"meta": {"date": "2024-01-01"}, ' + body[1:] for path, body in synthetic_payloads(50).items()}
+    monkeypatch.setattr(bench, "synthetic_payloads", lambda rows: payloads)
+
+    result = bench.run_provider_benchmark(rows=50, iterations=2)
+
+    assert result.failures == 0
+    assert result.rows_per_s * result.mean_s == pytest.approx(100)
+
+
+def test_benchmark_rejects_zero_iterations():
+    with pytest.raises(ValueError, match="iterations"):
+        bench.run_provider_benchmark(iterations=0)
+    with pytest.raises(SystemExit):
+        bench.main(["--iterations", "0"])
@@ -2,11 +2,17 @@
 
 from datetime import datetime, timezone
 
+import numpy as np
 import pytest
 
-from timing_terminal.models import PhasePoint
+from timing_terminal.models import ZONES, PhaseFrame, PhasePoint
 from timing_terminal.scoring import ScoringConfig
-from timing_terminal.scoring.zones import classify_zone, enrich_phase_points_with_zones
+from timing_terminal.scoring.zones import (
+    classify_zone,
+    classify_zone_codes,
+    enrich_phase_frame_with_zones,
+    enrich_phase_points_with_zones,
+)
 
 
 @pytest.fixture
@@ -192,3 +198,29 @@ def test_zone_classification_boundary_consistency(default_config):
     
     for score, expected in zip(test_scores, expected_zones):
         assert classify_zone(score, default_config) == expected
+
+
+def test_classify_zone_codes_matches_scalar_classifier(default_config, custom_config):
+    """Vectorized zone codes agree with classify_zone for every score."""
+    test_scores = [0.0, 10.0, 19.9, 20.0, 20.1, 24.9, 25.0, 50.0, 75.0, 75.1, 80.0, 80.1, 100.0]
+
+    for config in (default_config, custom_config):
+        codes = classify_zone_codes(np.array(test_scores), config)
+        assert [ZONES[c] for c in codes] == [classify_zone(s, config) for s in test_scores]
+
+
+def test_enrich_phase_frame_with_zones(default_config):
+    """Frame enrichment populates scores and zone codes, rejecting length mismatches."""
+    frame = PhaseFrame.from_columns(
+        timestamp=np.array([1_700_000_000, 1_700_086_400, 1_700_172_800], dtype="int64"),
+        btc_price=np.array([40000.0, 41000.0, 42000.0]),
+    )
+
+    enriched = enrich_phase_frame_with_zones(frame, [10.0, 50.0, 90.0], default_config)
+
+    assert enriched.phase_score.tolist() == [10.0, 50.0, 90.0]
+    assert [ZONES[c] for c in enriched.zone_code] == ["retention", "neutral", "distribution"]
+    np.testing.assert_array_equal(enriched.timestamp, frame.timestamp)
+
+    with pytest.raises(ValueError, match="Mismatch"):
+        enrich_phase_frame_with_zones(frame, [10.0], default_config)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+"""End-to-end ChartInspect provider benchmark against the local stand-in.
+
+Runs `ChartInspectMarketDataProvider.from_config` (concurrent fetch,
+retries, streaming parse, alignment) repeatedly against a
+`ChartInspectStandIn` and reports throughput and latency percentiles,
+including the cost of injected latency, 5xx responses and truncated bodies.
+No network access is needed.
+
+    timing-terminal-bench --rows 6000 --iterations 20 --latency 0.05 --error-rate 0.1
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .providers.chartinspect import ChartInspectMarketDataProvider
+from .providers.http_cache import ResponseCache
+from .providers.json_stream import parse_chartinspect_stream
+from .providers.standin import ChartInspectStandIn, FaultConfig, load_recordings, synthetic_payloads
+
+
+@dataclass
+class BenchmarkResult:
+    rows: int
+    iterations: int
+    failures: int
+    requests: int
+    injected_errors: int
+    injected_truncations: int
+    mean_s: float
+    p50_s: float
+    p95_s: float
+    p99_s: float
+    max_s: float
+    rows_per_s: float
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def run_provider_benchmark(
+    rows: int = 6000,
+    iterations: int = 20,
+    faults: FaultConfig | None = None,
+    recordings: Path | None = None,
+    use_cache: bool = False,
+) -> BenchmarkResult:
+    """Time ``iterations`` end-to-end provider constructions.
+
+    Failed iterations (all retries exhausted) count towards `failures` and
+    their elapsed time is still included in the latency distribution.
+
+    Raises:
+        ValueError: If ``iterations`` is below 1.
+    """
+
+    if iterations < 1:
+        raise ValueError("iterations must be >= 1")
+    if recordings is not None:
+        payloads = load_recordings(recordings, rows)
+    else:
+        payloads = synthetic_payloads(rows)
+
+    timings: list[float] = []
+    failures = 0
+    with ChartInspectStandIn(payloads, faults) as standin, tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp), ttl_seconds=0) if use_cache else None
+        for _ in range(iterations):
+            started = time.perf_counter()
+            try:
+                ChartInspectMarketDataProvider.from_config(cache=cache, base_url=standin.base_url)
+            except RuntimeError:
+                failures += 1
+            timings.append(time.perf_counter() - started)
+        log = list(standin.requests)
+
+    t = np.asarray(timings)
+    n_rows = sum(len(parse_chartinspect_stream([body])) for body in payloads.values())
+    return BenchmarkResult(
+        rows=rows,
+        iterations=iterations,
+        failures=failures,
+        requests=len(log),
+        injected_errors=sum(r.fault == "error" for r in log),
+        injected_truncations=sum(r.fault == "truncate" for r in log),
+        mean_s=float(t.mean()),
+        p50_s=float(np.percentile(t, 50)),
+        p95_s=float(np.percentile(t, 95)),
+        p99_s=float(np.percentile(t, 99)),
+        max_s=float(t.max()),
+        rows_per_s=float(n_rows * (iterations - failures) / t.sum()),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ChartInspect provider against a local stand-in.")
+    parser.add_argument("--rows", type=int, default=6000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--recordings", type=Path, default=None)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="revalidate through the response cache")
+    args = parser.parse_args(argv)
+    if args.iterations < 1:
+        parser.error("--iterations must be >= 1")
+
+    faults = FaultConfig(args.latency, args.jitter, args.error_rate, 503, args.truncate_rate, args.seed)
+    result = run_provider_benchmark(args.rows, args.iterations, faults, args.recordings, args.cache)
+    print(json.dumps(result.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,32 @@ from __future__ import annotations
 
 import json
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-from .models import ChartData, PhasePoint, TimeValue
+from .models import ChartData, PhaseFrame, PhasePoint, TimeValue
 from .quality import DataQualityConfig, evaluate_data_quality
-from .config import get_pipeline_mode, get_scoring_config, get_market_data_provider
-from .history import update_lsd_history
-from .scoring.lsd import compute_lsd
-from .scoring.phase_score import compute_phase_score
-from .scoring.zones import enrich_phase_points_with_zones
+from .config import (
+    get_fetch_metrics,
+    get_history_config,
+    get_lsd_cache,
+    get_lsd_mode,
+    get_market_data_provider,
+    get_pipeline_mode,
+    get_publish_causal_lsd,
+    get_scoring_config,
+)
+from .history import open_lsd_history, recover_lsd_history, store_lsd_history
+from .scoring.incremental import update_incremental_lsd
+from .scoring.cache import cached_compute_lsd
+from .scoring.phase_score import compute_phase_score_array
+from .scoring.zones import enrich_phase_frame_with_zones
+from .providers import index_epoch_seconds
 from .providers.chartinspect import ChartInspectMarketDataProvider
+from .providers.composite import CompositeMarketDataProvider
 
 
 def _load_fixture_points() -> list[PhasePoint]:
@@ -45,66 +58,85 @@ def _load_fixture_points() -> list[PhasePoint]:
     return points
 
 
-def _load_points_from_provider() -> tuple[list[PhasePoint], list[float] | None, object]:
-    """Construct PhasePoints (and optional LTH series) from the provider.
+def _load_frame_from_provider() -> tuple[PhaseFrame, np.ndarray | None, object]:
+    """Construct a PhaseFrame (and optional LTH values) from the provider.
 
     The provider abstraction supplies BTC price and an optional LTH-like
-    metric. Both are already domain-level series (datetime + float).
+    metric as columnar arrays (epoch seconds + float64), so no per-point
+    objects are built.
     """
 
     provider = get_market_data_provider()
-    btc_series = provider.get_btc_price_series()
-    lth_points = provider.get_lth_metric_series()
+    btc = provider.get_btc_price_arrays()
+    lth = provider.get_lth_metric_arrays()
 
-    points: list[PhasePoint] = []
-    for pt in btc_series:
-        points.append(
-            PhasePoint(
-                timestamp=pt.timestamp,
-                btc_price=pt.value,
-                phase_score=0.0,  # placeholder, will be filled by scoring
-                zone="neutral",  # placeholder, will be set by zone classifier
-            )
-        )
+    frame = PhaseFrame.from_columns(timestamp=btc.timestamp, btc_price=btc.value)
 
     # For Story 1.4 MVP, assume provider returns aligned BTC and LTH series.
-    # If no LTH data is available, this can be an empty sequence.
-    if not lth_points:
-        lth_series: list[float] | None = None
+    # If no LTH data is available, this can be empty.
+    if not len(lth):
+        lth_values: np.ndarray | None = None
     else:
-        # Use the same order/length as btc_series; provider is responsible for
-        # alignment. If lengths diverge, compute_phase_score will raise.
-        lth_series = [pt.value for pt in lth_points]
-
-    return points, lth_series, provider
-def _build_chart_data(points: list[PhasePoint]) -> ChartData:
-    btc_price_series: list[TimeValue] = []
-    lsd_series: list[TimeValue] = []
-    for p in points:
-        ts = int(p.timestamp.timestamp())
-        btc_price_series.append(TimeValue(time=ts, value=p.btc_price))
-        # `phase_score` field now semantically holds the LSD value
-        lsd_series.append(TimeValue(time=ts, value=p.phase_score))
+        # Use the same order/length as the BTC series; provider is responsible
+        # for alignment. If lengths diverge, compute_phase_score_array will raise.
+        lth_values = lth.value
+
+    return frame, lth_values, provider
+
+
+def _join_lsd(frame: PhaseFrame, lsd_series: pd.Series, default: float = 50.0) -> np.ndarray:
+    """Map LSD values onto frame timestamps with a vectorized sorted join.
+
+    Timestamps without an LSD value (or with NaN during warm-up) get
+    `default`.
+    """
+
+    valid = lsd_series.dropna()
+    lsd_ts = index_epoch_seconds(valid.index)
+    lsd_values = valid.to_numpy(dtype="float64")
+    order = np.argsort(lsd_ts, kind="stable")
+    lsd_ts, lsd_values = lsd_ts[order], lsd_values[order]
+
+    scores = np.full(len(frame), default, dtype="float64")
+    if lsd_ts.size == 0:
+        return scores
+    pos = np.searchsorted(lsd_ts, frame.timestamp)
+    pos_clipped = np.minimum(pos, lsd_ts.size - 1)
+    hit = lsd_ts[pos_clipped] == frame.timestamp
+    scores[hit] = lsd_values[pos_clipped[hit]]
+    return scores
+
+
+def _build_chart_data(
+    frame: PhaseFrame,
+    lsd_causal: np.ndarray | None = None,
+    provisional: list[int] | None = None,
+) -> ChartData:
+    # ChartData is the external API boundary, so per-point TimeValues are
+    # only materialized here.
+    times = frame.timestamp.tolist()
+    btc_price_series = [TimeValue(time=t, value=v) for t, v in zip(times, frame.btc_price.tolist())]
+    # `phase_score` column now semantically holds the LSD value
+    lsd_series = [TimeValue(time=t, value=v) for t, v in zip(times, frame.phase_score.tolist())]
+    causal_series = None
+    if lsd_causal is not None:
+        causal_series = [TimeValue(time=t, value=v) for t, v in zip(times, lsd_causal.tolist())]
 
     # lastUpdated tracks the most recent timestamp in the series
-    if points:
-        latest_ts = max(p.timestamp for p in points)
-        if latest_ts.tzinfo is None:
-            latest_ts = latest_ts.replace(tzinfo=timezone.utc)
-        last_updated = latest_ts
-    else:
-        last_updated = datetime.now(timezone.utc)
+    last_updated = frame.latest_timestamp() or datetime.now(timezone.utc)
 
     # Use the shared evaluation logic so dataQuality semantics are consistent
     # with the architecture and unit tests.
     dq_config = DataQualityConfig()
-    data_quality = evaluate_data_quality(points, now=last_updated, config=dq_config)
+    data_quality = evaluate_data_quality(frame, now=last_updated, config=dq_config)
 
     return ChartData(
         btc_price=btc_price_series,
         lsd=lsd_series,
         last_updated=last_updated,
         data_quality=data_quality,
+        lsd_causal=causal_series,
+        provisional=provisional,
     )
 
 
@@ -113,76 +145,94 @@ def main() -> None:
 
     For Story 1.1 this used in-memory fixtures only.
     Story 1.3 added the scoring module; Story 1.4 introduces an optional
-    provider-backed path for building PhasePoints.
+    provider-backed path. Data flows through the pipeline as a columnar
+    PhaseFrame.
     """
 
     mode = get_pipeline_mode()
 
     if mode == "provider":
-        points, lth_series, provider = _load_points_from_provider()
+        frame, lth_values, provider = _load_frame_from_provider()
     else:
         # Default / fixture mode preserves existing behavior for tests and
         # local runs that do not configure a provider.
-        points = _load_fixture_points()
-        lth_series = None
+        frame = PhaseFrame.from_points(_load_fixture_points())
+        lth_values = None
         provider = None
 
     # Compute phase scores using scoring module
     scoring_config = get_scoring_config()
-
-    if mode == "provider" and isinstance(provider, ChartInspectMarketDataProvider):
-        # Use LSD scoring based on aligned SOPR/MVRV from ChartInspect.
+    history_config = get_history_config()
+    replayed = recover_lsd_history(history_config)
+    if replayed:
+        print(f"History: replayed {replayed} interrupted update(s) from {history_config.wal_dir}")
+    causal_lsd: pd.Series | None = None
+
+    aligned = None
+    provisional_since: int | None = None
+    if mode == "provider" and isinstance(provider, (ChartInspectMarketDataProvider, CompositeMarketDataProvider)):
         aligned = provider.aligned_frame
-        lsd_series = compute_lsd(
-            aligned["lth_sopr"],
-            aligned["lth_mvrv"],
-        )
-        # Map LSD values onto PhasePoints by timestamp.
-        lsd_by_ts = {
-            ts if isinstance(ts, datetime) else pd.to_datetime(ts).to_pydatetime(): float(v)
-            for ts, v in lsd_series.items()
-            if not pd.isna(v)
-        }
-        phase_scores: list[float] = []
-        for p in points:
-            ts = p.timestamp
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=timezone.utc)
-            phase_scores.append(lsd_by_ts.get(ts, 50.0))
+        provisional_since = provider.provisional_since
+        if provisional_since is not None:
+            print(f"Nowcast: values from {provisional_since} onwards are provisional")
+    if isinstance(provider, CompositeMarketDataProvider):
+        print(f"Provider sources: {json.dumps(provider.report())}")
+    fetch_metrics = get_fetch_metrics()
+    if fetch_metrics.attempts:
+        print(f"ChartInspect fetch: {fetch_metrics.as_dict()}")
+
+    if aligned is not None:
+        # Use LSD scoring based on aligned SOPR/MVRV from ChartInspect.
+        lsd_cache = get_lsd_cache()
+        if get_lsd_mode() == "incremental":
+            # Only new points (plus the revised smoothing tail) come back;
+            # restrict the upsert below to those timestamps.
+            # The state is saved before the history below is published; a
+            # state ahead of the history is rebuilt so no day is skipped.
+            published = open_lsd_history(history_config)
+            lsd_series = update_incremental_lsd(
+                aligned["lth_sopr"],
+                aligned["lth_mvrv"],
+                history_config.lsd_state_path,
+                provisional_since=provisional_since,
+                published_through=published.last or 0,
+            )
+            frame = frame.take(np.isin(frame.timestamp, index_epoch_seconds(lsd_series.index)))
+        else:
+            lsd_series = cached_compute_lsd(
+                aligned["lth_sopr"],
+                aligned["lth_mvrv"],
+                cache=lsd_cache,
+            )
+        if get_publish_causal_lsd():
+            # Non-revising companion series; cheap enough to recompute in full.
+            causal_lsd = cached_compute_lsd(
+                aligned["lth_sopr"], aligned["lth_mvrv"], cache=lsd_cache, edge="causal"
+            )
+        if lsd_cache is not None:
+            print(f"LSD cache: {lsd_cache.stats.as_dict()}")
+        # Map LSD values onto the frame by timestamp.
+        phase_scores = _join_lsd(frame, lsd_series)
     else:
-        phase_scores = compute_phase_score(points, scoring_config, lth_series=lth_series)
+        phase_scores = compute_phase_score_array(frame.btc_price, scoring_config, lth_values=lth_values)
 
-    # Enrich points with computed scores and zones
-    enriched_points = enrich_phase_points_with_zones(points, phase_scores, scoring_config)
+    # Enrich frame with computed scores and zones
+    enriched = enrich_phase_frame_with_zones(frame, phase_scores, scoring_config)
 
-    # Update LSD history on disk and build a window for the frontend
-    history_df = update_lsd_history(enriched_points)
+    # Update LSD history on disk and read back a window for the frontend
+    history = store_lsd_history(enriched, config=history_config, provisional_since=provisional_since)
 
     # Select a recent window for chart-data.json (defaults to ~850 days)
     window_days = int(os.getenv("TT_LSD_WINDOW_DAYS", "850"))
-    if not history_df.empty:
-        history_df["timestamp"] = pd.to_datetime(history_df["timestamp"], utc=True)
-        cutoff = history_df["timestamp"].max() - timedelta(days=window_days)
-        window_df = history_df[history_df["timestamp"] >= cutoff].copy()
-    else:
-        window_df = history_df
-
-    window_points: list[PhasePoint] = []
-    for _, row in window_df.iterrows():
-        ts = row["timestamp"]
-        if isinstance(ts, datetime) and ts.tzinfo is None:
-            ts = ts.replace(tzinfo=timezone.utc)
-        window_points.append(
-            PhasePoint(
-                timestamp=ts,
-                btc_price=float(row["btc_price"]),
-                phase_score=float(row["lsd"]),
-                zone="neutral",  # zone isn’t needed for chart output
-            )
-        )
+    window = history.tail(window_days)
+    window_frame = PhaseFrame.from_columns(
+        timestamp=window.timestamp, btc_price=window.btc_price, phase_score=window.lsd
+    )
 
     # Build chart data from history window (canonical external representation)
-    chart_data = _build_chart_data(window_points)
+    window_causal = _join_lsd(window_frame, causal_lsd) if causal_lsd is not None else None
+    window_provisional = window.timestamp[window.provisional].tolist() or None
+    chart_data = _build_chart_data(window_frame, lsd_causal=window_causal, provisional=window_provisional)
 
     out_dir = Path("pipeline/out")
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -1,15 +1,28 @@
 """Configuration management for Timing Terminal pipeline."""
 
 import os
+from dataclasses import replace
+from pathlib import Path
 from typing import Literal
 
+from .history import HistoryConfig
 from .providers.inmemory import InMemoryFixtureProvider
 from .providers import MarketDataProvider
+from .providers.alignment import AlignmentConfig, GapPolicy, NowcastConfig
 from .providers.chartinspect import ChartInspectMarketDataProvider
+from .providers.composite import CompositeMarketDataProvider, HedgePolicy, LatencyTracker, ProviderSource
+from .providers.http_cache import DEFAULT_TTL_SECONDS, ResponseCache
+from .providers.retry import CircuitBreaker, FetchControl, FetchMetrics, RetryPolicy
+from .providers.series_store import RawSeriesStore
 from .scoring import ScoringConfig
+from .scoring.cache import DEFAULT_MAX_BYTES, ArrayCache
 
 
 PipelineMode = Literal["fixture", "provider"]
+LSDMode = Literal["batch", "incremental"]
+
+# Attempt log shared by every fetch in this process (one pipeline run).
+_FETCH_METRICS = FetchMetrics()
 
 
 def get_pipeline_mode() -> PipelineMode:
@@ -24,6 +37,259 @@ def get_pipeline_mode() -> PipelineMode:
     return raw  # type: ignore[return-value]
 
 
+def get_lsd_mode() -> LSDMode:
+    """Return how LSD is computed in provider mode (batch or incremental).
+
+    "batch" recomputes the full history on every run (default).
+    "incremental" extends persisted engine state with new points only.
+    """
+
+    raw = os.getenv("TT_LSD_MODE", "batch").lower()
+    if raw not in ("batch", "incremental"):
+        return "batch"
+    return raw  # type: ignore[return-value]
+
+
+def get_publish_causal_lsd() -> bool:
+    """Whether to publish the non-revising causal LSD series (`lsdCausal`).
+
+    Controlled by TT_LSD_PUBLISH_CAUSAL ("1"/"true"/"yes"); off by default.
+    """
+
+    return os.getenv("TT_LSD_PUBLISH_CAUSAL", "").lower() in ("1", "true", "yes")
+
+
+def get_history_config() -> HistoryConfig:
+    """Return where and how LSD history is persisted.
+
+    Env flags:
+        TT_HISTORY_BACKEND = "csv" (default) or "columnar"
+        TT_HISTORY_PATH = CSV history file (default data/lsd_history.csv);
+            also the source imported by the columnar store on first use
+        TT_HISTORY_STORE_DIR = columnar store directory (default data/lsd_history)
+        TT_HISTORY_LOCK_TIMEOUT_S = wait for concurrent writers (default 60)
+    """
+
+    config = HistoryConfig()
+    backend = os.getenv("TT_HISTORY_BACKEND", "csv").lower()
+    if backend in ("csv", "columnar"):
+        config.backend = backend  # type: ignore[assignment]
+    if os.getenv("TT_HISTORY_PATH"):
+        config.path = Path(os.environ["TT_HISTORY_PATH"])
+    if os.getenv("TT_HISTORY_STORE_DIR"):
+        config.store_dir = Path(os.environ["TT_HISTORY_STORE_DIR"])
+    if os.getenv("TT_HISTORY_LOCK_TIMEOUT_S"):
+        config.lock_timeout = float(os.environ["TT_HISTORY_LOCK_TIMEOUT_S"])
+    return config
+
+
+def get_lsd_cache() -> ArrayCache | None:
+    """Return the on-disk LSD result cache, or None when disabled.
+
+    Env flags:
+        TT_LSD_CACHE_DIR = cache directory (unset → caching disabled)
+        TT_LSD_CACHE_MAX_MB = size bound for LRU eviction (default 256)
+    """
+
+    root = os.getenv("TT_LSD_CACHE_DIR")
+    if not root:
+        return None
+    max_mb = os.getenv("TT_LSD_CACHE_MAX_MB")
+    max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+    return ArrayCache(Path(root), max_bytes=max_bytes)
+
+
+def get_http_cache() -> ResponseCache | None:
+    """Return the ChartInspect response cache, or None when disabled.
+
+    Env flags:
+        TT_HTTP_CACHE_DIR = cache directory (unset → caching disabled)
+        TT_HTTP_CACHE_TTL_HOURS = serve without revalidation for this long (default 24)
+    """
+
+    root = os.getenv("TT_HTTP_CACHE_DIR")
+    if not root:
+        return None
+    ttl_hours = os.getenv("TT_HTTP_CACHE_TTL_HOURS")
+    ttl_seconds = float(ttl_hours) * 3600 if ttl_hours else DEFAULT_TTL_SECONDS
+    return ResponseCache(Path(root), ttl_seconds=ttl_seconds)
+
+
+def get_raw_series_store() -> RawSeriesStore | None:
+    """Return the local raw-series store for incremental fetching, or None.
+
+    Env flags:
+        TT_CHARTINSPECT_STORE_DIR = store directory (unset → full fetch every run)
+        TT_CHARTINSPECT_SINCE_PARAM = API lower-bound query parameter; when
+            unset the full response is trimmed locally
+    """
+
+    root = os.getenv("TT_CHARTINSPECT_STORE_DIR")
+    if not root:
+        return None
+    return RawSeriesStore(Path(root))
+
+
+def get_aligned_snapshot_path() -> Path | None:
+    """Return where the aligned provider data is snapshotted, or None.
+
+    Env flags:
+        TT_ALIGNED_SNAPSHOT_DIR = snapshot directory; when set the live
+            provider is memory-mapped over it (unset → in-memory only)
+    """
+
+    root = os.getenv("TT_ALIGNED_SNAPSHOT_DIR")
+    return Path(root) if root else None
+
+
+def get_aligned_snapshot_ttl() -> float | None:
+    """Return how long (seconds) a live run may reuse the aligned snapshot.
+
+    Env flags:
+        TT_ALIGNED_SNAPSHOT_TTL_HOURS = reuse a snapshot saved from the same
+            endpoints and alignment this recently instead of fetching
+            (unset → always fetch)
+    """
+
+    raw = os.getenv("TT_ALIGNED_SNAPSHOT_TTL_HOURS")
+    return float(raw) * 3600 if raw else None
+
+
+def get_alignment_config() -> AlignmentConfig:
+    """Return how the provider aligns SOPR, MVRV and BTC price.
+
+    Env flags:
+        TT_ALIGN_GRID = metric whose timestamps form the rows, or "union"
+            (default "lth_sopr")
+        TT_ALIGN_POLICIES = comma-separated ``metric=policy`` pairs, policy
+            being "drop", "ffill:K" or "asof[:K]" (K in days); unlisted
+            metrics use "drop", which reproduces the original alignment
+        TT_NOWCAST = "ffill[:DAYS]" or "linear[:DAYS]" to estimate a lagging
+            metric's newest days as provisional values (unset → off)
+        TT_NOWCAST_WINDOW = observations fitted by "linear" (default 7)
+
+    Raises:
+        ValueError: If TT_ALIGN_POLICIES or TT_NOWCAST is malformed.
+    """
+
+    policies = {}
+    for item in filter(None, (part.strip() for part in os.getenv("TT_ALIGN_POLICIES", "").split(","))):
+        metric, sep, spec = item.partition("=")
+        if not sep or not metric.strip():
+            raise ValueError(f"Invalid TT_ALIGN_POLICIES entry {item!r} (expected metric=policy)")
+        policies[metric.strip()] = GapPolicy.parse(spec)
+    nowcast = os.getenv("TT_NOWCAST")
+    return AlignmentConfig(
+        grid=os.getenv("TT_ALIGN_GRID", "lth_sopr"),
+        policies=policies,
+        nowcast=NowcastConfig.parse(nowcast, int(os.getenv("TT_NOWCAST_WINDOW", "7"))) if nowcast else None,
+    )
+
+
+def get_fetch_metrics() -> FetchMetrics:
+    """Return the ChartInspect attempt metrics collected during this run."""
+
+    return _FETCH_METRICS
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Return the ChartInspect retry policy.
+
+    Env flags:
+        TT_CHARTINSPECT_MAX_ATTEMPTS = attempts per fetch (default 3)
+        TT_CHARTINSPECT_DEADLINE_S = total seconds per fetch incl. backoff (default 60)
+        TT_CHARTINSPECT_BREAKER_FILE = JSON file persisting the circuit
+            breaker across runs (unset → no breaker)
+        TT_CHARTINSPECT_BREAKER_THRESHOLD = consecutive failures that open it (default 3)
+        TT_CHARTINSPECT_BREAKER_RESET_S = seconds before a trial request (default 600)
+    """
+
+    breaker = None
+    breaker_file = os.getenv("TT_CHARTINSPECT_BREAKER_FILE")
+    if breaker_file:
+        breaker = CircuitBreaker(
+            Path(breaker_file),
+            failure_threshold=int(os.getenv("TT_CHARTINSPECT_BREAKER_THRESHOLD", "3")),
+            reset_after=float(os.getenv("TT_CHARTINSPECT_BREAKER_RESET_S", "600")),
+        )
+    return RetryPolicy(
+        max_attempts=int(os.getenv("TT_CHARTINSPECT_MAX_ATTEMPTS", "3")),
+        deadline=float(os.getenv("TT_CHARTINSPECT_DEADLINE_S", "60")),
+        breaker=breaker,
+        metrics=_FETCH_METRICS,
+    )
+
+
+def get_provider_deadline() -> float | None:
+    """Return the failover deadline in seconds, or None for a single provider.
+
+    Env flags:
+        TT_PROVIDER_DEADLINE_S = bound on how long live data is waited for;
+            when set, live mode gathers a composite of ChartInspect and the
+            aligned snapshot (unset → ChartInspect only, as before)
+    """
+
+    raw = os.getenv("TT_PROVIDER_DEADLINE_S")
+    return float(raw) if raw else None
+
+
+def get_hedge_policy() -> HedgePolicy:
+    """Return when slow live requests are hedged.
+
+    Env flags:
+        TT_PROVIDER_HEDGE_PERCENTILE = latency percentile triggering a second
+            request (default 95)
+        TT_PROVIDER_HEDGE_DELAY_S = hedge delay until enough latencies are
+            known (default 10)
+    """
+
+    percentile = os.getenv("TT_PROVIDER_HEDGE_PERCENTILE")
+    delay = os.getenv("TT_PROVIDER_HEDGE_DELAY_S")
+    return HedgePolicy(
+        percentile=float(percentile) if percentile else HedgePolicy.percentile,
+        default_delay=float(delay) if delay else HedgePolicy.default_delay,
+    )
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Return the provider latency history (in-memory unless a file is set).
+
+    Env flags:
+        TT_PROVIDER_LATENCY_FILE = JSON file persisting latencies across runs
+    """
+
+    path = os.getenv("TT_PROVIDER_LATENCY_FILE")
+    return LatencyTracker(Path(path) if path else None)
+
+
+def _get_failover_provider(deadline: float) -> CompositeMarketDataProvider:
+    """Live ChartInspect (hedged) with the aligned snapshot as fallback."""
+
+    cache, store, snapshot = get_http_cache(), get_raw_series_store(), get_aligned_snapshot_path()
+    control = FetchControl()
+    retry, alignment = replace(get_retry_policy(), control=control), get_alignment_config()
+    sources = [
+        ProviderSource(
+            "chartinspect",
+            lambda: ChartInspectMarketDataProvider.from_config(
+                cache=cache, store=store, retry=retry, alignment=alignment
+            ),
+            hedge=True,
+            control=control,
+        )
+    ]
+    if snapshot is not None and (snapshot / "meta.json").exists():
+        sources.append(ProviderSource("snapshot", lambda: ChartInspectMarketDataProvider.from_snapshot(snapshot)))
+
+    provider = CompositeMarketDataProvider.gather(
+        sources, deadline=deadline, policy=get_hedge_policy(), latencies=get_latency_tracker()
+    )
+    # Refresh the fallback only from a run that actually reached ChartInspect.
+    if snapshot is not None and provider.outcomes[0].status == "ok":
+        provider.save_snapshot(snapshot)
+    return provider
+
+
 def get_market_data_provider() -> MarketDataProvider:
     """Factory for MarketDataProvider instances.
 
@@ -34,6 +300,7 @@ def get_market_data_provider() -> MarketDataProvider:
 
     Env flags:
         TT_CHARTINSPECT_MODE = "live" | "fixture" (default "fixture")
+        TT_PROVIDER_DEADLINE_S = see `get_provider_deadline`
     """
 
     mode = get_pipeline_mode()
@@ -43,7 +310,17 @@ def get_market_data_provider() -> MarketDataProvider:
             # Live ChartInspect integration; tests should monkeypatch
             # ChartInspectMarketDataProvider.from_config or the
             # underlying fetch helper to remain deterministic.
-            return ChartInspectMarketDataProvider.from_config()
+            deadline = get_provider_deadline()
+            if deadline is not None:
+                return _get_failover_provider(deadline)
+            return ChartInspectMarketDataProvider.from_config(
+                cache=get_http_cache(),
+                store=get_raw_series_store(),
+                snapshot=get_aligned_snapshot_path(),
+                retry=get_retry_policy(),
+                alignment=get_alignment_config(),
+                snapshot_ttl=get_aligned_snapshot_ttl(),
+            )
         return InMemoryFixtureProvider()
     return InMemoryFixtureProvider()
 
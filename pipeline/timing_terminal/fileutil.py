@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+"""Small helpers for crash-safe file writes shared across the pipeline.
+
+Writers build a temp file next to the target (named with `tmp_suffix` so
+concurrent writers never collide), publish it with an atomic rename and
+`fsync_dir` the parent so the rename itself survives a crash. Temp files of
+writers that died before the rename are removed by `sweep_tmp`.
+"""
+
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+
+def tmp_suffix() -> str:
+    """Temp-file suffix unique per writer (process and thread)."""
+
+    return f"{os.getpid()}.{threading.get_ident()}"
+
+
+def fsync_write(path: Path, write: Callable[[BinaryIO], object]) -> None:
+    """Create ``path`` via ``write(fh)`` and flush it to disk."""
+
+    with path.open("wb") as fh:
+        write(fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def fsync_dir(path: Path) -> None:
+    """Flush entries created, renamed or removed in directory ``path``.
+
+    No-op on platforms that cannot open a directory (Windows).
+    """
+
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def writer_alive(pid: int) -> bool:
+    """Whether process ``pid`` still runs (assumed true where unknowable)."""
+
+    if pid == os.getpid() or os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_tmp(directory: Path, pattern: str = "*.tmp") -> int:
+    """Remove ``pattern`` temp files/dirs in ``directory`` whose writer has exited.
+
+    Only names ending in ``.<tmp_suffix()>.tmp`` are considered. Returns the
+    number of entries removed.
+    """
+
+    removed = 0
+    for path in Path(directory).glob(pattern):
+        parts = path.name.split(".")
+        if len(parts) < 4 or not parts[-3].isdigit() or writer_alive(int(parts[-3])):
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+__all__ = ["fsync_dir", "fsync_write", "sweep_tmp", "tmp_suffix", "writer_alive"]
@@ -1,17 +1,36 @@
 from __future__ import annotations
 
+import logging
+import os
+import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Literal
 
+import numpy as np
 import pandas as pd
 
-from .models import PhasePoint
+from .history_store import (
+    DEFAULT_LOCK_TIMEOUT,
+    ColumnarHistoryStore,
+    HistoryColumns,
+    HistoryLock,
+    HistoryReader,
+    HistoryWAL,
+    import_csv_history,
+    open_history,
+)
+from .models import PhaseFrame, PhasePoint
+from .fileutil import fsync_dir, sweep_tmp, tmp_suffix
+
+logger = logging.getLogger(__name__)
 
 
 # Use CSV for portability (no optional Parquet deps required).
 DEFAULT_HISTORY_PATH = Path("data/lsd_history.csv")
+DEFAULT_HISTORY_STORE_DIR = Path("data/lsd_history")
+
+HistoryBackend = Literal["csv", "columnar"]
 
 
 @dataclass
@@ -22,53 +41,195 @@ class HistoryConfig:
     """
 
     path: Path = DEFAULT_HISTORY_PATH
+    # "columnar" keeps history in year segments under `store_dir` (see
+    # history_store); an existing CSV at `path` is imported on first use.
+    backend: HistoryBackend = "csv"
+    store_dir: Path = DEFAULT_HISTORY_STORE_DIR
+    # How long a writer waits for a concurrent one to finish committing.
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT
+
+    def __post_init__(self) -> None:
+        if self.backend not in ("csv", "columnar"):
+            raise ValueError(f"Unknown history backend: {self.backend!r}")
+
+    @property
+    def lsd_state_path(self) -> Path:
+        """Incremental LSD engine state, persisted next to the history file."""
+
+        return self.path.with_name("lsd_state.json")
+
+    @property
+    def wal_dir(self) -> Path:
+        """Per-writer write-ahead logs of history batches not yet published."""
+
+        if self.backend == "columnar":
+            return self.store_dir / "wal"
+        return self.path.with_name(f"{self.path.stem}.wal")
 
+    @property
+    def lock_path(self) -> Path:
+        """Advisory lock serialising writers of the history."""
 
-def _phase_points_to_frame(points: Iterable[PhasePoint]) -> pd.DataFrame:
-    rows: list[dict] = []
-    for p in points:
-        ts = p.timestamp
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=timezone.utc)
-        rows.append(
-            {
-                "timestamp": ts,
-                "lsd": float(p.phase_score),
-                "btc_price": float(p.btc_price),
-            }
-        )
-    if not rows:
-        return pd.DataFrame(columns=["timestamp", "lsd", "btc_price"])
-    df = pd.DataFrame(rows)
-    df = df.dropna(subset=["timestamp"]).copy()
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
-    return df
+        if self.backend == "columnar":
+            return self.store_dir / "manifest.lock"
+        return self.path.with_name(f"{self.path.name}.lock")
+
+
+def _phase_frame_to_rows(frame: PhaseFrame, provisional_since: int | None) -> HistoryColumns:
+    if provisional_since is not None:
+        provisional = frame.timestamp >= provisional_since
+    else:
+        provisional = np.zeros(len(frame), dtype=bool)
+    return HistoryColumns(
+        timestamp=frame.timestamp.astype("int64"),
+        lsd=frame.phase_score.astype("float64"),
+        btc_price=frame.btc_price.astype("float64"),
+        provisional=provisional,
+    )
+
+
+def history_to_phase_frame(history: pd.DataFrame) -> PhaseFrame:
+    """Convert a history frame (timestamp, lsd, btc_price) into a PhaseFrame.
+
+    Zones are not persisted in history, so rows come back as neutral.
+    """
+
+    if history.empty:
+        return PhaseFrame.empty()
+    ts = pd.DatetimeIndex(pd.to_datetime(history["timestamp"], utc=True)).as_unit("s").asi8
+    return PhaseFrame.from_columns(
+        timestamp=ts,
+        btc_price=history["btc_price"].to_numpy(dtype="float64"),
+        phase_score=history["lsd"].to_numpy(dtype="float64"),
+    )
 
 
 def update_lsd_history(
-    points: Iterable[PhasePoint],
+    points: Iterable[PhasePoint] | PhaseFrame,
     *,
     config: HistoryConfig | None = None,
+    provisional_since: int | None = None,
 ) -> pd.DataFrame:
     """Merge new LSD points into on-disk history and return the updated frame.
 
     Upserts by `timestamp` and keeps the file sorted in ascending time.
-    First run (no file) simply creates the Parquet file.
+    First run (no file) simply creates the Parquet file. The batch goes
+    through a write-ahead log and the history is replaced atomically, so an
+    interrupted run leaves the previous history intact and the batch is
+    replayed by `recover_lsd_history` on the next call.
+
+    Points at or after ``provisional_since`` (epoch seconds) are nowcast
+    estimates and get ``provisional=True``; a later upsert of the same
+    timestamp with real data clears the flag. The ``provisional`` column is
+    only written while some row still carries it.
+    """
+
+    if config is None:
+        config = HistoryConfig()
+
+    result = _store_history(points, config, provisional_since)
+    if result is None:
+        result = ColumnarHistoryStore(config.store_dir).read().to_frame()
+    return result
+
+
+def store_lsd_history(
+    points: Iterable[PhasePoint] | PhaseFrame,
+    *,
+    config: HistoryConfig | None = None,
+    provisional_since: int | None = None,
+) -> HistoryReader:
+    """Like `update_lsd_history`, but return a reader instead of the full frame.
+
+    With the columnar backend the history is never loaded as a whole; the
+    CSV backend already has it in memory and wraps that.
     """
 
     if config is None:
         config = HistoryConfig()
+    result = _store_history(points, config, provisional_since)
+    if result is None:
+        return open_lsd_history(config)
+    return HistoryReader.from_columns(HistoryColumns.from_frame(result))
+
+
+def open_lsd_history(config: HistoryConfig | None = None) -> HistoryReader:
+    """Range/tail reader over the persisted history for ``config``'s backend."""
+
+    if config is None:
+        config = HistoryConfig()
+    return open_history(config.store_dir if config.backend == "columnar" else config.path)
+
 
+def _store_history(
+    points: Iterable[PhasePoint] | PhaseFrame, config: HistoryConfig, provisional_since: int | None
+) -> pd.DataFrame | None:
+    frame = points if isinstance(points, PhaseFrame) else PhaseFrame.from_points(points)
+    rows = _phase_frame_to_rows(frame, provisional_since)
+
+    # Log the batch before anything else can fail (including recovery of
+    # older batches); it is replayed by a later run if this one dies before
+    # publishing. Our own log stays locked, so recovery skips it, and older
+    # batches are applied first so this one wins.
+    with HistoryWAL.create(config.wal_dir) as wal:
+        wal.append(rows)
+        recover_lsd_history(config)
+        result = _apply_history(rows, config)
+        wal.clear()
+    return result
+
+
+def recover_lsd_history(config: HistoryConfig | None = None) -> int:
+    """Replay history batches left in the WAL by interrupted runs.
+
+    Logs of writers that are still running are left alone. Upserts are
+    idempotent, so replaying a batch that was already published is
+    harmless. Returns the number of batches replayed.
+    """
+
+    if config is None:
+        config = HistoryConfig()
+
+    started = time.perf_counter()
+    replayed = 0
+    for wal in HistoryWAL.abandoned(config.wal_dir):
+        with wal:
+            records = wal.records()
+            for rows in records:
+                _apply_history(rows, config)
+            wal.clear()
+        replayed += len(records)
+    if replayed:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Replayed {replayed} history WAL batch(es) from {config.wal_dir} in {elapsed_ms:.1f}ms")
+    return replayed
+
+
+def _apply_history(rows: HistoryColumns, config: HistoryConfig) -> pd.DataFrame | None:
+    """Publish ``rows``; returns the full history for the CSV backend only."""
+
+    if config.backend == "columnar":
+        return _apply_columnar(rows, config)
+    # A CSV can only be rewritten whole, so the lock covers the read too.
+    with HistoryLock(config.lock_path, timeout=config.lock_timeout):
+        if config.path.parent.is_dir():
+            sweep_tmp(config.path.parent, f"{config.path.name}.*.tmp")
+        return _apply_csv(rows, config)
+
+
+def _apply_csv(rows: HistoryColumns, config: HistoryConfig) -> pd.DataFrame:
     history_path = config.path
     history_path.parent.mkdir(parents=True, exist_ok=True)
 
-    new_df = _phase_points_to_frame(points)
+    new_df = rows.to_frame()
 
     if history_path.exists():
         try:
             existing = pd.read_csv(history_path)
-        except Exception:
-            # If the existing file is corrupted/unreadable, treat as empty.
+        except Exception as e:
+            # Writes are atomic, so this means the file was damaged outside
+            # the pipeline; treat as empty.
+            logger.warning(f"Unreadable history at {history_path}, starting over: {e}")
             existing = pd.DataFrame(columns=["timestamp", "lsd", "btc_price"])
     else:
         existing = pd.DataFrame(columns=["timestamp", "lsd", "btc_price"])
@@ -76,7 +237,7 @@ def update_lsd_history(
     if existing.empty and new_df.empty:
         # Nothing to write, but ensure an empty, typed frame is returned.
         empty = pd.DataFrame(columns=["timestamp", "lsd", "btc_price"])
-        empty.to_csv(history_path, index=False)
+        _write_csv_atomic(empty, history_path)
         return empty
 
     # Ensure both have the same columns and datetime index semantics.
@@ -85,12 +246,44 @@ def update_lsd_history(
 
     combined = pd.concat([existing, new_df], ignore_index=True)
 
-    # Upsert by timestamp: keep the last occurrence of each timestamp.
+    # Upsert by timestamp: keep the last occurrence of each timestamp. The
+    # sort must be stable so "last" still means "from the newest batch".
     combined = (
-        combined.sort_values("timestamp")
+        combined.sort_values("timestamp", kind="stable")
         .drop_duplicates(subset=["timestamp"], keep="last")
         .reset_index(drop=True)
     )
+    if "provisional" in combined.columns:
+        flags = combined["provisional"].astype("boolean").fillna(False).astype(bool)
+        if flags.any():
+            combined["provisional"] = flags
+        else:
+            combined = combined.drop(columns=["provisional"])
 
-    combined.to_csv(history_path, index=False)
+    _write_csv_atomic(combined, history_path)
     return combined
+
+
+def _write_csv_atomic(frame: pd.DataFrame, path: Path) -> None:
+    """Write to a temp file, fsync, then rename over ``path``."""
+
+    tmp = path.with_name(f"{path.name}.{tmp_suffix()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8", newline="") as fh:
+            frame.to_csv(fh, index=False)
+            fh.flush()
+            os.fsync(fh.fileno())
+        tmp.replace(path)
+        fsync_dir(path.parent)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _apply_columnar(rows: HistoryColumns, config: HistoryConfig) -> None:
+    """Columnar variant of `_apply_csv`: rewrites only touched segments."""
+
+    store = ColumnarHistoryStore(config.store_dir, lock_timeout=config.lock_timeout)
+    if not store.exists() and config.path.exists():
+        import_csv_history(config.path, config.store_dir)
+    store.upsert(rows)
@@ -0,0 +1,988 @@
+from __future__ import annotations
+
+"""Segmented, append-friendly columnar store for the LSD history.
+
+The CSV backend of `history.update_lsd_history` reads, re-parses, sorts and
+rewrites the whole file on every run, so a one-day update costs O(total
+history). `ColumnarHistoryStore` keeps the same table as binary columns:
+
+    <root>/manifest.json
+    <root>/segments/<year>.g<generation>.<token>/timestamp.npy   int64 epoch seconds
+                                                  lsd.npy         float64
+                                                  btc_price.npy   float64
+                                                  provisional.npy bool
+
+Rows are partitioned by UTC calendar year. An upsert only rewrites the
+segments its timestamps fall into (usually just the current year), always
+into a fresh directory; the manifest, replaced atomically last, is the
+commit point. Superseded directories are listed under the manifest's
+``retired`` key and only removed ``retain_generations`` commits later, so
+readers never see a half-written segment, and a reader opened on an older
+manifest can still load its segments while newer commits land. Every rename
+is followed by an fsync of the parent directory. Each commit also sweeps,
+under the lock, temp files of writers that have exited and directories of
+an older generation that no manifest references (a writer crashed between
+writing them and committing). Commits are serialised
+by an advisory lock (`HistoryLock`) and guarded by the manifest's
+generation counter, so several processes can write to one store.
+
+`HistoryWAL` is the write-ahead log used by `history.update_lsd_history`
+for both backends: a batch is appended and fsynced before it is applied,
+and the log is cleared once the batch is published, so an interrupted run
+is recovered by replaying the log instead of recomputing the history. Each
+writer has its own log file, locked while it runs; only logs of writers
+that have exited are replayed.
+
+`HistoryReader` answers time-range queries without loading the whole
+history: segments are memory-mapped on demand and sliced by binary search
+over their sorted timestamps.
+
+Weekly and monthly rollups (open/close/min/max/mean of each value column)
+are kept next to the segments under ``<root>/rollups/<resolution>.g<N>.<token>``.
+Each upsert recomputes only the periods its rows fall into, and
+`HistoryReader.query` serves long ranges from the finest resolution that
+fits a point budget.
+
+Command line (``python -m timing_terminal.history_store``)::
+
+    import CSV_PATH STORE_DIR          convert an existing lsd_history.csv
+    query SOURCE [--start] [--end]     print rows as CSV
+    query SOURCE --tail DAYS
+    query SOURCE ... --max-points N    rollup rows within a point budget
+
+where SOURCE is a store directory or a history CSV.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import re
+import shutil
+import struct
+import sys
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+from .fileutil import fsync_dir, fsync_write, sweep_tmp, tmp_suffix
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+# Commits after which a superseded segment/rollup directory is removed.
+RETAIN_GENERATIONS = 8
+# ``<key>.g<generation>.<token>`` segment/rollup directory names.
+_DIR_GENERATION = re.compile(r"\.g(\d+)\.[0-9a-f]+$")
+SECONDS_PER_DAY = 86_400
+DEFAULT_LOCK_TIMEOUT = 60.0
+VALUE_COLUMNS = ("lsd", "btc_price")
+HISTORY_COLUMNS = ["timestamp", *VALUE_COLUMNS]
+
+
+def _year_keys(ts: np.ndarray) -> np.ndarray:
+    """Epoch seconds → UTC calendar year."""
+
+    return ts.astype("datetime64[s]").astype("datetime64[Y]").astype("int64") + 1970
+
+
+@dataclass
+class HistoryColumns:
+    """Columnar history rows, sorted by unique timestamp."""
+
+    timestamp: np.ndarray
+    lsd: np.ndarray
+    btc_price: np.ndarray
+    provisional: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamp.shape[0])
+
+    @classmethod
+    def empty(cls) -> "HistoryColumns":
+        return cls(
+            np.empty(0, dtype="int64"),
+            np.empty(0, dtype="float64"),
+            np.empty(0, dtype="float64"),
+            np.empty(0, dtype=bool),
+        )
+
+    @classmethod
+    def concat(cls, parts: list["HistoryColumns"]) -> "HistoryColumns":
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(*(np.concatenate([getattr(p, name) for p in parts]) for name in _FIELDS))
+
+    def take(self, selector: np.ndarray | slice) -> "HistoryColumns":
+        return HistoryColumns(*(getattr(self, name)[selector] for name in _FIELDS))
+
+    def upsert(self, new: "HistoryColumns") -> "HistoryColumns":
+        """Merge ``new`` into these rows; ``new`` wins on equal timestamps."""
+
+        both = HistoryColumns.concat([self, new])
+        # Stable sort: among equal timestamps the row from ``new`` comes last.
+        order = np.argsort(both.timestamp, kind="stable")
+        ts = both.timestamp[order]
+        last = np.ones(len(ts), dtype=bool)
+        last[:-1] = ts[1:] != ts[:-1]
+        return both.take(order[last])
+
+    def to_frame(self) -> pd.DataFrame:
+        """History frame as returned by `history.update_lsd_history`."""
+
+        frame = pd.DataFrame(
+            {
+                "timestamp": pd.to_datetime(self.timestamp, unit="s", utc=True),
+                "lsd": self.lsd,
+                "btc_price": self.btc_price,
+            }
+        )
+        if self.provisional.any():
+            frame["provisional"] = self.provisional
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "HistoryColumns":
+        """Inverse of `to_frame` (timestamps may be strings or datetimes)."""
+
+        if frame.empty:
+            return cls.empty()
+        ts = pd.DatetimeIndex(pd.to_datetime(frame["timestamp"], utc=True)).as_unit("s").asi8
+        if "provisional" in frame.columns:
+            provisional = frame["provisional"].astype("boolean").fillna(False).to_numpy(dtype=bool)
+        else:
+            provisional = np.zeros(len(frame), dtype=bool)
+        rows = cls(
+            ts,
+            frame["lsd"].to_numpy(dtype="float64"),
+            frame["btc_price"].to_numpy(dtype="float64"),
+            provisional,
+        )
+        return cls.empty().upsert(rows)
+
+
+_FIELDS = ("timestamp", "lsd", "btc_price", "provisional")
+
+RESOLUTIONS = ("day", "week", "month")
+ROLLUP_RESOLUTIONS = ("week", "month")
+ROLLUP_STATS = ("open", "close", "min", "max", "mean")
+_ROLLUP_VALUES = tuple(f"{col}_{stat}" for col in VALUE_COLUMNS for stat in ROLLUP_STATS)
+_ROLLUP_FIELDS = ("period", "count", "provisional", *_ROLLUP_VALUES)
+# Weeks start on Monday (UTC); the epoch fell on a Thursday.
+_WEEK_SECONDS = 7 * SECONDS_PER_DAY
+_WEEK_ORIGIN = 4 * SECONDS_PER_DAY
+
+
+def period_start(ts: np.ndarray, resolution: str) -> np.ndarray:
+    """Start (epoch seconds) of the week or month containing each timestamp."""
+
+    ts = np.asarray(ts, dtype="int64")
+    if resolution == "week":
+        return ts - (ts - _WEEK_ORIGIN) % _WEEK_SECONDS
+    if resolution == "month":
+        return ts.astype("datetime64[s]").astype("datetime64[M]").astype("datetime64[s]").astype("int64")
+    raise ValueError(f"Unknown rollup resolution: {resolution!r}")
+
+
+def _next_period(start: int, resolution: str) -> int:
+    if resolution == "month":
+        month = np.datetime64(start, "s").astype("datetime64[M]") + 1
+        return int(month.astype("datetime64[s]").astype("int64"))
+    return start + _WEEK_SECONDS
+
+
+@dataclass
+class Rollup:
+    """Per-period summaries of history rows at one resolution.
+
+    ``values`` maps ``"<column>_<stat>"`` (e.g. ``"lsd_mean"``) to arrays
+    aligned with ``period``. NaNs are skipped by min/max/mean. At "day"
+    resolution every row is its own period.
+    """
+
+    resolution: str
+    period: np.ndarray
+    count: np.ndarray
+    provisional: np.ndarray
+    values: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return int(self.period.shape[0])
+
+    @classmethod
+    def build(cls, rows: HistoryColumns, resolution: str) -> "Rollup":
+        """Summarise sorted ``rows``."""
+
+        if resolution == "day":
+            values = {f"{col}_{stat}": getattr(rows, col) for col in VALUE_COLUMNS for stat in ROLLUP_STATS}
+            return cls("day", rows.timestamp, np.ones(len(rows), dtype="int64"), rows.provisional, values)
+        keys = period_start(rows.timestamp, resolution)
+        if not len(keys):
+            empty = {name: np.empty(0, dtype="float64") for name in _ROLLUP_VALUES}
+            return cls(resolution, keys, np.empty(0, dtype="int64"), np.empty(0, dtype=bool), empty)
+
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+        ends = np.append(starts[1:], len(keys))
+        values = {}
+        for col in VALUE_COLUMNS:
+            x = np.asarray(getattr(rows, col), dtype="float64")
+            valid = ~np.isnan(x)
+            n = np.add.reduceat(valid.astype("int64"), starts)
+            total = np.add.reduceat(np.where(valid, x, 0.0), starts)
+            values[f"{col}_open"] = x[starts]
+            values[f"{col}_close"] = x[ends - 1]
+            values[f"{col}_min"] = np.fmin.reduceat(x, starts)
+            values[f"{col}_max"] = np.fmax.reduceat(x, starts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values[f"{col}_mean"] = total / n
+        provisional = np.logical_or.reduceat(np.asarray(rows.provisional, dtype=bool), starts)
+        return cls(resolution, keys[starts], ends - starts, provisional, values)
+
+    def take(self, selector: np.ndarray | slice) -> "Rollup":
+        return Rollup(
+            self.resolution,
+            self.period[selector],
+            self.count[selector],
+            self.provisional[selector],
+            {name: column[selector] for name, column in self.values.items()},
+        )
+
+    def replace(self, fresh: "Rollup", start: int, end: int) -> "Rollup":
+        """Swap this rollup's periods in ``[start, end)`` for ``fresh``."""
+
+        keep = (self.period < start) | (self.period >= end)
+        kept = self.take(keep)
+        order = np.argsort(np.concatenate([kept.period, fresh.period]), kind="stable")
+        return Rollup(
+            self.resolution,
+            np.concatenate([kept.period, fresh.period])[order],
+            np.concatenate([kept.count, fresh.count])[order],
+            np.concatenate([kept.provisional, fresh.provisional])[order],
+            {name: np.concatenate([kept.values[name], fresh.values[name]])[order] for name in _ROLLUP_VALUES},
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame(
+            {
+                "period": pd.to_datetime(self.period, unit="s", utc=True),
+                "count": self.count,
+                **{name: self.values[name] for name in _ROLLUP_VALUES},
+            }
+        )
+        if self.provisional.any():
+            frame["provisional"] = self.provisional
+        return frame
+
+
+class HistoryConflictError(RuntimeError):
+    """Raised when concurrent writers keep invalidating an upsert."""
+
+
+def _try_lock(fh: BinaryIO) -> bool:
+    """Take a non-blocking exclusive ``flock`` on ``fh`` (always succeeds without fcntl)."""
+
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+class HistoryLock:
+    """Advisory exclusive lock on ``path`` (``flock``; a no-op without fcntl).
+
+    The lock belongs to the open file, so it is released when the holder
+    exits or crashes, and threads of one process exclude each other too.
+    """
+
+    def __init__(self, path: Path, timeout: float = DEFAULT_LOCK_TIMEOUT, poll: float = 0.02) -> None:
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll = poll
+        self._fh: BinaryIO | None = None
+
+    def __enter__(self) -> "HistoryLock":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fh = self.path.open("ab")
+        deadline = time.monotonic() + self.timeout
+        while not _try_lock(fh):
+            if time.monotonic() >= deadline:
+                fh.close()
+                raise TimeoutError(f"Timed out after {self.timeout}s waiting for {self.path}")
+            time.sleep(self.poll)
+        self._fh = fh
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class ColumnarHistoryStore:
+    """Year-segmented binary history with an atomically replaced manifest."""
+
+    def __init__(
+        self,
+        root: Path,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+        max_attempts: int = 5,
+        retain_generations: int = RETAIN_GENERATIONS,
+    ) -> None:
+        if retain_generations < 1:
+            raise ValueError("retain_generations must be >= 1")
+        self.root = Path(root)
+        self.lock_timeout = lock_timeout
+        self.max_attempts = max_attempts
+        self.retain_generations = retain_generations
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    @property
+    def segments_dir(self) -> Path:
+        return self.root / "segments"
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def manifest(self) -> dict:
+        """Current manifest (an empty one if the store does not exist yet).
+
+        Raises:
+            ValueError: If the manifest is unreadable or of another version.
+        """
+
+        if not self.exists():
+            return {"version": MANIFEST_VERSION, "generation": 0, "rows": 0, "segments": []}
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Unreadable history manifest at {self.manifest_path}: {e}") from e
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported history manifest version: {manifest.get('version')!r}")
+        return manifest
+
+    @property
+    def rollups_dir(self) -> Path:
+        return self.root / "rollups"
+
+    @staticmethod
+    def _load_columns(directory: Path, names: tuple[str, ...], rows: int, mmap: bool) -> list[np.ndarray]:
+        mode = "r" if mmap else None
+        try:
+            columns = [np.load(directory / f"{name}.npy", mmap_mode=mode, allow_pickle=False) for name in names]
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Unreadable history data in {directory}: {e}") from e
+        if any(len(col) != rows for col in columns):
+            raise ValueError(f"History data in {directory} does not match the manifest")
+        return columns
+
+    @staticmethod
+    def _write_columns(parent: Path, name: str, columns: dict[str, np.ndarray]) -> None:
+        tmp = parent / f"{name}.{tmp_suffix()}.tmp"
+        tmp.mkdir(parents=True)
+        for field_name, column in columns.items():
+            data = np.ascontiguousarray(column)
+            fsync_write(tmp / f"{field_name}.npy", lambda fh: np.save(fh, data, allow_pickle=False))
+        tmp.rename(parent / name)
+        fsync_dir(parent)
+
+    def _load_segment(self, entry: dict, mmap: bool = False) -> HistoryColumns:
+        return HistoryColumns(*self._load_columns(self.segments_dir / entry["dir"], _FIELDS, entry["rows"], mmap))
+
+    def read(self) -> HistoryColumns:
+        """All rows, in timestamp order."""
+
+        manifest = self.manifest()
+        return HistoryColumns.concat([self._load_segment(entry) for entry in manifest["segments"]])
+
+    def load_rollup(self, resolution: str, manifest: dict | None = None, mmap: bool = False) -> Rollup:
+        """The stored weekly or monthly rollup.
+
+        Stores written before rollups existed get one computed from the days.
+        """
+
+        if resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"Unknown rollup resolution: {resolution!r}")
+        if manifest is None:
+            manifest = self.manifest()
+        entry = manifest.get("rollups", {}).get(resolution)
+        if entry is None:
+            rows = HistoryColumns.concat([self._load_segment(e) for e in manifest["segments"]])
+            return Rollup.build(rows, resolution)
+        columns = self._load_columns(self.rollups_dir / entry["dir"], _ROLLUP_FIELDS, entry["rows"], mmap)
+        return Rollup(resolution, columns[0], columns[1], columns[2], dict(zip(_ROLLUP_VALUES, columns[3:])))
+
+    def _write_rollup(self, tag: str, rollup: Rollup) -> dict:
+        name = f"{rollup.resolution}.{tag}"
+        columns = {"period": rollup.period, "count": rollup.count, "provisional": rollup.provisional}
+        self._write_columns(self.rollups_dir, name, {**columns, **rollup.values})
+        return {"dir": name, "rows": len(rollup)}
+
+    def _update_rollups(
+        self, manifest: dict, segments: list[dict], new: HistoryColumns, tag: str, cache: dict, written: list[Path]
+    ) -> dict:
+        """Recompute the rollup periods touched by ``new`` over ``segments``."""
+
+        reader = HistoryReader.from_entries(self, segments)
+        committed: dict[str, dict] = {}
+        for resolution in ROLLUP_RESOLUTIONS:
+            start = int(period_start(new.timestamp[:1], resolution)[0])
+            end = _next_period(int(period_start(new.timestamp[-1:], resolution)[0]), resolution)
+            entry = manifest.get("rollups", {}).get(resolution)
+            if entry is None:
+                rollup = Rollup.build(reader.range(), resolution)
+            else:
+                if entry["dir"] not in cache:
+                    cache[entry["dir"]] = self.load_rollup(resolution, manifest)
+                fresh = Rollup.build(reader.range(start, end), resolution)
+                rollup = cache[entry["dir"]].replace(fresh, start, end)
+            committed[resolution] = self._write_rollup(tag, rollup)
+            written.append(self.rollups_dir / committed[resolution]["dir"])
+        return committed
+
+    def _write_segment(self, key: int, tag: str, rows: HistoryColumns) -> dict:
+        name = f"{key}.{tag}"
+        self._write_columns(self.segments_dir, name, {f: getattr(rows, f) for f in _FIELDS})
+        return {
+            "key": int(key),
+            "dir": name,
+            "rows": len(rows),
+            "first": int(rows.timestamp[0]),
+            "last": int(rows.timestamp[-1]),
+        }
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp = self.manifest_path.with_name(f"manifest.{tmp_suffix()}.tmp")
+        payload = json.dumps(manifest, indent=1).encode("utf-8")
+        fsync_write(tmp, lambda fh: fh.write(payload))
+        tmp.replace(self.manifest_path)
+        fsync_dir(self.root)
+
+    def lock(self) -> "HistoryLock":
+        """Exclusive lock serialising manifest commits."""
+
+        return HistoryLock(self.root / "manifest.lock", timeout=self.lock_timeout)
+
+    def upsert(self, new: HistoryColumns) -> dict:
+        """Merge ``new`` rows, rewriting only the segments they touch.
+
+        Optimistic: segments are written without holding the lock, which is
+        only taken to check that the manifest generation is unchanged and
+        to publish. If another writer committed in between, the now-stale
+        files are dropped and the upsert is planned again; segments read on
+        an earlier attempt are reused unless that writer replaced them. The
+        last attempt holds the lock throughout, so a busy store cannot
+        starve a writer.
+
+        Returns the committed manifest.
+
+        Raises:
+            HistoryConflictError: If every attempt lost the race (only
+                possible when some writer bypasses the lock).
+        """
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        if not len(new):
+            with self.lock():
+                manifest = self.manifest()
+                if not self.exists():
+                    self._write_manifest(manifest)
+            return manifest
+
+        new = HistoryColumns.empty().upsert(new)  # sort + dedupe, last wins
+        cache: dict[str, HistoryColumns | Rollup] = {}
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt < self.max_attempts:
+                committed = self._attempt(new, cache, locked=False)
+            else:
+                # Stop racing: plan and commit under the lock.
+                with self.lock():
+                    committed = self._attempt(new, cache, locked=True)
+            if committed is not None:
+                return committed
+            logger.info(f"History manifest at {self.root} changed during upsert (attempt {attempt}), retrying")
+        raise HistoryConflictError(f"History upsert into {self.root} conflicted {self.max_attempts} times")
+
+    def _attempt(self, new: HistoryColumns, cache: dict, locked: bool) -> dict | None:
+        """Plan and commit once; None if another writer committed first."""
+
+        manifest = self.manifest()
+        written: list[Path] = []
+        try:
+            committed, expired = self._plan(manifest, new, cache, written)
+        except ValueError:
+            # A concurrent commit may have removed files this plan read.
+            for path in written:
+                shutil.rmtree(path, ignore_errors=True)
+            if self.manifest()["generation"] == manifest["generation"]:
+                raise
+            return None
+
+        with contextlib.nullcontext() if locked else self.lock():
+            current = self.manifest()["generation"]
+            if current == manifest["generation"]:
+                self._write_manifest(committed)
+                for path in expired:
+                    shutil.rmtree(path, ignore_errors=True)
+                self._sweep(committed)
+        if current != manifest["generation"]:
+            for path in written:
+                shutil.rmtree(path, ignore_errors=True)
+            return None
+        return committed
+
+    def _sweep(self, manifest: dict) -> None:
+        """Remove what crashed writers left behind; call under the lock.
+
+        Directories of a later generation than ``manifest`` belong to
+        writers still planning their commit and are kept.
+        """
+
+        referenced = {f"segments/{entry['dir']}" for entry in manifest["segments"]}
+        referenced.update(f"rollups/{entry['dir']}" for entry in manifest.get("rollups", {}).values())
+        referenced.update(d for r in manifest.get("retired", []) for d in r["dirs"])
+        removed = sweep_tmp(self.root, "manifest.*.tmp")
+        for parent in (self.segments_dir, self.rollups_dir):
+            if not parent.is_dir():
+                continue
+            removed += sweep_tmp(parent)
+            for path in parent.iterdir():
+                match = _DIR_GENERATION.search(path.name)
+                if match is None or int(match.group(1)) > manifest["generation"]:
+                    continue
+                if f"{parent.name}/{path.name}" not in referenced:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+        if removed:
+            logger.info(f"Removed {removed} orphaned history file(s) under {self.root}")
+
+    def _plan(
+        self, manifest: dict, new: HistoryColumns, cache: dict[str, HistoryColumns | Rollup], written: list[Path]
+    ) -> tuple[dict, list[Path]]:
+        """Write the segments/rollups for ``new`` on top of ``manifest``.
+
+        Directories written are appended to ``written`` as they appear.
+        Returns the manifest to commit and the retired directories that
+        drop out of the retention window once it is committed.
+        """
+
+        generation = manifest["generation"] + 1
+        token = uuid.uuid4().hex[:8]  # concurrent planners may share a generation
+        by_key = {entry["key"]: entry for entry in manifest["segments"]}
+        keys = _year_keys(new.timestamp)
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        starts, ends = np.concatenate([[0], bounds]), np.concatenate([bounds, [len(keys)]])
+
+        replaced: list[Path] = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            key = int(keys[start])
+            rows = new.take(slice(start, end))
+            old = by_key.get(key)
+            if old is not None:
+                if old["dir"] not in cache:
+                    cache[old["dir"]] = self._load_segment(old)
+                rows = cache[old["dir"]].upsert(rows)
+                replaced.append(self.segments_dir / old["dir"])
+            by_key[key] = self._write_segment(key, f"g{generation}.{token}", rows)
+            written.append(self.segments_dir / by_key[key]["dir"])
+
+        segments = [by_key[k] for k in sorted(by_key)]
+        rollups = self._update_rollups(manifest, segments, new, f"g{generation}.{token}", cache, written)
+        for resolution in rollups:
+            old = manifest.get("rollups", {}).get(resolution)
+            if old is not None:
+                replaced.append(self.rollups_dir / old["dir"])
+        # Readers opened on an earlier manifest may still load these.
+        retired = [*manifest.get("retired", [])]
+        if replaced:
+            retired.append({"generation": generation, "dirs": [str(p.relative_to(self.root)) for p in replaced]})
+        keep_from = generation - self.retain_generations
+        expired = [self.root / d for r in retired if r["generation"] <= keep_from for d in r["dirs"]]
+        committed = {
+            "version": MANIFEST_VERSION,
+            "generation": generation,
+            "rows": sum(entry["rows"] for entry in segments),
+            "segments": segments,
+            "rollups": rollups,
+            "retired": [r for r in retired if r["generation"] > keep_from],
+        }
+        return committed, expired
+
+
+# Record header: magic, row count, CRC32 of the payload.
+_WAL_HEADER = struct.Struct("<4sQI")
+_WAL_MAGIC = b"LSDW"
+_WAL_DTYPES = (np.dtype("<i8"), np.dtype("<f8"), np.dtype("<f8"), np.dtype("u1"))
+
+
+class HistoryWAL:
+    """Append-only log of history batches not yet published.
+
+    Each record holds one batch as raw little-endian columns behind a
+    checksummed header. A torn or corrupt record (the run died while
+    appending it) ends the log: that batch was never applied, and the
+    caller still has it to retry.
+
+    `create` gives each writer its own ``<dir>/<pid>-<token>.wal``, locked
+    until `close`; `abandoned` yields the logs whose writer is gone.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._fh: BinaryIO | None = None
+
+    @classmethod
+    def create(cls, directory: Path) -> "HistoryWAL":
+        """A new log owned by this writer until `close`."""
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # Lock before the file becomes visible as a .wal to recovering peers.
+        tmp = directory / f"{name}.{tmp_suffix()}.tmp"
+        fh = tmp.open("ab")
+        _try_lock(fh)
+        tmp.rename(directory / f"{name}.wal")
+        fsync_dir(directory)
+        wal = cls(directory / f"{name}.wal")
+        wal._fh = fh
+        return wal
+
+    @classmethod
+    def abandoned(cls, directory: Path) -> Iterator["HistoryWAL"]:
+        """Logs left by writers that have exited, each locked for the caller."""
+
+        if Path(directory).is_dir():
+            sweep_tmp(directory)
+        for path in sorted(Path(directory).glob("*.wal")):
+            try:
+                fh = path.open("rb")
+            except FileNotFoundError:
+                continue
+            # Skip live writers, and logs another process recovered and
+            # removed after we opened them.
+            if not _try_lock(fh) or os.fstat(fh.fileno()).st_nlink == 0:
+                fh.close()
+                continue
+            wal = cls(path)
+            wal._fh = fh
+            yield wal
+
+    def __enter__(self) -> "HistoryWAL":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def append(self, rows: HistoryColumns) -> None:
+        payload = b"".join(
+            np.ascontiguousarray(getattr(rows, name), dtype=dtype).tobytes()
+            for name, dtype in zip(_FIELDS, _WAL_DTYPES)
+        )
+        header = _WAL_HEADER.pack(_WAL_MAGIC, len(rows), zlib.crc32(payload))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as fh:
+            fh.write(header + payload)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def records(self) -> list[HistoryColumns]:
+        """Complete records, oldest first."""
+
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return []
+        row_bytes = sum(dtype.itemsize for dtype in _WAL_DTYPES)
+        records: list[HistoryColumns] = []
+        offset = 0
+        while offset < len(data):
+            if len(data) - offset < _WAL_HEADER.size:
+                break
+            magic, n, crc = _WAL_HEADER.unpack_from(data, offset)
+            start, end = offset + _WAL_HEADER.size, offset + _WAL_HEADER.size + n * row_bytes
+            if magic != _WAL_MAGIC or end > len(data) or zlib.crc32(data[start:end]) != crc:
+                break
+            columns = []
+            for dtype in _WAL_DTYPES:
+                columns.append(np.frombuffer(data, dtype=dtype, count=n, offset=start).copy())
+                start += n * dtype.itemsize
+            columns[0] = columns[0].astype("int64")
+            columns[3] = columns[3].astype(bool)
+            records.append(HistoryColumns(*columns))
+            offset = end
+        if offset < len(data):
+            logger.warning(f"Ignoring {len(data) - offset} bytes of incomplete history WAL in {self.path}")
+        return records
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+TimeLike = Union[int, str, pd.Timestamp]
+
+
+def _epoch_seconds(value: TimeLike) -> int:
+    """Epoch seconds for an int, ISO string or Timestamp (naive means UTC)."""
+
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str) and value.lstrip("-").isdigit():
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.timestamp())
+
+
+class HistoryReader:
+    """Time-range reads over sorted, non-overlapping history segments.
+
+    Results are views into the (memory-mapped) segment columns when the
+    range falls inside one segment, which is the common case for recent
+    windows; a range spanning segments is concatenated.
+    """
+
+    def __init__(
+        self,
+        bounds: list[tuple[int, int]],
+        load: Callable[[int], HistoryColumns],
+        rows: int,
+        load_rollup: Callable[[str], Rollup] | None = None,
+    ) -> None:
+        self._firsts = np.array([b[0] for b in bounds], dtype="int64")
+        self._lasts = np.array([b[1] for b in bounds], dtype="int64")
+        self._load = load
+        self._load_rollup = load_rollup or (lambda resolution: Rollup.build(self.range(), resolution))
+        self._segments: dict[int, HistoryColumns] = {}
+        self._rollups: dict[str, Rollup] = {}
+        self.rows = rows
+
+    @classmethod
+    def open(cls, store: ColumnarHistoryStore) -> "HistoryReader":
+        """Reader pinned to the store's current manifest.
+
+        It keeps reading that snapshot while other writers commit, for up
+        to ``store.retain_generations`` commits.
+        """
+
+        manifest = store.manifest()
+        return cls.from_entries(
+            store,
+            manifest["segments"],
+            lambda resolution: store.load_rollup(resolution, manifest, mmap=True),
+        )
+
+    @classmethod
+    def from_entries(
+        cls,
+        store: ColumnarHistoryStore,
+        entries: list[dict],
+        load_rollup: Callable[[str], Rollup] | None = None,
+    ) -> "HistoryReader":
+        return cls(
+            [(entry["first"], entry["last"]) for entry in entries],
+            lambda i: store._load_segment(entries[i], mmap=True),
+            sum(entry["rows"] for entry in entries),
+            load_rollup,
+        )
+
+    @classmethod
+    def from_columns(cls, rows: HistoryColumns) -> "HistoryReader":
+        if not len(rows):
+            return cls([], lambda i: rows, 0)
+        return cls([(int(rows.timestamp[0]), int(rows.timestamp[-1]))], lambda i: rows, len(rows))
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def first(self) -> int | None:
+        return int(self._firsts[0]) if len(self._firsts) else None
+
+    @property
+    def last(self) -> int | None:
+        return int(self._lasts[-1]) if len(self._lasts) else None
+
+    def _segment(self, i: int) -> HistoryColumns:
+        if i not in self._segments:
+            self._segments[i] = self._load(i)
+        return self._segments[i]
+
+    def _slices(self, start: TimeLike | None, end: TimeLike | None):
+        """(segment, first, stop) row spans covering ``[start, end)``."""
+
+        lo_ts = _epoch_seconds(start) if start is not None else None
+        hi_ts = _epoch_seconds(end) if end is not None else None
+        lo = int(np.searchsorted(self._lasts, lo_ts, side="left")) if lo_ts is not None else 0
+        hi = int(np.searchsorted(self._firsts, hi_ts, side="left")) if hi_ts is not None else len(self._firsts)
+        for i in range(lo, hi):
+            segment = self._segment(i)
+            a = int(np.searchsorted(segment.timestamp, lo_ts, side="left")) if lo_ts is not None else 0
+            b = int(np.searchsorted(segment.timestamp, hi_ts, side="left")) if hi_ts is not None else len(segment)
+            if a < b:
+                yield segment, a, b
+
+    def range(self, start: TimeLike | None = None, end: TimeLike | None = None) -> HistoryColumns:
+        """Rows with ``start <= timestamp < end`` (either bound may be open)."""
+
+        return HistoryColumns.concat([segment.take(slice(a, b)) for segment, a, b in self._slices(start, end)])
+
+    def count(self, start: TimeLike | None = None, end: TimeLike | None = None) -> int:
+        return sum(b - a for _, a, b in self._slices(start, end))
+
+    def tail_start(self, days: float) -> int | None:
+        """First timestamp of the ``days`` window ending at the newest row."""
+
+        return None if self.last is None else self.last - int(days * SECONDS_PER_DAY)
+
+    def tail(self, days: float) -> HistoryColumns:
+        """Rows within ``days`` of the newest timestamp (inclusive)."""
+
+        if self.last is None:
+            return HistoryColumns.empty()
+        return self.range(self.tail_start(days))
+
+    def rollup(self, resolution: str) -> Rollup:
+        """Full weekly or monthly rollup."""
+
+        if resolution not in self._rollups:
+            self._rollups[resolution] = self._load_rollup(resolution)
+        return self._rollups[resolution]
+
+    def query(
+        self, start: TimeLike | None = None, end: TimeLike | None = None, max_points: int | None = None
+    ) -> Rollup:
+        """Summaries over ``[start, end)`` at the finest resolution that fits.
+
+        Daily rows are used when they number at most ``max_points`` (or no
+        budget is given), then weeks, then months; months are returned even
+        if they exceed the budget. A partial first week/month is included.
+        """
+
+        if max_points is None or self.count(start, end) <= max_points:
+            return Rollup.build(self.range(start, end), "day")
+        for resolution in ROLLUP_RESOLUTIONS:
+            rollup = self.rollup(resolution)
+            a = 0
+            if start is not None:
+                first = int(period_start(np.array([_epoch_seconds(start)]), resolution)[0])
+                a = int(np.searchsorted(rollup.period, first, side="left"))
+            b = len(rollup) if end is None else int(np.searchsorted(rollup.period, _epoch_seconds(end), side="left"))
+            window = rollup.take(slice(a, max(a, b)))
+            if len(window) <= max_points:
+                break
+        return window
+
+
+def open_history(source: Path) -> HistoryReader:
+    """Reader over a columnar store directory or a history CSV.
+
+    A CSV has no index to seek in, so it is parsed in full first.
+    """
+
+    source = Path(source)
+    if source.is_dir():
+        return HistoryReader.open(ColumnarHistoryStore(source))
+    if not source.exists():
+        return HistoryReader.from_columns(HistoryColumns.empty())
+    return HistoryReader.from_columns(HistoryColumns.from_frame(pd.read_csv(source)))
+
+
+def import_csv_history(csv_path: Path, root: Path) -> ColumnarHistoryStore:
+    """Load an existing CSV history into a columnar store at ``root``.
+
+    Rows already in the store are overwritten by the CSV's values.
+
+    Raises:
+        ValueError: If the CSV lacks the history columns.
+    """
+
+    frame = pd.read_csv(csv_path)
+    missing = [c for c in HISTORY_COLUMNS if c not in frame.columns]
+    if missing:
+        raise ValueError(f"{csv_path} is not an LSD history file (missing {missing})")
+    store = ColumnarHistoryStore(root)
+    manifest = store.upsert(HistoryColumns.from_frame(frame))
+    logger.info(f"Imported {len(frame)} rows from {csv_path} into {root} ({manifest['rows']} stored)")
+    return store
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Import or query the LSD history.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Convert a CSV LSD history into the columnar store.")
+    importer.add_argument("csv_path", type=Path)
+    importer.add_argument("store_dir", type=Path)
+
+    query = commands.add_parser("query", help="Print history rows in a time range as CSV.")
+    query.add_argument("source", type=Path, help="Columnar store directory or history CSV")
+    query.add_argument("--start", help="Inclusive start (ISO date/time or epoch seconds)")
+    query.add_argument("--end", help="Exclusive end (ISO date/time or epoch seconds)")
+    query.add_argument("--tail", type=float, metavar="DAYS", help="Only the newest DAYS of history")
+    query.add_argument(
+        "--max-points", type=int, metavar="N", help="Print day/week/month rollups, the finest that fits N rows"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        store = import_csv_history(args.csv_path, args.store_dir)
+        manifest = store.manifest()
+        print(f"Imported into {args.store_dir}: {manifest['rows']} rows in {len(manifest['segments'])} segments")
+        return
+
+    reader = open_history(args.source)
+    start, end = args.start, args.end
+    if args.tail is not None:
+        if start or end:
+            parser.error("--tail cannot be combined with --start/--end")
+        start = reader.tail_start(args.tail)
+    if args.max_points is not None:
+        result = reader.query(start, end, args.max_points)
+    else:
+        result = reader.range(start, end)
+    result.to_frame().to_csv(sys.stdout, index=False)
+
+
+__all__ = [
+    "ColumnarHistoryStore",
+    "HistoryColumns",
+    "HistoryConflictError",
+    "HistoryLock",
+    "HistoryReader",
+    "HistoryWAL",
+    "RESOLUTIONS",
+    "Rollup",
+    "import_csv_history",
+    "open_history",
+    "period_start",
+]
+
+
+if __name__ == "__main__":
+    main()
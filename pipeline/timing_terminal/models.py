@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import List, Literal
+from typing import Iterable, List, Literal, Optional
+
+import numpy as np
 
 
 Zone = Literal["retention", "neutral", "distribution"]
 DataQuality = Literal["complete", "partial", "stale"]
 
+# Integer codes for zones in columnar data (PhaseFrame.zone_code).
+ZONES: tuple[Zone, ...] = ("retention", "neutral", "distribution")
+ZONE_CODES: dict[Zone, int] = {zone: code for code, zone in enumerate(ZONES)}
+
 
 @dataclass
 class PhasePoint:
@@ -25,6 +31,109 @@ class PhasePoint:
     zone: Zone
 
 
+def to_epoch_seconds(ts: datetime) -> int:
+    """Convert a datetime to unix epoch seconds (naive datetimes are UTC)."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+
+@dataclass
+class PhaseFrame:
+    """Columnar counterpart of `list[PhasePoint]`.
+
+    Carries the pipeline's per-day data as parallel NumPy columns so that
+    scoring, zone classification, history and chart export operate on whole
+    arrays. Per-point `PhasePoint` objects are only built at explicit API
+    boundaries via `from_points` / `to_points`.
+
+    Columns:
+        timestamp: int64 unix epoch seconds (UTC)
+        btc_price: float64
+        phase_score: float64 (LSD value; name kept for parity with PhasePoint)
+        zone_code: int8 index into `ZONES`
+    """
+
+    timestamp: np.ndarray
+    btc_price: np.ndarray
+    phase_score: np.ndarray
+    zone_code: np.ndarray
+
+    def __post_init__(self) -> None:
+        self.timestamp = np.asarray(self.timestamp, dtype="int64")
+        self.btc_price = np.asarray(self.btc_price, dtype="float64")
+        self.phase_score = np.asarray(self.phase_score, dtype="float64")
+        self.zone_code = np.asarray(self.zone_code, dtype="int8")
+        n = self.timestamp.shape[0]
+        if not (self.btc_price.shape[0] == self.phase_score.shape[0] == self.zone_code.shape[0] == n):
+            raise ValueError("PhaseFrame columns must have the same length")
+
+    def __len__(self) -> int:
+        return int(self.timestamp.shape[0])
+
+    @classmethod
+    def from_columns(
+        cls,
+        timestamp: np.ndarray,
+        btc_price: np.ndarray,
+        phase_score: np.ndarray | None = None,
+        zone_code: np.ndarray | None = None,
+    ) -> "PhaseFrame":
+        """Build a frame, defaulting scores to 0.0 and zones to neutral."""
+
+        n = len(timestamp)
+        if phase_score is None:
+            phase_score = np.zeros(n, dtype="float64")
+        if zone_code is None:
+            zone_code = np.full(n, ZONE_CODES["neutral"], dtype="int8")
+        return cls(timestamp, btc_price, phase_score, zone_code)
+
+    @classmethod
+    def empty(cls) -> "PhaseFrame":
+        return cls.from_columns(np.empty(0, dtype="int64"), np.empty(0, dtype="float64"))
+
+    @classmethod
+    def from_points(cls, points: Iterable[PhasePoint]) -> "PhaseFrame":
+        pts = list(points)
+        return cls(
+            timestamp=np.fromiter((to_epoch_seconds(p.timestamp) for p in pts), dtype="int64", count=len(pts)),
+            btc_price=np.fromiter((p.btc_price for p in pts), dtype="float64", count=len(pts)),
+            phase_score=np.fromiter((p.phase_score for p in pts), dtype="float64", count=len(pts)),
+            zone_code=np.fromiter((ZONE_CODES[p.zone] for p in pts), dtype="int8", count=len(pts)),
+        )
+
+    def to_points(self) -> list[PhasePoint]:
+        return [
+            PhasePoint(
+                timestamp=datetime.fromtimestamp(ts, tz=timezone.utc),
+                btc_price=price,
+                phase_score=score,
+                zone=ZONES[code],
+            )
+            for ts, price, score, code in zip(
+                self.timestamp.tolist(),
+                self.btc_price.tolist(),
+                self.phase_score.tolist(),
+                self.zone_code.tolist(),
+            )
+        ]
+
+    def take(self, selector: np.ndarray) -> "PhaseFrame":
+        """Return the rows selected by a boolean mask or index array."""
+
+        return PhaseFrame(
+            self.timestamp[selector],
+            self.btc_price[selector],
+            self.phase_score[selector],
+            self.zone_code[selector],
+        )
+
+    def latest_timestamp(self) -> datetime | None:
+        if len(self) == 0:
+            return None
+        return datetime.fromtimestamp(int(self.timestamp.max()), tz=timezone.utc)
+
+
 @dataclass
 class TimeValue:
     time: int  # unix epoch seconds (UTC)
@@ -43,6 +152,10 @@ class ChartData:
     lsd: List[TimeValue]
     last_updated: datetime
     data_quality: DataQuality
+    # Optional non-revising (causal-smoothed) LSD, exported as `lsdCausal`.
+    lsd_causal: Optional[List[TimeValue]] = None
+    # Times whose values rest on nowcast estimates, exported as `provisional`.
+    provisional: Optional[List[int]] = None
 
     def to_json_dict(self) -> dict:
         # Normalize to seconds precision and strip offset; always use trailing Z
@@ -50,13 +163,20 @@ class ChartData:
         # If timezone-aware, convert to UTC and drop offset in string
         if ts.tzinfo is not None:
             ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
-        return {
+        payload = {
             "btcPrice": [
                 {"time": tv.time, "value": float(tv.value)} for tv in self.btc_price
             ],
             "lsd": [
                 {"time": tv.time, "value": float(tv.value)} for tv in self.lsd
             ],
-            "lastUpdated": ts.isoformat() + "Z",
-            "dataQuality": self.data_quality,
         }
+        if self.lsd_causal is not None:
+            payload["lsdCausal"] = [
+                {"time": tv.time, "value": float(tv.value)} for tv in self.lsd_causal
+            ]
+        if self.provisional is not None:
+            payload["provisional"] = list(self.provisional)
+        payload["lastUpdated"] = ts.isoformat() + "Z"
+        payload["dataQuality"] = self.data_quality
+        return payload
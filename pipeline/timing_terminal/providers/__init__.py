@@ -4,6 +4,11 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Protocol, Sequence
 
+import numpy as np
+import pandas as pd
+
+from ..models import to_epoch_seconds
+
 
 @dataclass
 class MarketSeriesPoint:
@@ -16,6 +21,51 @@ class MarketSeriesPoint:
     value: float
 
 
+@dataclass
+class MarketSeriesArrays:
+    """Columnar counterpart of `Sequence[MarketSeriesPoint]`.
+
+    Attributes:
+        timestamp: int64 unix epoch seconds (UTC)
+        value: float64, NaN-free
+    """
+
+    timestamp: np.ndarray
+    value: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamp.shape[0])
+
+    @classmethod
+    def empty(cls) -> "MarketSeriesArrays":
+        return cls(np.empty(0, dtype="int64"), np.empty(0, dtype="float64"))
+
+    @classmethod
+    def from_points(cls, points: Sequence[MarketSeriesPoint]) -> "MarketSeriesArrays":
+        n = len(points)
+        return cls(
+            timestamp=np.fromiter((to_epoch_seconds(pt.timestamp) for pt in points), dtype="int64", count=n),
+            value=np.fromiter((pt.value for pt in points), dtype="float64", count=n),
+        )
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "MarketSeriesArrays":
+        """Datetime-indexed Series → arrays, dropping NaN values vectorially."""
+
+        values = series.to_numpy(dtype="float64")
+        mask = ~np.isnan(values)
+        return cls(timestamp=index_epoch_seconds(series.index)[mask], value=values[mask])
+
+
+def index_epoch_seconds(index: pd.Index) -> np.ndarray:
+    """Datetime index → int64 unix epoch seconds (naive timestamps are UTC)."""
+
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is None:
+        idx = idx.tz_localize("UTC")
+    return idx.as_unit("s").asi8
+
+
 class MarketDataProvider(Protocol):
     """Abstract provider for BTC price and LTH-derived metrics."""
 
@@ -27,3 +77,17 @@ class MarketDataProvider(Protocol):
 
         Implementations may return an empty sequence if LTH data is not available.
         """
+
+    def get_btc_price_arrays(self) -> MarketSeriesArrays:
+        """Array variant of `get_btc_price_series` (no per-point objects).
+
+        The default converts the point series; providers backed by columnar
+        data should override it.
+        """
+
+        return MarketSeriesArrays.from_points(self.get_btc_price_series())
+
+    def get_lth_metric_arrays(self) -> MarketSeriesArrays:
+        """Array variant of `get_lth_metric_series` (empty if unavailable)."""
+
+        return MarketSeriesArrays.from_points(self.get_lth_metric_series())
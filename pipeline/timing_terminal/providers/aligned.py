@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+"""Immutable columnar buffer for the aligned SOPR/MVRV/BTC series.
+
+`ChartInspectMarketDataProvider` used to keep a DataFrame and hand out a
+full ``.copy()`` of it on every `aligned_frame` access. `AlignedBuffer`
+holds the aligned data once as a read-only ``(columns, rows)`` float64 block
+plus its index; `frame()` wraps that block in a DataFrame without copying,
+and any attempt to write through it raises ``ValueError: assignment
+destination is read-only``.
+
+A buffer can be saved as a snapshot directory (``meta.json`` naming the
+``index.<token>.npy`` / ``values.<token>.npy`` pair of one save) and
+re-opened memory-mapped, so consumers share the page cache instead of each
+allocating the full history. The meta records when
+and from what the snapshot was saved (`snapshot_age`), which lets
+`ChartInspectMarketDataProvider.from_config` reuse a fresh snapshot on a
+repeated run instead of fetching and aligning again.
+
+``provisional`` counts trailing rows holding nowcast estimates (see
+`alignment.NowcastConfig`); it travels with the snapshot.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from . import index_epoch_seconds
+from ..fileutil import fsync_dir, fsync_write, sweep_tmp, tmp_suffix, writer_alive
+
+# 2: arrays are named after the save token recorded in ``meta.json``.
+SNAPSHOT_VERSION = 2
+_LOAD_ATTEMPTS = 3
+
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+def _read_meta(path: Path) -> dict | None:
+    try:
+        return json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _open_snapshot(path: Path, mmap: bool) -> tuple[dict, np.ndarray, np.ndarray]:
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"version {meta.get('version')} != {SNAPSHOT_VERSION}")
+    mode = "r" if mmap else None
+    token = meta["token"]
+    index_ns = np.load(path / f"index.{token}.npy", mmap_mode=mode, allow_pickle=False)
+    values = np.load(path / f"values.{token}.npy", mmap_mode=mode, allow_pickle=False)
+    return meta, index_ns, values
+
+
+def _remove_arrays(path: Path, keep: set[str | None], superseded: str | None) -> None:
+    """Remove snapshot arrays not in ``keep``.
+
+    Only ``superseded`` (published two saves ago), earlier arrays of this
+    writer, arrays whose writer process has exited and version 1 leftovers
+    are removed, so a concurrent save that has not published yet keeps its
+    files.
+    """
+
+    own = tmp_suffix()
+    for file in path.glob("*.npy"):
+        parts = file.name.split(".")
+        if len(parts) == 2:
+            # Unversioned arrays of a version 1 snapshot.
+            file.unlink(missing_ok=True)
+            continue
+        if len(parts) != 5 or not parts[2].isdigit():
+            continue
+        token = ".".join(parts[1:4])
+        stale = token == superseded or token.endswith(f".{own}") or not writer_alive(int(parts[2]))
+        if token not in keep and stale:
+            file.unlink(missing_ok=True)
+
+
+@dataclass(frozen=True)
+class AlignedBuffer:
+    """Read-only aligned columns sharing one float64 block.
+
+    Attributes:
+        index: Row timestamps (as in the source frames).
+        values: float64 array of shape (len(columns), len(index)), read-only.
+        columns: Column names, in row order of `values`.
+        epoch_seconds: int64 unix epoch seconds per row, read-only.
+        provisional: Number of trailing rows that are estimates.
+    """
+
+    index: pd.DatetimeIndex
+    values: np.ndarray
+    columns: tuple[str, ...]
+    epoch_seconds: np.ndarray
+    provisional: int = 0
+
+    @classmethod
+    def from_columns(
+        cls, index: pd.Index, columns: Mapping[str, np.ndarray], provisional: int = 0
+    ) -> "AlignedBuffer":
+        """Stack ``columns`` and drop rows where any column is NaN.
+
+        ``provisional`` is the count of trailing estimated rows in the
+        input; NaN rows dropped from that tail reduce it accordingly.
+        """
+
+        names = tuple(columns)
+        if names:
+            values = np.vstack([np.asarray(col, dtype="float64") for col in columns.values()])
+        else:
+            values = np.empty((0, len(index)))
+        keep = ~np.isnan(values).any(axis=0)
+        if not keep.all():
+            if provisional:
+                provisional = int(keep[len(keep) - provisional :].sum())
+            values = values[:, keep]
+            index = index[keep]
+        index = pd.DatetimeIndex(index)
+        return cls(
+            index=index,
+            values=_read_only(np.ascontiguousarray(values)),
+            columns=names,
+            epoch_seconds=_read_only(index_epoch_seconds(index)),
+            provisional=provisional,
+        )
+
+    def __len__(self) -> int:
+        return int(self.values.shape[1])
+
+    @property
+    def provisional_since(self) -> int | None:
+        """Epoch seconds of the first provisional row, or None."""
+
+        if not self.provisional:
+            return None
+        return int(self.epoch_seconds[len(self) - self.provisional])
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column."""
+
+        return self.values[self.columns.index(name)]
+
+    def frame(self) -> pd.DataFrame:
+        """Zero-copy, read-only DataFrame view of the buffer."""
+
+        return pd.DataFrame(self.values.T, index=self.index, columns=list(self.columns), copy=False)
+
+    def save(self, path: Path, source: str | None = None) -> None:
+        """Write a snapshot directory, published by replacing ``meta.json``.
+
+        The arrays go to files named after a per-save token recorded in
+        ``meta.json``, so a load sees either the previous snapshot or this
+        one, never files from two saves. The previously published arrays are
+        kept for readers that opened the old ``meta.json``; older ones (and
+        those of writers that died before publishing) are removed.
+        ``source`` identifies the inputs the buffer was built from (see
+        `snapshot_age`).
+        """
+
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        token = f"{time.time_ns()}.{tmp_suffix()}"
+        for name, arr in (("index", self.index.as_unit("ns").asi8), ("values", self.values)):
+            data = np.ascontiguousarray(arr)
+            fsync_write(path / f"{name}.{token}.npy", lambda fh: np.save(fh, data, allow_pickle=False))
+        previous = _read_meta(path) or {}
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "token": token,
+            "previous": previous.get("token"),
+            "columns": list(self.columns),
+            "rows": len(self),
+            "tz": str(self.index.tz) if self.index.tz is not None else None,
+            "index_name": self.index.name,
+            "provisional": self.provisional,
+            "saved_at": time.time(),
+            "source": source,
+        }
+        tmp = path / f"meta.{tmp_suffix()}.tmp"
+        fsync_write(tmp, lambda fh: fh.write(json.dumps(meta).encode("utf-8")))
+        tmp.replace(path / "meta.json")
+        fsync_dir(path)
+        _remove_arrays(path, keep={token, meta["previous"]}, superseded=previous.get("previous"))
+        sweep_tmp(path, "meta.*.tmp")
+
+    @staticmethod
+    def snapshot_age(path: Path, source: str | None = None) -> float | None:
+        """Seconds since the snapshot at ``path`` was saved from ``source``.
+
+        None when there is no readable snapshot or it was saved from other
+        inputs (or before snapshots recorded their age).
+        """
+
+        try:
+            meta = json.loads((Path(path) / "meta.json").read_text(encoding="utf-8"))
+            saved_at = float(meta["saved_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("source") != source:
+            return None
+        return max(time.time() - saved_at, 0.0)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "AlignedBuffer":
+        """Open a snapshot written by `save` (memory-mapped by default).
+
+        Raises:
+            ValueError: If the snapshot is missing pieces or inconsistent.
+        """
+
+        path = Path(path)
+        for attempt in range(_LOAD_ATTEMPTS):
+            try:
+                meta, index_ns, values = _open_snapshot(path, mmap)
+                break
+            except FileNotFoundError as e:
+                # Saves published since meta.json was read removed its arrays: re-read it.
+                if attempt + 1 == _LOAD_ATTEMPTS or not (path / "meta.json").exists():
+                    raise ValueError(f"Unreadable aligned snapshot at {path}: {e}") from e
+            except (OSError, ValueError, KeyError, EOFError) as e:
+                raise ValueError(f"Unreadable aligned snapshot at {path}: {e}") from e
+
+        if values.shape != (len(meta["columns"]), meta["rows"]):
+            raise ValueError(f"Inconsistent aligned snapshot at {path}")
+        if index_ns.shape != (meta["rows"],):
+            raise ValueError(f"Inconsistent aligned snapshot at {path}")
+
+        index = pd.DatetimeIndex(np.asarray(index_ns).view("datetime64[ns]"), name=meta.get("index_name"))
+        if meta.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        if not mmap:
+            values = _read_only(values)
+        return cls(
+            index=index,
+            values=values,
+            columns=tuple(meta["columns"]),
+            epoch_seconds=_read_only(index_epoch_seconds(index)),
+            provisional=int(meta.get("provisional", 0)),
+        )
+
+
+__all__ = ["AlignedBuffer", "SNAPSHOT_VERSION"]
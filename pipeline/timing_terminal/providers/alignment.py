@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+"""Sorted-merge alignment of metric series onto a common timestamp grid.
+
+`ChartInspectMarketDataProvider` used to ``reindex`` every metric onto the
+SOPR index and drop any row with a NaN, silently losing each day on which
+one metric lags the other. `align_columns` does the same job with explicit,
+per-metric `GapPolicy`s and reports what happened:
+
+- The grid is one metric's timestamps (``AlignmentConfig.grid``, SOPR by
+  default) or the union of all of them (``"union"``).
+- Each metric is merged against the grid in a single linear pass: both
+  timestamp arrays are sorted, so a stable argsort of their concatenation
+  is a two-run merge, and a running maximum over it yields the last
+  observation at or before every grid timestamp. No reindexing.
+- ``drop`` keeps exact matches only (the previous behaviour and the
+  default), ``ffill:K`` carries the last matched value forward for up to K
+  days, ``asof[:K]`` takes the latest observation at or before the grid
+  timestamp (within K days, if given).
+- An optional `NowcastConfig` extends the grid to the newest timestamp of
+  any metric and estimates a late metric's values past its last
+  observation (bounded forward-fill or a short linear extrapolation).
+- Rows still missing any metric are dropped; `AlignmentReport` records
+  exact/filled/missing counts, the stalest fill and how far each metric
+  lags the end of the grid.
+
+Any value past a metric's last real observation (nowcast or gap-policy
+fill) is an estimate that the next fetch will replace. Such rows always
+form a suffix of the output, so `AlignmentReport.provisional` is simply
+the number of trailing provisional rows.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Literal, Mapping
+
+import numpy as np
+import pandas as pd
+
+DAY_NS = 86_400 * 10**9
+
+GapKind = Literal["drop", "ffill", "asof"]
+
+
+@dataclass(frozen=True)
+class GapPolicy:
+    """How grid timestamps without an exact observation are filled.
+
+    Attributes:
+        kind: "drop", "ffill" or "asof".
+        max_days: Fill horizon in days ("ffill" requires it; for "asof",
+            None means unlimited).
+    """
+
+    kind: GapKind = "drop"
+    max_days: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.kind not in ("drop", "ffill", "asof"):
+            raise ValueError(f"Unknown gap policy {self.kind!r}")
+        if self.kind == "ffill" and self.max_days is None:
+            raise ValueError("ffill needs a day limit (e.g. 'ffill:2')")
+        if self.max_days is not None and self.max_days < 0:
+            raise ValueError("max_days must be >= 0")
+
+    @classmethod
+    def parse(cls, spec: str) -> "GapPolicy":
+        """Parse ``drop``, ``ffill:K``, ``asof`` or ``asof:K``."""
+
+        kind, _, days = spec.strip().lower().partition(":")
+        try:
+            return cls(kind, float(days) if days else None)  # type: ignore[arg-type]
+        except ValueError as e:
+            raise ValueError(f"Invalid gap policy {spec!r}: {e}") from e
+
+    def __str__(self) -> str:
+        if self.max_days is None:
+            return self.kind
+        return f"{self.kind}:{self.max_days:g}"
+
+
+@dataclass(frozen=True)
+class NowcastConfig:
+    """Estimate a lagging metric's newest values.
+
+    Attributes:
+        max_days: How far past a metric's last observation to estimate.
+        method: "ffill" (repeat the last value) or "linear" (least-squares
+            line through the last ``window`` observations).
+        window: Observations used by "linear".
+    """
+
+    max_days: float = 2.0
+    method: Literal["ffill", "linear"] = "ffill"
+    window: int = 7
+
+    def __post_init__(self) -> None:
+        if self.method not in ("ffill", "linear"):
+            raise ValueError(f"Unknown nowcast method {self.method!r}")
+        if self.max_days <= 0:
+            raise ValueError("max_days must be > 0")
+        if self.window < 2:
+            raise ValueError("window must be >= 2")
+
+    @classmethod
+    def parse(cls, spec: str, window: int = 7) -> "NowcastConfig":
+        """Parse ``METHOD[:DAYS]``, e.g. ``ffill:2`` or ``linear:1``."""
+
+        method, _, days = spec.strip().lower().partition(":")
+        try:
+            return cls(float(days) if days else cls.max_days, method, window)  # type: ignore[arg-type]
+        except ValueError as e:
+            raise ValueError(f"Invalid nowcast {spec!r}: {e}") from e
+
+
+@dataclass
+class AlignmentConfig:
+    """Grid choice and per-metric gap policies (metrics not listed use ``default``)."""
+
+    grid: str = "lth_sopr"
+    policies: Mapping[str, GapPolicy] = field(default_factory=dict)
+    default: GapPolicy = GapPolicy()
+    nowcast: NowcastConfig | None = None
+
+    def policy(self, metric: str) -> GapPolicy:
+        return self.policies.get(metric, self.default)
+
+
+@dataclass
+class MetricGaps:
+    """Per-metric alignment outcome over the grid.
+
+    Attributes:
+        policy: Gap policy applied.
+        observations: Non-NaN source observations.
+        exact: Grid rows with an observation at exactly that timestamp.
+        filled: Grid rows filled by the policy.
+        missing: Grid rows left empty (and therefore dropped).
+        nowcast: Grid rows estimated past the last observation by the nowcast.
+        max_fill_days: Age of the stalest filled value, in days.
+        tail_lag_days: Days between the last grid timestamp and this
+            metric's last observation (0 when it is up to date).
+    """
+
+    policy: str
+    observations: int
+    exact: int
+    filled: int
+    missing: int
+    max_fill_days: float
+    tail_lag_days: float
+    nowcast: int = 0
+
+
+@dataclass
+class AlignmentReport:
+    """Alignment outcome; ``provisional`` counts trailing estimated rows."""
+
+    grid: str
+    grid_rows: int
+    rows: int
+    metrics: dict[str, MetricGaps]
+    provisional: int = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.grid_rows - self.rows
+
+    def as_dict(self) -> dict:
+        return asdict(self) | {"dropped": self.dropped}
+
+
+def utc_ns(index: pd.Index) -> np.ndarray:
+    """Datetime index → int64 epoch nanoseconds (naive timestamps are UTC)."""
+
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is None:
+        idx = idx.tz_localize("UTC")
+    return idx.as_unit("ns").asi8
+
+
+def _observations(series: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted, NaN-free (epoch-ns, value) arrays of one metric."""
+
+    ts = utc_ns(series.index)
+    values = series.to_numpy(dtype="float64")
+    keep = ~np.isnan(values)
+    if not keep.all():
+        ts, values = ts[keep], values[keep]
+    if len(ts) > 1 and (np.diff(ts) < 0).any():
+        order = np.argsort(ts, kind="stable")
+        ts, values = ts[order], values[order]
+    return ts, values
+
+
+def last_at_or_before(source: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Position of the last ``source`` timestamp <= each ``grid`` timestamp (-1 if none).
+
+    Both inputs must be sorted. Their concatenation is two sorted runs, which
+    the stable (timsort) argsort merges in linear time; ``source`` comes
+    first so equal timestamps order source-before-grid.
+    """
+
+    n = len(source)
+    order = np.argsort(np.concatenate([source, grid]), kind="stable")
+    is_source = order < n
+    # Source positions appear in increasing order along the merge, so the
+    # running maximum is the latest source element seen so far.
+    latest = np.maximum.accumulate(np.where(is_source, order, -1))
+    return latest[~is_source]
+
+
+def _unique_sorted(ts: np.ndarray) -> np.ndarray:
+    if len(ts) < 2:
+        return ts
+    return ts[np.concatenate([[True], ts[1:] != ts[:-1]])]
+
+
+def _merge_grid(grid_ts: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """Sorted union of two sorted, duplicate-free timestamp arrays (linear merge)."""
+
+    if len(grid_ts) == 0:
+        return ts
+    pos = last_at_or_before(grid_ts, ts)
+    new = (pos < 0) | (grid_ts[np.maximum(pos, 0)] != ts)
+    return np.sort(np.concatenate([grid_ts, ts[new]]), kind="stable")
+
+
+def _align_one(
+    grid: np.ndarray, ts: np.ndarray, values: np.ndarray, policy: GapPolicy
+) -> tuple[np.ndarray, MetricGaps]:
+    out = np.full(len(grid), np.nan)
+    staleness = np.zeros(len(grid), dtype="int64")
+    if len(ts) and len(grid):
+        pos = last_at_or_before(ts, grid)
+        safe = np.maximum(pos, 0)
+        exact = (pos >= 0) & (ts[safe] == grid)
+        out[exact] = values[pos[exact]]
+        if policy.kind == "asof":
+            fill = (pos >= 0) & ~exact
+            staleness = np.where(fill, grid - ts[safe], 0)
+            if policy.max_days is not None:
+                fill &= staleness <= policy.max_days * DAY_NS
+            out[fill] = values[pos[fill]]
+        elif policy.kind == "ffill":
+            # Last exactly-matched grid row at or before each row.
+            rows = np.arange(len(grid))
+            last = np.maximum.accumulate(np.where(exact, rows, -1))
+            staleness = np.where(last >= 0, grid - grid[np.maximum(last, 0)], 0)
+            fill = (last >= 0) & ~exact & (staleness <= policy.max_days * DAY_NS)
+            out[fill] = out[last[fill]]
+        else:
+            fill = np.zeros(len(grid), dtype=bool)
+    else:
+        exact = fill = np.zeros(len(grid), dtype=bool)
+
+    n_exact, n_fill = int(exact.sum()), int(fill.sum())
+    gaps = MetricGaps(
+        policy=str(policy),
+        observations=len(ts),
+        exact=n_exact,
+        filled=n_fill,
+        missing=len(grid) - n_exact - n_fill,
+        max_fill_days=float(staleness[fill].max()) / DAY_NS if n_fill else 0.0,
+        tail_lag_days=float(max(grid[-1] - ts[-1], 0)) / DAY_NS if len(ts) and len(grid) else 0.0,
+    )
+    return out, gaps
+
+
+def _nowcast(
+    grid: np.ndarray, ts: np.ndarray, values: np.ndarray, out: np.ndarray, config: NowcastConfig
+) -> int:
+    """Fill ``out`` past the last observation, in place; returns rows filled."""
+
+    if not len(ts):
+        return 0
+    target = np.isnan(out) & (grid > ts[-1]) & (grid - ts[-1] <= config.max_days * DAY_NS)
+    if not target.any():
+        return 0
+    if config.method == "linear" and len(ts) >= 2:
+        recent_ts, recent = ts[-config.window :], values[-config.window :]
+        days = (recent_ts - ts[-1]) / DAY_NS
+        slope, intercept = np.polyfit(days, recent, 1)
+        out[target] = intercept + slope * (grid[target] - ts[-1]) / DAY_NS
+    else:
+        out[target] = values[-1]
+    return int(target.sum())
+
+
+def align_columns(
+    columns: Mapping[str, pd.Series], config: AlignmentConfig | None = None
+) -> tuple[pd.DatetimeIndex, dict[str, np.ndarray], AlignmentReport]:
+    """Align datetime-indexed metric series onto one grid.
+
+    Returns the grid rows on which every metric has a value (after gap
+    policies), the aligned float64 columns and the gap report. The index
+    keeps the grid metric's timezone and name (UTC for ``"union"``).
+
+    Raises:
+        ValueError: If ``config.grid`` names a metric not in ``columns``.
+    """
+
+    config = config or AlignmentConfig()
+    observed = {name: _observations(series) for name, series in columns.items()}
+
+    if config.grid == "union":
+        grid = np.empty(0, dtype="int64")
+        for ts, _ in observed.values():
+            grid = _merge_grid(grid, _unique_sorted(ts))
+        template = pd.DatetimeIndex([], tz="UTC", name=next(iter(columns.values())).index.name if columns else None)
+    elif config.grid in observed:
+        grid = _unique_sorted(observed[config.grid][0])
+        template = pd.DatetimeIndex(columns[config.grid].index)
+    else:
+        raise ValueError(f"Alignment grid {config.grid!r} is not one of {list(columns)}")
+
+    nowcast = config.nowcast
+    if nowcast is not None and len(grid):
+        # Newer days published by any metric become rows to nowcast into.
+        for ts, _ in observed.values():
+            grid = _merge_grid(grid, _unique_sorted(ts[ts > grid[-1]]))
+
+    aligned: dict[str, np.ndarray] = {}
+    gaps: dict[str, MetricGaps] = {}
+    keep = np.ones(len(grid), dtype=bool)
+    provisional = np.zeros(len(grid), dtype=bool)
+    for name, (ts, values) in observed.items():
+        aligned[name], gaps[name] = _align_one(grid, ts, values, config.policy(name))
+        if nowcast is not None:
+            filled = _nowcast(grid, ts, values, aligned[name], nowcast)
+            gaps[name].nowcast, gaps[name].missing = filled, gaps[name].missing - filled
+        if len(ts):
+            provisional |= grid > ts[-1]
+        keep &= ~np.isnan(aligned[name])
+
+    if not keep.all():
+        grid, provisional = grid[keep], provisional[keep]
+        aligned = {name: col[keep] for name, col in aligned.items()}
+
+    index = pd.DatetimeIndex(grid.view("datetime64[ns]"), name=template.name)
+    index = index.tz_localize("UTC").tz_convert(template.tz) if template.tz is not None else index
+    report = AlignmentReport(
+        grid=config.grid, grid_rows=len(keep), rows=len(grid), metrics=gaps, provisional=int(provisional.sum())
+    )
+    return index, aligned, report
+
+
+__all__ = [
+    "AlignmentConfig",
+    "AlignmentReport",
+    "GapPolicy",
+    "MetricGaps",
+    "NowcastConfig",
+    "align_columns",
+    "last_at_or_before",
+    "utc_ns",
+]
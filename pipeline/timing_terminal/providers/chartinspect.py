@@ -15,21 +15,46 @@ NOTE: Tests should NOT hit the live ChartInspect API. Instead, they
 will monkeypatch or feed this provider with recorded JSON fixtures.
 """
 
+import contextlib
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Sequence
+from pathlib import Path
+from datetime import timedelta
+from typing import Mapping, Sequence
+from urllib.parse import urlencode
 
 import pandas as pd
 import requests
-
-from . import MarketDataProvider, MarketSeriesPoint
+from requests.adapters import HTTPAdapter
+
+from . import MarketDataProvider, MarketSeriesArrays, MarketSeriesPoint
+from .aligned import AlignedBuffer
+from .alignment import AlignmentConfig, AlignmentReport, align_columns
+from .http_cache import ResponseCache
+from .json_stream import STREAM_CHUNK_SIZE, parse_chartinspect_stream
+from .retry import (
+    AttemptRecord,
+    CircuitBreaker,
+    CircuitOpenError,
+    FetchCancelledError,
+    RetryPolicy,
+    is_retryable,
+)
+from .series_store import TAIL_OVERLAP_DAYS, RawSeriesStore, merge_tail
 
 logger = logging.getLogger(__name__)
 
 
+# Request path (with query) per metric, relative to TT_CHARTINSPECT_BASE_URL.
+METRIC_PATHS = {
+    "LTH-SOPR": "/onchain/lth-sopr",
+    "LTH-MVRV": "/onchain/lth-mvrv?timeframe=all",
+}
+
+
 @dataclass
 class ChartInspectConfig:
     sopr_url: str
@@ -38,54 +63,266 @@ class ChartInspectConfig:
     max_retries: int = 3
 
 
-def fetch_chartinspect_data(url: str, metric_name: str, timeout: int = 30, max_retries: int = 3) -> pd.DataFrame:
+def _request(
+    http, url: str, timeout: float, headers: Mapping[str, str], conditional: bool
+) -> tuple[int, pd.DataFrame | None, Mapping[str, str]]:
+    """One GET, parsed into a frame (None for a 304 to a conditional request).
+
+    Free of cache, breaker and metrics side effects, so it can be hedged.
+    """
+
+    with http.get(url, timeout=timeout, headers=headers, stream=True) as response:
+        if response.status_code == 304 and conditional:
+            return 304, None, response.headers
+        response.raise_for_status()
+        # Decode the body as it arrives, straight into columnar arrays.
+        try:
+            parsed = parse_chartinspect_stream(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        except ValueError as e:
+            raise ValueError(f"Unexpected data format from {url}: {e}") from e
+    return response.status_code, parsed.to_frame(), response.headers
+
+
+def fetch_chartinspect_data(
+    url: str,
+    metric_name: str,
+    timeout: int = 30,
+    max_retries: int = 3,
+    session: requests.Session | None = None,
+    cache: ResponseCache | None = None,
+    retry: RetryPolicy | None = None,
+) -> pd.DataFrame:
     """Fetch data from ChartInspect API with retry logic.
 
     Ported from market_phase_score.py for self-contained provider usage.
-    Caching is omitted since the pipeline runs daily via CI.
+    With a `ResponseCache`, fresh entries are served from disk and stale
+    ones are revalidated with a conditional GET (a 304 reuses the stored,
+    already-parsed arrays). Retries follow ``retry`` (see `RetryPolicy`):
+    only retryable errors are repeated, with jittered backoff, within the
+    policy's deadline and subject to its circuit breaker. With a
+    `FetchControl` on the policy, requests are hedged on demand and the
+    fetch stops, without touching cache or breaker, once it is cancelled.
 
     Args:
         url: ChartInspect API endpoint URL
         metric_name: Human-readable name for logging
         timeout: Request timeout in seconds
-        max_retries: Number of retry attempts on failure
+        max_retries: Number of attempts when no ``retry`` policy is given
+        session: Optional pooled session to reuse keep-alive connections
+        cache: Optional on-disk response cache
+        retry: Optional retry policy (defaults to ``max_retries`` attempts)
 
     Returns:
         DataFrame with datetime index and metric columns
 
     Raises:
-        RuntimeError: If all retry attempts fail
+        CircuitOpenError: If the host's circuit breaker is open
+        FetchCancelledError: If the policy's `FetchControl` was cancelled
+        RuntimeError: If a non-retryable error occurs or all attempts fail
     """
+    cached = cache.load(url) if cache is not None else None
+    if cached is not None and cache.is_fresh(cached):
+        logger.info(f"Using cached {metric_name} ({len(cached.frame)} records, age {cached.age():.0f}s)")
+        return cached.frame
+
+    policy = retry if retry is not None else RetryPolicy(max_attempts=max_retries)
+    control = policy.control
+    breaker = policy.breaker
+    breaker_key = CircuitBreaker.key(url)
+    if breaker is not None and not breaker.allow(breaker_key):
+        policy.metrics.record(AttemptRecord(metric_name, 0, 0.0, "circuit_open"))
+        raise CircuitOpenError(f"Not fetching {metric_name}: circuit for {breaker_key} is open")
+
     logger.info(f"Fetching {metric_name} from ChartInspect...")
 
+    http = session if session is not None else requests
+    headers = cached.conditional_headers() if cached is not None else {}
+    deadline = time.monotonic() + policy.deadline if policy.deadline is not None else None
+    delay = policy.base_delay
     last_error: Exception | None = None
-    for attempt in range(max_retries):
+    attempts = 0
+    for attempt in range(policy.max_attempts):
+        attempts = attempt + 1
+        request_timeout = timeout if deadline is None else max(min(timeout, deadline - time.monotonic()), 0.001)
+        started = time.perf_counter()
         try:
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
-
-            if "data" in data and isinstance(data["data"], list):
-                df = pd.DataFrame(data["data"])
-                # Try timestamp (ms) first, fall back to date string
-                try:
-                    df["date"] = pd.to_datetime(df["date"], unit="ms", utc=True)
-                except (ValueError, TypeError):
-                    df["date"] = pd.to_datetime(df["date"], utc=True)
-                df.set_index("date", inplace=True)
-                df.sort_index(inplace=True)
-                logger.info(f"Fetched {len(df)} records for {metric_name}")
-                return df
+            if control is not None:
+                status, df, response_headers = control.run(
+                    lambda: _request(http, url, request_timeout, headers, cached is not None)
+                )
             else:
-                raise ValueError(f"Unexpected data format from {url}")
-
+                status, df, response_headers = _request(http, url, request_timeout, headers, cached is not None)
+            elapsed = time.perf_counter() - started
+            if df is None:
+                with policy.guard():
+                    cache.touch(cached)
+                    policy.metrics.record(AttemptRecord(metric_name, attempts, elapsed, "not_modified"))
+                    if breaker is not None:
+                        breaker.record_success(breaker_key)
+                logger.info(f"{metric_name} not modified ({len(cached.frame)} cached records) in {elapsed:.3f}s")
+                return cached.frame
+
+            with policy.guard():
+                policy.metrics.record(AttemptRecord(metric_name, attempts, elapsed, "ok"))
+                if breaker is not None:
+                    breaker.record_success(breaker_key)
+                if cache is not None:
+                    cache.store(
+                        url,
+                        df,
+                        etag=response_headers.get("ETag"),
+                        last_modified=response_headers.get("Last-Modified"),
+                    )
+            logger.info(f"Fetched {len(df)} records for {metric_name} in {elapsed:.3f}s")
+            return df
+
+        except FetchCancelledError:
+            logger.info(f"Abandoned {metric_name} fetch: cancelled by the caller")
+            raise
         except Exception as e:
             last_error = e
-            logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2**attempt)  # exponential backoff
+            elapsed = time.perf_counter() - started
+            retryable = is_retryable(e)
+            outcome = "retryable" if retryable else "fatal"
+            policy.metrics.record(AttemptRecord(metric_name, attempts, elapsed, outcome, str(e)))
+            if not retryable:
+                logger.warning(f"Attempt {attempts} for {metric_name} failed after {elapsed:.3f}s (not retryable): {e}")
+                raise RuntimeError(f"Failed to fetch {metric_name}: {e}") from e
+            logger.warning(f"Attempt {attempts}/{policy.max_attempts} failed after {elapsed:.3f}s: {e}")
+            if attempts == policy.max_attempts:
+                break
+            delay = policy.next_delay(delay, e)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                logger.warning(f"Giving up on {metric_name}: {policy.deadline:.1f}s deadline reached")
+                break
+            policy.metrics.add_backoff(delay)
+            if control is not None:
+                control.sleep(delay)
+            else:
+                time.sleep(delay)
+
+    with policy.guard():
+        if breaker is not None:
+            breaker.record_failure(breaker_key)
+    raise RuntimeError(f"Failed to fetch {metric_name} after {attempts} attempts: {last_error}")
+
+
+def _with_query(url: str, **params: object) -> str:
+    sep = "&" if "?" in url else "?"
+    return f"{url}{sep}{urlencode(params)}"
+
+
+def fetch_chartinspect_incremental(
+    url: str,
+    metric_name: str,
+    store: RawSeriesStore,
+    since_param: str | None = None,
+    timeout: int = 30,
+    max_retries: int = 3,
+    session: requests.Session | None = None,
+    cache: ResponseCache | None = None,
+    retry: RetryPolicy | None = None,
+) -> pd.DataFrame:
+    """Fetch only the days newer than the stored copy of ``metric_name``.
+
+    Falls back to a full fetch when nothing is stored yet. Returns the full
+    merged series (same shape as `fetch_chartinspect_data`) and persists it.
+    """
+
+    local = store.load(metric_name)
+    if local is None or local.empty:
+        full = fetch_chartinspect_data(url, metric_name, timeout, max_retries, session, cache, retry=retry)
+        with retry.guard() if retry is not None else contextlib.nullcontext():
+            store.save(metric_name, full)
+        return full
+
+    cutoff = local.index.max() - timedelta(days=TAIL_OVERLAP_DAYS)
+    if since_param:
+        tail_url = _with_query(url, **{since_param: int(cutoff.timestamp() * 1000)})
+        # Query-specific URLs would only pollute the response cache.
+        tail = fetch_chartinspect_data(tail_url, metric_name, timeout, max_retries, session, retry=retry)
+    else:
+        tail = fetch_chartinspect_data(url, metric_name, timeout, max_retries, session, cache, retry=retry)
+    tail = tail[tail.index >= cutoff]
+
+    merged = merge_tail(local, tail)
+    logger.info(
+        f"{metric_name}: merged {len(tail)} tail records into {len(local)} stored ({len(merged)} total)"
+    )
+    with retry.guard() if retry is not None else contextlib.nullcontext():
+        store.save(metric_name, merged)
+    return merged
+
+
+def fetch_chartinspect_metrics(
+    urls: Mapping[str, str],
+    timeout: int = 30,
+    max_retries: int = 3,
+    session: requests.Session | None = None,
+    cache: ResponseCache | None = None,
+    store: RawSeriesStore | None = None,
+    since_param: str | None = None,
+    retry: RetryPolicy | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Fetch several ChartInspect metrics concurrently.
+
+    All requests share one keep-alive session and run on a thread pool, so
+    wall-clock time approaches the slowest single endpoint rather than the
+    sum of all of them. Retries/backoff happen per metric inside its own
+    worker and do not hold up the others.
+
+    Args:
+        urls: Metric name → endpoint URL
+        timeout: Per-request timeout in seconds
+        max_retries: Retry attempts per metric
+        session: Optional session to use; one is created (and closed) if omitted
+        cache: Optional on-disk response cache shared by all metrics
+        store: Optional raw-series store; when set, each metric is fetched
+            incrementally (see `fetch_chartinspect_incremental`)
+        since_param: API query parameter for the incremental lower bound
+        retry: Optional retry policy shared by all metrics (see `RetryPolicy`)
+
+    Returns:
+        Metric name → DataFrame, as returned by `fetch_chartinspect_data`
 
-    raise RuntimeError(f"Failed to fetch {metric_name} after {max_retries} attempts: {last_error}")
+    Raises:
+        RuntimeError: If any metric fails after all retries
+    """
+    if not urls:
+        return {}
+
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(urls), pool_maxsize=len(urls))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            if store is not None:
+                futures = {
+                    name: pool.submit(
+                        fetch_chartinspect_incremental,
+                        url, name, store, since_param, timeout, max_retries, session, cache, retry,
+                    )
+                    for name, url in urls.items()
+                }
+            else:
+                futures = {
+                    name: pool.submit(
+                        fetch_chartinspect_data, url, name, timeout, max_retries, session, cache, retry
+                    )
+                    for name, url in urls.items()
+                }
+            results = {name: future.result() for name, future in futures.items()}
+    finally:
+        if own_session:
+            session.close()
+
+    logger.info(f"Fetched {len(results)} ChartInspect metrics in {time.perf_counter() - started:.3f}s")
+    return results
 
 
 class ChartInspectMarketDataProvider(MarketDataProvider):
@@ -98,71 +335,141 @@ class ChartInspectMarketDataProvider(MarketDataProvider):
     pre-recorded JSON fixtures to avoid live network calls.
     """
 
-    def __init__(self, sopr_df: pd.DataFrame, mvrv_df: pd.DataFrame) -> None:
+    alignment_report: AlignmentReport | None
+
+    def __init__(
+        self,
+        sopr_df: pd.DataFrame,
+        mvrv_df: pd.DataFrame,
+        alignment: AlignmentConfig | None = None,
+    ) -> None:
         """Initialize provider from pre-loaded SOPR and MVRV dataframes.
 
         This constructor intentionally accepts already-loaded dataframes so
         that unit/integration tests can provide deterministic fixtures
-        without performing any HTTP requests.
+        without performing any HTTP requests. ``alignment`` sets the grid
+        and per-metric gap policies (default: SOPR's timestamps, exact
+        matches only); the outcome is kept in `alignment_report`.
         """
 
-        # Expect both frames indexed by datetime and sorted.
-        self._sopr_df = sopr_df.sort_index()
-        self._mvrv_df = mvrv_df.sort_index()
+        columns = {"lth_sopr": sopr_df["lth_sopr"], "lth_mvrv": mvrv_df["lth_mvrv"]}
 
         # Derive BTC price from MVRV (preferred) or SOPR as fallback.
-        if "btc_price" in self._mvrv_df.columns:
-            btc_price = self._mvrv_df["btc_price"].copy()
-        elif "btc_price" in self._sopr_df.columns:
-            btc_price = self._sopr_df["btc_price"].copy()
-        else:
-            btc_price = pd.Series(dtype="float64")
+        if "btc_price" in mvrv_df.columns:
+            columns["btc_price"] = mvrv_df["btc_price"]
+        elif "btc_price" in sopr_df.columns:
+            columns["btc_price"] = sopr_df["btc_price"]
 
-        # Align on SOPR index for now (as in market_phase_score.py).
-        aligned = pd.DataFrame({
-            "lth_sopr": self._sopr_df["lth_sopr"],
-            "lth_mvrv": self._mvrv_df["lth_mvrv"].reindex(self._sopr_df.index),
-        }).dropna()
+        index, aligned, self.alignment_report = align_columns(columns, alignment)
+        if self.alignment_report.dropped:
+            logger.info(f"Alignment dropped {self.alignment_report.dropped} of {self.alignment_report.grid_rows} rows")
+        self._buffer = AlignedBuffer.from_columns(index, aligned, provisional=self.alignment_report.provisional)
 
-        if not btc_price.empty:
-            aligned["btc_price"] = btc_price.reindex(aligned.index)
+    @property
+    def aligned_frame(self) -> pd.DataFrame:
+        """Return the aligned SOPR/MVRV/BTC frame used for LSD computation.
+
+        The frame is a zero-copy, read-only view of the provider's buffer;
+        call ``.copy()`` before modifying it.
+        """
 
-        self._aligned = aligned.dropna()
+        return self._buffer.frame()
 
     @property
-    def aligned_frame(self) -> pd.DataFrame:
-        """Return the aligned SOPR/MVRV/BTC frame used for LSD computation."""
+    def provisional_since(self) -> int | None:
+        """Epoch seconds of the first nowcast (provisional) row, or None."""
 
-        return self._aligned.copy()
+        return self._buffer.provisional_since
 
     @classmethod
-    def from_config(cls) -> "ChartInspectMarketDataProvider":
+    def from_snapshot(cls, path: Path, mmap: bool = True) -> "ChartInspectMarketDataProvider":
+        """Open a provider over an aligned snapshot written by `save_snapshot`."""
+
+        provider = cls.__new__(cls)
+        provider._buffer = AlignedBuffer.load(path, mmap=mmap)
+        provider.alignment_report = None
+        return provider
+
+    def save_snapshot(self, path: Path, source: str | None = None) -> None:
+        """Persist the aligned buffer for memory-mapped reuse."""
+
+        self._buffer.save(path, source)
+
+    @classmethod
+    def from_config(
+        cls,
+        cache: ResponseCache | None = None,
+        store: RawSeriesStore | None = None,
+        snapshot: Path | None = None,
+        retry: RetryPolicy | None = None,
+        alignment: AlignmentConfig | None = None,
+        snapshot_ttl: float | None = None,
+        base_url: str | None = None,
+    ) -> "ChartInspectMarketDataProvider":
         """Construct provider by fetching live ChartInspect data.
 
         This is an opt-in path controlled by config/env. Tests should
         monkeypatch the underlying fetch helper rather than performing
-        live HTTP calls.
+        live HTTP calls. ``cache`` enables conditional-request caching
+        (see `config.get_http_cache`); ``store`` enables incremental
+        fetching (see `config.get_raw_series_store`), with the API's
+        lower-bound query parameter named by TT_CHARTINSPECT_SINCE_PARAM.
+        With ``snapshot`` the aligned data is written there and the
+        returned provider is memory-mapped over it; a snapshot saved from
+        the same endpoints and alignment less than ``snapshot_ttl`` seconds
+        ago is reused without fetching (see
+        `config.get_aligned_snapshot_ttl`). ``retry`` controls
+        retries (see `config.get_retry_policy`) and ``alignment`` the gap
+        policies (see `config.get_alignment_config`). ``base_url``
+        overrides TT_CHARTINSPECT_BASE_URL.
         """
-        base = os.getenv("TT_CHARTINSPECT_BASE_URL", "https://chartinspect.com/api/charts")
-        sopr_url = f"{base}/onchain/lth-sopr"
-        mvrv_url = f"{base}/onchain/lth-mvrv?timeframe=all"
-
-        sopr_df = fetch_chartinspect_data(sopr_url, "LTH-SOPR")
-        mvrv_df = fetch_chartinspect_data(mvrv_url, "LTH-MVRV")
-
-        return cls(sopr_df=sopr_df, mvrv_df=mvrv_df)
+        base = base_url or os.getenv("TT_CHARTINSPECT_BASE_URL", "https://chartinspect.com/api/charts")
+        since_param = os.getenv("TT_CHARTINSPECT_SINCE_PARAM") or None
+        source = f"{base}|since={since_param}|{alignment or AlignmentConfig()!r}"
+        if snapshot is not None and snapshot_ttl is not None:
+            age = AlignedBuffer.snapshot_age(snapshot, source)
+            if age is not None and age < snapshot_ttl:
+                try:
+                    reused = cls.from_snapshot(snapshot)
+                except ValueError as e:
+                    logger.warning(f"Not reusing aligned snapshot: {e}")
+                else:
+                    logger.info(f"Reusing aligned snapshot at {snapshot} ({len(reused._buffer)} rows, age {age:.0f}s)")
+                    return reused
+
+        frames = fetch_chartinspect_metrics(
+            {name: f"{base}{path}" for name, path in METRIC_PATHS.items()},
+            cache=cache,
+            store=store,
+            since_param=since_param,
+            retry=retry,
+        )
+
+        provider = cls(sopr_df=frames["LTH-SOPR"], mvrv_df=frames["LTH-MVRV"], alignment=alignment)
+        if snapshot is None:
+            return provider
+        provider.save_snapshot(snapshot, source)
+        mapped = cls.from_snapshot(snapshot)
+        mapped.alignment_report = provider.alignment_report
+        return mapped
+
+    def get_btc_price_arrays(self) -> MarketSeriesArrays:
+        if "btc_price" not in self._buffer.columns:
+            return MarketSeriesArrays.empty()
+        return MarketSeriesArrays(self._buffer.epoch_seconds, self._buffer.column("btc_price"))
+
+    def get_lth_metric_arrays(self) -> MarketSeriesArrays:
+        """Array variant of `get_lth_metric_series` (LTH MVRV)."""
+
+        return MarketSeriesArrays(self._buffer.epoch_seconds, self._buffer.column("lth_mvrv"))
 
     def get_btc_price_series(self) -> Sequence[MarketSeriesPoint]:
         series: list[MarketSeriesPoint] = []
-        if "btc_price" not in self._aligned.columns:
+        if "btc_price" not in self._buffer.columns:
             return series
 
-        for ts, value in self._aligned["btc_price"].items():
-            if pd.isna(value):
-                continue
-            if not isinstance(ts, datetime):
-                ts = pd.to_datetime(ts).to_pydatetime()
-            series.append(MarketSeriesPoint(timestamp=ts, value=float(value)))
+        for ts, value in zip(self._buffer.index, self._buffer.column("btc_price").tolist()):
+            series.append(MarketSeriesPoint(timestamp=ts, value=value))
         return series
 
     def get_lth_metric_series(self) -> Sequence[MarketSeriesPoint]:
@@ -177,10 +484,6 @@ class ChartInspectMarketDataProvider(MarketDataProvider):
         """
 
         series: list[MarketSeriesPoint] = []
-        for ts, value in self._aligned["lth_mvrv"].items():
-            if pd.isna(value):
-                continue
-            if not isinstance(ts, datetime):
-                ts = pd.to_datetime(ts).to_pydatetime()
-            series.append(MarketSeriesPoint(timestamp=ts, value=float(value)))
+        for ts, value in zip(self._buffer.index, self._buffer.column("lth_mvrv").tolist()):
+            series.append(MarketSeriesPoint(timestamp=ts, value=value))
         return series
@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+"""Multi-source MarketDataProvider with hedged requests and failover.
+
+`config.get_market_data_provider` used to pick exactly one provider, so a
+slow or failing ChartInspect call held the nightly run for up to
+3 × 30 s plus backoff. `CompositeMarketDataProvider.gather` builds several
+`ProviderSource`s concurrently instead:
+
+- Every source starts at once. A source marked ``hedge=True`` is hedged
+  once it has been running longer than the configured percentile of its
+  recent successful latencies (`LatencyTracker`, optionally persisted
+  between runs): its `FetchControl` makes each HTTP request race a
+  duplicate, and whichever response arrives first is processed (the
+  source itself is built once, so its cache and store see one writer).
+- The whole gather is bounded by ``deadline`` seconds. Sources still
+  running then are reported as ``"timeout"`` and their `FetchControl` is
+  cancelled, so they stop retrying and never write to their cache, store
+  or circuit breaker after `gather` returns (their daemon threads never
+  block exit).
+- Results are merged by timestamp in priority order (the order of
+  ``sources``): each timestamp takes the value of the highest-priority
+  source that has it, so a live source overrides a local snapshot while
+  the snapshot still fills anything the live source is missing.
+
+`CompositeMarketDataProvider.outcomes` records how each source fared and
+`served_by` how many rows of each series came from which source.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import MarketDataProvider, MarketSeriesArrays, MarketSeriesPoint
+from .aligned import AlignedBuffer
+from .alignment import utc_ns
+from .retry import FetchControl
+from ..fileutil import tmp_suffix
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_SECONDS = 120.0
+
+
+@dataclass
+class ProviderSource:
+    """One candidate provider, in priority order within a composite.
+
+    Attributes:
+        name: Label used in logs and source reports.
+        factory: Builds the provider (performing any fetching).
+        hedge: Hedge the source's requests when it is slow (needs ``control``).
+        control: Handle the factory's fetches honour (see `FetchControl`),
+            used to hedge and to cancel them.
+    """
+
+    name: str
+    factory: Callable[[], MarketDataProvider]
+    hedge: bool = False
+    control: FetchControl | None = None
+
+    def __post_init__(self) -> None:
+        if self.hedge and self.control is None:
+            raise ValueError(f"Hedged source {self.name!r} needs a FetchControl")
+
+
+@dataclass
+class HedgePolicy:
+    """When to hedge a slow source's requests.
+
+    Attributes:
+        percentile: Latency percentile of past successes after which to hedge.
+        min_samples: Samples needed before the percentile is trusted.
+        default_delay: Hedge delay (seconds) until then.
+        min_delay: Lower bound on the hedge delay (seconds).
+    """
+
+    percentile: float = 95.0
+    min_samples: int = 5
+    default_delay: float = 10.0
+    min_delay: float = 0.5
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.percentile <= 100.0:
+            raise ValueError("percentile must be in (0, 100]")
+        if self.min_samples < 1:
+            raise ValueError("min_samples must be >= 1")
+        if self.default_delay < 0 or self.min_delay < 0:
+            raise ValueError("hedge delays must be >= 0")
+
+
+class LatencyTracker:
+    """Recent successful latencies per source, optionally persisted as JSON."""
+
+    def __init__(self, path: Path | None = None, window: int = 50) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.path = Path(path) if path is not None else None
+        self.window = window
+        self._samples: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                self._samples = {str(k): [float(x) for x in v][-window:] for k, v in raw.items()}
+            except (OSError, ValueError, AttributeError, TypeError):
+                logger.warning(f"Ignoring unreadable latency history at {self.path}")
+
+    def samples(self, name: str) -> list[float]:
+        with self._lock:
+            return list(self._samples.get(name, ()))
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(name, [])
+            samples.append(float(seconds))
+            del samples[: -self.window]
+
+    def hedge_delay(self, name: str, policy: HedgePolicy) -> float:
+        samples = self.samples(name)
+        if len(samples) < policy.min_samples:
+            return max(policy.default_delay, policy.min_delay)
+        return max(float(np.percentile(samples, policy.percentile)), policy.min_delay)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            payload = json.dumps(self._samples)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{tmp_suffix()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        tmp.replace(self.path)
+
+
+@dataclass
+class SourceOutcome:
+    """How one source fared during `CompositeMarketDataProvider.gather`.
+
+    Attributes:
+        name: Source name.
+        status: "ok", "failed" or "timeout".
+        elapsed: Seconds from gather start until the source resolved.
+        hedged: Whether the source's requests were hedged.
+        winner: For successful sources, "hedge" if a duplicate request
+            answered first, else "primary".
+        error: Last error message for failed sources.
+    """
+
+    name: str
+    status: str
+    elapsed: float
+    hedged: bool = False
+    winner: str | None = None
+    error: str | None = None
+
+
+def _spawn(fn: Callable[[], MarketDataProvider]) -> Future:
+    """Run ``fn`` on a daemon thread so abandoned attempts never block exit."""
+
+    future: Future = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn()
+        except BaseException as e:  # noqa: BLE001 - surfaced via the future
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+@dataclass
+class _Pending:
+    source: ProviderSource
+    hedge_at: float | None
+    hedged: bool = False
+
+
+def _priority_merge(keys: Sequence[np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Union of int64 keys where duplicates resolve to the earliest input.
+
+    Returns the sorted merged keys plus, per key, the input it came from and
+    its row within that input.
+    """
+
+    if not keys:
+        empty = np.empty(0, dtype="int64")
+        return empty, empty, empty
+    all_keys = np.concatenate(keys)
+    origin = np.repeat(np.arange(len(keys)), [len(k) for k in keys])
+    rows = np.concatenate([np.arange(len(k)) for k in keys])
+    # return_index yields first occurrences, i.e. the highest-priority input.
+    merged, first = np.unique(all_keys, return_index=True)
+    return merged, origin[first], rows[first]
+
+
+def _served(names: Sequence[str], origin: np.ndarray) -> dict[str, int]:
+    counts = np.bincount(origin, minlength=len(names))
+    return {name: int(n) for name, n in zip(names, counts) if n}
+
+
+def _merge_arrays(
+    names: Sequence[str], arrays: Sequence[MarketSeriesArrays]
+) -> tuple[MarketSeriesArrays, dict[str, int]]:
+    merged, origin, rows = _priority_merge([a.timestamp for a in arrays])
+    values = np.empty(len(merged), dtype="float64")
+    for i, a in enumerate(arrays):
+        mask = origin == i
+        values[mask] = a.value[rows[mask]]
+    return MarketSeriesArrays(merged, values), _served(names, origin)
+
+
+def _merge_aligned(
+    names: Sequence[str], frames: Sequence[pd.DataFrame], provisional_since: Sequence[int | None]
+) -> tuple[AlignedBuffer, dict[str, int]]:
+    """Row-wise priority merge of aligned frames sharing the top source's columns.
+
+    Everything from the first row taken from a source's provisional tail
+    onwards is provisional in the result.
+    """
+
+    columns = list(frames[0].columns)
+    merged, origin, rows = _priority_merge([utc_ns(f.index) for f in frames])
+    values = np.empty((len(columns), len(merged)), dtype="float64")
+    provisional = np.zeros(len(merged), dtype=bool)
+    for i, frame in enumerate(frames):
+        mask = origin == i
+        values[:, mask] = frame.to_numpy(dtype="float64").T[:, rows[mask]]
+        if provisional_since[i] is not None:
+            provisional[mask] = merged[mask] >= provisional_since[i] * 10**9
+
+    first = pd.DatetimeIndex(frames[0].index)
+    index = pd.DatetimeIndex(pd.to_datetime(merged, utc=True), name=first.name)
+    index = index.tz_convert(first.tz) if first.tz is not None else index.tz_localize(None)
+    n_provisional = len(merged) - int(np.argmax(provisional)) if provisional.any() else 0
+    buffer = AlignedBuffer.from_columns(
+        index, {c: values[j] for j, c in enumerate(columns)}, provisional=n_provisional
+    )
+    return buffer, _served(names, origin)
+
+
+class CompositeMarketDataProvider(MarketDataProvider):
+    """Priority merge of the providers that answered within the deadline.
+
+    Build it with `gather`; the constructor takes already-built providers
+    (highest priority first).
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[tuple[str, MarketDataProvider]],
+        outcomes: Sequence[SourceOutcome] = (),
+    ) -> None:
+        if not providers:
+            raise ValueError("CompositeMarketDataProvider needs at least one provider")
+        names = [name for name, _ in providers]
+        self.outcomes = list(outcomes)
+        self.served_by: dict[str, dict[str, int]] = {}
+
+        self._btc, self.served_by["btc_price"] = _merge_arrays(
+            names, [p.get_btc_price_arrays() for _, p in providers]
+        )
+        self._lth, self.served_by["lth_metric"] = _merge_arrays(
+            names, [p.get_lth_metric_arrays() for _, p in providers]
+        )
+
+        # Aligned SOPR/MVRV data (LSD input) from sources that expose it.
+        aligned = [(n, getattr(p, "aligned_frame", None), getattr(p, "provisional_since", None)) for n, p in providers]
+        aligned = [(n, f, since) for n, f, since in aligned if f is not None]
+        self._buffer: AlignedBuffer | None = None
+        if aligned:
+            columns = list(aligned[0][1].columns)
+            skipped = [n for n, f, _ in aligned if list(f.columns) != columns]
+            if skipped:
+                logger.warning(f"Not merging aligned data from {skipped}: columns differ from {columns}")
+            aligned = [entry for entry in aligned if list(entry[1].columns) == columns]
+            self._buffer, self.served_by["aligned"] = _merge_aligned(*map(list, zip(*aligned)))
+
+    @classmethod
+    def gather(
+        cls,
+        sources: Sequence[ProviderSource],
+        deadline: float = DEFAULT_DEADLINE_SECONDS,
+        policy: HedgePolicy | None = None,
+        latencies: LatencyTracker | None = None,
+    ) -> "CompositeMarketDataProvider":
+        """Build all sources concurrently and merge those that succeed.
+
+        Raises:
+            ValueError: If ``sources`` is empty or ``deadline`` is not positive.
+            RuntimeError: If no source succeeded within ``deadline``.
+        """
+
+        if not sources:
+            raise ValueError("gather needs at least one source")
+        if deadline <= 0:
+            raise ValueError("deadline must be > 0")
+        policy = policy or HedgePolicy()
+        latencies = latencies or LatencyTracker()
+
+        started = time.perf_counter()
+        pending: dict[Future, _Pending] = {}
+        for source in sources:
+            hedge_at = started + latencies.hedge_delay(source.name, policy) if source.hedge else None
+            pending[_spawn(source.factory)] = _Pending(source, hedge_at)
+
+        results: dict[str, MarketDataProvider] = {}
+        outcomes: dict[str, SourceOutcome] = {}
+        hard_stop = started + deadline
+        while pending:
+            now = time.perf_counter()
+            if now >= hard_stop:
+                break
+            for state in pending.values():
+                if state.hedge_at is not None and now >= state.hedge_at:
+                    state.hedge_at = None
+                    state.hedged = True
+                    logger.info(f"Hedging {state.source.name} after {now - started:.3f}s")
+                    state.source.control.hedge()
+
+            wake = min([hard_stop] + [s.hedge_at for s in pending.values() if s.hedge_at is not None])
+            done, _ = wait(pending, timeout=max(wake - time.perf_counter(), 0.0), return_when=FIRST_COMPLETED)
+
+            now = time.perf_counter()
+            for future in done:
+                state = pending.pop(future)
+                name, control = state.source.name, state.source.control
+                error = future.exception()
+                if error is None:
+                    results[name] = future.result()
+                    latencies.record(name, now - started)
+                    winner = "hedge" if control is not None and control.hedge_won else "primary"
+                    outcomes[name] = SourceOutcome(name, "ok", now - started, state.hedged, winner=winner)
+                    continue
+                logger.warning(f"Source {name} failed: {error}")
+                outcomes[name] = SourceOutcome(name, "failed", now - started, state.hedged, error=str(error))
+
+        for state in pending.values():
+            name = state.source.name
+            if state.source.control is not None:
+                state.source.control.cancel()
+            outcomes[name] = SourceOutcome(name, "timeout", time.perf_counter() - started, state.hedged)
+            logger.warning(f"Source {name} did not answer within {deadline:.1f}s")
+
+        latencies.save()
+        ordered = [outcomes[s.name] for s in sources]
+        served = [(s.name, results[s.name]) for s in sources if s.name in results]
+        if not served:
+            summary = ", ".join(f"{o.name}: {o.status} ({o.error})" for o in ordered)
+            raise RuntimeError(f"No market data source succeeded: {summary}")
+        return cls(served, ordered)
+
+    @property
+    def aligned_frame(self) -> pd.DataFrame | None:
+        """Merged aligned SOPR/MVRV/BTC frame (read-only view), if any source had one."""
+
+        return self._buffer.frame() if self._buffer is not None else None
+
+    @property
+    def provisional_since(self) -> int | None:
+        """Epoch seconds of the first provisional aligned row, or None."""
+
+        return self._buffer.provisional_since if self._buffer is not None else None
+
+    def save_snapshot(self, path: Path) -> None:
+        """Persist the merged aligned data (see `ChartInspectMarketDataProvider.from_snapshot`)."""
+
+        if self._buffer is None:
+            raise ValueError("no aligned data to snapshot")
+        self._buffer.save(path)
+
+    def report(self) -> dict:
+        """JSON-friendly summary of source outcomes and per-series provenance."""
+
+        return {"sources": [asdict(o) for o in self.outcomes], "served_by": self.served_by}
+
+    def get_btc_price_arrays(self) -> MarketSeriesArrays:
+        return MarketSeriesArrays(self._btc.timestamp.copy(), self._btc.value.copy())
+
+    def get_lth_metric_arrays(self) -> MarketSeriesArrays:
+        return MarketSeriesArrays(self._lth.timestamp.copy(), self._lth.value.copy())
+
+    def get_btc_price_series(self) -> Sequence[MarketSeriesPoint]:
+        return _points(self._btc)
+
+    def get_lth_metric_series(self) -> Sequence[MarketSeriesPoint]:
+        return _points(self._lth)
+
+
+def _points(arrays: MarketSeriesArrays) -> list[MarketSeriesPoint]:
+    return [
+        MarketSeriesPoint(timestamp=datetime.fromtimestamp(ts, tz=timezone.utc), value=value)
+        for ts, value in zip(arrays.timestamp.tolist(), arrays.value.tolist())
+    ]
+
+
+__all__ = [
+    "CompositeMarketDataProvider",
+    "HedgePolicy",
+    "LatencyTracker",
+    "ProviderSource",
+    "SourceOutcome",
+]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+"""Columnar ``.npz`` storage for datetime-indexed frames.
+
+Shared by the response cache (`http_cache`) and the raw-series store
+(`series_store`). `save_frame` writes the index as int64 epoch-ns (UTC) plus
+one array per column, fsyncs the temp file and renames it into place, so a
+crash leaves either the old file or the new one. A file that is missing,
+empty or truncated anyway raises one of `FRAME_READ_ERRORS` from
+`load_frame`; callers treat those as "not stored".
+"""
+
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..fileutil import fsync_write, tmp_suffix
+
+FRAME_READ_ERRORS = (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile)
+
+
+def save_frame(path: Path, frame: pd.DataFrame) -> None:
+    """Write a datetime-indexed frame as columnar ``.npz`` arrays (atomically).
+
+    The index is stored as int64 epoch-ns (UTC); numeric columns keep their
+    dtype and anything else is stored as fixed-width strings.
+    """
+
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    arrays = {"index": index.asi8, "columns": np.array([str(c) for c in frame.columns], dtype=str)}
+    for i, name in enumerate(frame.columns):
+        col = frame[name]
+        arrays[f"c{i}"] = col.to_numpy() if col.dtype.kind in "biuf" else col.astype(str).to_numpy(dtype=str)
+
+    tmp = path.with_name(f"{path.stem}.{tmp_suffix()}.tmp.npz")
+    fsync_write(tmp, lambda fh: np.savez(fh, **arrays))
+    tmp.replace(path)
+
+
+def load_frame(path: Path, index_name: str | None = None) -> pd.DataFrame:
+    """Inverse of `save_frame`."""
+
+    with np.load(path, allow_pickle=False) as arrays:
+        index = pd.to_datetime(arrays["index"], unit="ns", utc=True)
+        data = {}
+        for i, name in enumerate(arrays["columns"].tolist()):
+            values = arrays[f"c{i}"]
+            data[name] = values.astype(object) if values.dtype.kind == "U" else values
+
+    frame = pd.DataFrame(data, index=index)
+    frame.index.name = index_name
+    return frame
+
+
+__all__ = ["FRAME_READ_ERRORS", "load_frame", "save_frame"]
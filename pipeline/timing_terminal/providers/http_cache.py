@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+"""On-disk conditional-request cache for ChartInspect responses.
+
+Every run used to download (and re-parse) the full ``timeframe=all``
+history. `ResponseCache` keeps, per URL:
+
+- ``<key>.json``: validators (``ETag`` / ``Last-Modified``) and fetch time;
+- ``<key>.npz``: the already-parsed frame as columnar arrays (see
+  `frame_store`).
+
+Within the TTL the cached frame is returned without touching the network.
+After it, `fetch_chartinspect_data` sends a conditional GET; a ``304 Not
+Modified`` refreshes the fetch time and reuses the stored arrays, so neither
+the body nor JSON parsing is paid again.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from ..fileutil import fsync_write, tmp_suffix
+from .frame_store import FRAME_READ_ERRORS, load_frame, save_frame
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+# 2: parsed columns live in the ``.npz`` next to the meta file (1 kept them
+# in the meta JSON); entries of any other version are treated as misses.
+CACHE_VERSION = 2
+
+
+@dataclass
+class CachedResponse:
+    """A cached, already-parsed response plus its HTTP validators."""
+
+    url: str
+    frame: pd.DataFrame
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def age(self, now: float | None = None) -> float:
+        return (time.time() if now is None else now) - self.fetched_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Per-URL store of parsed frames and their HTTP validators."""
+
+    def __init__(self, root: Path, ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+        self.root = Path(root)
+        self.ttl_seconds = float(ttl_seconds)
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.npz"
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry.age() < self.ttl_seconds
+
+    def load(self, url: str) -> CachedResponse | None:
+        meta_path, data_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("version") != CACHE_VERSION or meta.get("url") != url:
+                return None
+            frame = load_frame(data_path, meta.get("index_name"))
+        except FRAME_READ_ERRORS:
+            return None
+
+        return CachedResponse(
+            url=url,
+            frame=frame,
+            fetched_at=float(meta["fetched_at"]),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def store(
+        self,
+        url: str,
+        frame: pd.DataFrame,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> CachedResponse:
+        meta_path, data_path = self._paths(url)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        fetched_at = time.time()
+        save_frame(data_path, frame)
+        self._write_meta(
+            meta_path,
+            {
+                "version": CACHE_VERSION,
+                "url": url,
+                "fetched_at": fetched_at,
+                "etag": etag,
+                "last_modified": last_modified,
+                "index_name": frame.index.name,
+            },
+        )
+        return CachedResponse(url, frame, fetched_at, etag, last_modified)
+
+    def touch(self, entry: CachedResponse) -> None:
+        """Mark ``entry`` as revalidated now (after a 304)."""
+
+        meta_path, _ = self._paths(entry.url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        entry.fetched_at = meta["fetched_at"] = time.time()
+        self._write_meta(meta_path, meta)
+
+    @staticmethod
+    def _write_meta(path: Path, meta: dict) -> None:
+        tmp = path.with_name(f"{path.name}.{tmp_suffix()}.tmp")
+        fsync_write(tmp, lambda fh: fh.write(json.dumps(meta).encode("utf-8")))
+        tmp.replace(path)
+
+
+__all__ = ["CachedResponse", "DEFAULT_TTL_SECONDS", "ResponseCache"]
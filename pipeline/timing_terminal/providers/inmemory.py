@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Sequence
 
-from . import MarketDataProvider, MarketSeriesPoint
+from . import MarketDataProvider, MarketSeriesArrays, MarketSeriesPoint
 
 
 class InMemoryFixtureProvider(MarketDataProvider):
@@ -30,8 +30,17 @@ class InMemoryFixtureProvider(MarketDataProvider):
             for pt in self._btc_series
         ]
 
+        self._btc_arrays = MarketSeriesArrays.from_points(self._btc_series)
+        self._lth_arrays = MarketSeriesArrays.from_points(self._lth_series)
+
     def get_btc_price_series(self) -> Sequence[MarketSeriesPoint]:
         return list(self._btc_series)
 
     def get_lth_metric_series(self) -> Sequence[MarketSeriesPoint]:
         return list(self._lth_series)
+
+    def get_btc_price_arrays(self) -> MarketSeriesArrays:
+        return MarketSeriesArrays(self._btc_arrays.timestamp.copy(), self._btc_arrays.value.copy())
+
+    def get_lth_metric_arrays(self) -> MarketSeriesArrays:
+        return MarketSeriesArrays(self._lth_arrays.timestamp.copy(), self._lth_arrays.value.copy())
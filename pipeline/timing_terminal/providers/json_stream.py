@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+"""Streaming decoder for ChartInspect ``{"data": [...]}`` payloads.
+
+``response.json()`` followed by ``pd.DataFrame(list_of_dicts)`` materializes
+the whole object tree (one dict per day, several Python floats each) before
+anything columnar exists, and then ``pd.to_datetime(unit="ms")`` is tried
+and retried as a string parse on failure.
+
+`parse_chartinspect_stream` reads the body chunk by chunk. The complete
+records in each buffered chunk are decoded in one C call and their fields
+are written straight into preallocated int64 timestamp / float64 metric
+arrays (grown geometrically), so only one chunk's worth of records is ever
+alive as Python objects. The timestamp format is decided once from the
+first record: numbers are epoch milliseconds, strings are parsed in one
+vectorized call at the end.
+"""
+
+import codecs
+import json
+import re
+from dataclasses import dataclass
+from itertools import chain
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+_WS = re.compile(r"[ \t\n\r]*")
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+class _Reader:
+    """Incremental UTF-8 text buffer with JSON token helpers."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk (dropping consumed text); False at end of stream."""
+
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buf = self.buf[self.pos :] + text
+                self.pos = 0
+                return True
+        if not self.eof:
+            self.eof = True
+            text = self._utf8.decode(b"", final=True)
+            if text:
+                self.buf = self.buf[self.pos :] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of stream)."""
+
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Unexpected JSON: expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> object:
+        """Decode the next complete JSON value."""
+
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise ValueError("Truncated JSON payload") from None
+                continue
+            # A value ending exactly at the buffer edge may be a cut-off number.
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+@dataclass
+class ParsedSeries:
+    """Columnar result of a streamed payload.
+
+    Attributes:
+        timestamps: int64 epoch nanoseconds (UTC), in payload order.
+        columns: Metric name → float64 values (NaN where a record lacks it).
+    """
+
+    timestamps: np.ndarray
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame indexed by UTC ``date``, sorted, as `fetch_chartinspect_data` returns."""
+
+        index = pd.DatetimeIndex(self.timestamps.view("datetime64[ns]"), name="date").tz_localize("UTC")
+        frame = pd.DataFrame(self.columns, index=index)
+        if not index.is_monotonic_increasing:
+            frame = frame.sort_index(kind="stable")
+        return frame
+
+
+def _grow(arr: np.ndarray, size: int, fill: float | int) -> np.ndarray:
+    out = np.full(size, fill, dtype=arr.dtype)
+    out[: arr.shape[0]] = arr
+    return out
+
+
+def _as_float(value: object) -> float:
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class _ColumnSink:
+    """Preallocated columnar output, filled one decoded batch at a time."""
+
+    def __init__(self, time_key: str, capacity: int = 4096) -> None:
+        self.time_key = time_key
+        self.capacity = capacity
+        self.n = 0
+        self.ts_ms = np.empty(capacity, dtype="int64")
+        self.ts_text: list[str] | None = None
+        self.columns: dict[str, np.ndarray] = {}
+
+    def add(self, batch: list) -> None:
+        k = len(batch)
+        if not k:
+            return
+        for record in batch:
+            if not isinstance(record, dict) or self.time_key not in record:
+                raise ValueError(f"Unexpected record in data array: {record!r:.80}")
+
+        n, end = self.n, self.n + k
+        if end > self.capacity:
+            while end > self.capacity:
+                self.capacity *= 2
+            self.ts_ms = _grow(self.ts_ms, self.capacity, 0)
+            self.columns = {name: _grow(col, self.capacity, np.nan) for name, col in self.columns.items()}
+
+        raw_ts = [record[self.time_key] for record in batch]
+        if n == 0:
+            # Timestamp format is decided once, from the first record.
+            self.ts_text = [] if isinstance(raw_ts[0], str) else None
+        if self.ts_text is None:
+            try:
+                self.ts_ms[n:end] = raw_ts
+            except (TypeError, ValueError):
+                raise ValueError("Mixed timestamp formats in data array") from None
+        else:
+            self.ts_text.extend(raw_ts)
+
+        # First-appearance order, like pd.DataFrame(list_of_dicts)
+        names = dict.fromkeys(chain.from_iterable(batch))
+        names.pop(self.time_key)
+        for name in names:
+            col = self.columns.get(name)
+            if col is None:
+                col = self.columns[name] = np.full(self.capacity, np.nan)
+            values = [record.get(name) for record in batch]
+            try:
+                # None → NaN, numeric strings are parsed
+                col[n:end] = np.array(values, dtype="float64")
+            except (TypeError, ValueError):
+                col[n:end] = [_as_float(v) for v in values]
+        self.n = end
+
+    def result(self) -> ParsedSeries:
+        n = self.n
+        if self.ts_text is None:
+            timestamps = self.ts_ms[:n] * 1_000_000
+        else:
+            fmt = "ISO8601" if self.ts_text and _ISO_DATE.match(self.ts_text[0]) else None
+            timestamps = pd.to_datetime(self.ts_text, utc=True, format=fmt).asi8
+        return ParsedSeries(timestamps, {name: col[:n] for name, col in self.columns.items()})
+
+
+def _parse_records(reader: _Reader, time_key: str) -> ParsedSeries:
+    reader.expect("[")
+    sink = _ColumnSink(time_key)
+    if reader.peek() == "]":
+        reader.pos += 1
+        return sink.result()
+
+    batched = True
+    while True:
+        batch = None
+        if batched:
+            # Decode every complete record currently buffered in one C call:
+            # records are flat objects, so the last '}' before the array's
+            # closing ']' ends a record.
+            buf, pos = reader.buf, reader.pos
+            stop = buf.find("]", pos)
+            cut = buf.rfind("}", pos, len(buf) if stop == -1 else stop)
+            if cut != -1:
+                try:
+                    batch = json.loads(f"[{buf[pos : cut + 1]}]")
+                except ValueError:
+                    # Nested values or braces inside strings: go record by record.
+                    batched = False
+                else:
+                    reader.pos = cut + 1
+        if batch is None:
+            batch = [reader.value()]
+        sink.add(batch)
+
+        sep = reader.peek()
+        if sep == ",":
+            reader.pos += 1
+        elif sep == "]":
+            reader.pos += 1
+            return sink.result()
+        else:
+            raise ValueError(f"Unexpected JSON: expected ',' or ']' at offset {reader.pos}")
+
+
+def parse_chartinspect_stream(chunks: Iterable[bytes], time_key: str = "date") -> ParsedSeries:
+    """Decode the top-level ``data`` array of a ChartInspect payload.
+
+    Other top-level keys are skipped; reading stops once ``data`` has been
+    decoded.
+
+    Raises:
+        ValueError: If the payload has no ``data`` list or is malformed.
+    """
+
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.peek() != "}":
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "data" and reader.peek() == "[":
+                return _parse_records(reader, time_key)
+            reader.value()
+            if reader.peek() != ",":
+                break
+            reader.pos += 1
+
+    raise ValueError("Unexpected data format: no 'data' array")
+
+
+__all__ = ["ParsedSeries", "STREAM_CHUNK_SIZE", "parse_chartinspect_stream"]
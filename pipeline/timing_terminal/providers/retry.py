@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+"""Retry policy, circuit breaker and attempt metrics for ChartInspect fetches.
+
+`fetch_chartinspect_data` used to sleep a fixed ``2**attempt`` seconds and
+retry on any exception, including 4xx responses and schema errors that can
+never succeed. `RetryPolicy` replaces that loop's knobs:
+
+- Backoff uses decorrelated jitter (``min(cap, uniform(base, 3 * prev))``),
+  honouring a ``Retry-After`` header when the server sends one.
+- `is_retryable` classifies errors: connection failures, timeouts,
+  truncated bodies, 408/425/429 and 5xx are retried; other 4xx, malformed
+  payloads and programming errors fail on the first attempt.
+- ``deadline`` bounds the total time spent on one fetch, including backoff;
+  per-request timeouts are clipped to what is left.
+- An optional `CircuitBreaker`, persisted as JSON between runs, stops
+  calling a host after repeated retryable failures until ``reset_after``
+  seconds have passed, then lets a trial request through.
+- Every attempt's latency and outcome is recorded in `FetchMetrics`.
+- An optional `FetchControl` lets the caller hedge slow requests (a
+  duplicate GET, first response wins) and cancel the fetch once it stops
+  waiting for it.
+"""
+
+import contextlib
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+
+from ..fileutil import tmp_suffix
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = frozenset({408, 425, 429})
+
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of fetching while a host's circuit is open."""
+
+
+class FetchCancelledError(RuntimeError):
+    """Raised inside a fetch whose `FetchControl` was cancelled."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed attempt may succeed if repeated."""
+
+    if isinstance(error, (CircuitOpenError, FetchCancelledError)):
+        return False
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status >= 500 or status in RETRYABLE_STATUS
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return True
+    if isinstance(error, requests.RequestException):
+        return False  # invalid URL, missing schema, ...
+    return isinstance(error, OSError)
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """``Retry-After`` (delta-seconds form) of a failed HTTP response, if any."""
+
+    response = getattr(error, "response", None)
+    raw = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(float(raw), 0.0) if raw is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class AttemptRecord:
+    metric: str
+    attempt: int
+    elapsed: float
+    outcome: str  # "ok" | "not_modified" | "retryable" | "fatal" | "circuit_open"
+    error: str | None = None
+
+
+@dataclass
+class FetchMetrics:
+    """Per-attempt latency/outcome log for one pipeline run (thread-safe)."""
+
+    attempts: list[AttemptRecord] = field(default_factory=list)
+    backoff_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, record: AttemptRecord) -> None:
+        with self._lock:
+            self.attempts.append(record)
+
+    def add_backoff(self, seconds: float) -> None:
+        with self._lock:
+            self.backoff_seconds += seconds
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            attempts = list(self.attempts)
+            backoff = self.backoff_seconds
+        outcomes: dict[str, int] = {}
+        for record in attempts:
+            outcomes[record.outcome] = outcomes.get(record.outcome, 0) + 1
+        return {
+            "attempts": len(attempts),
+            "outcomes": outcomes,
+            "attempt_seconds": round(sum(r.elapsed for r in attempts), 3),
+            "max_attempt_seconds": round(max((r.elapsed for r in attempts), default=0.0), 3),
+            "backoff_seconds": round(backoff, 3),
+        }
+
+
+class CircuitBreaker:
+    """Per-host consecutive-failure breaker, optionally persisted as JSON.
+
+    After ``failure_threshold`` consecutive failed fetches the host's circuit
+    opens; `allow` then returns False until ``reset_after`` seconds have
+    passed, after which trial requests are let through (half-open). A
+    success closes the circuit, another failure re-opens it.
+    """
+
+    def __init__(self, path: Path | None = None, failure_threshold: int = 3, reset_after: float = 600.0) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        if reset_after < 0:
+            raise ValueError("reset_after must be >= 0")
+        self.path = Path(path) if path is not None else None
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._state: dict[str, dict] = {}
+        if self.path is not None and self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                self._state = {
+                    str(k): {"failures": int(v["failures"]), "opened_at": v.get("opened_at")} for k, v in raw.items()
+                }
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                logger.warning(f"Ignoring unreadable circuit breaker state at {self.path}")
+
+    @staticmethod
+    def key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            entry = self._state.get(key)
+        if entry is None or entry["opened_at"] is None:
+            return "closed"
+        if time.time() - entry["opened_at"] < self.reset_after:
+            return "open"
+        return "half-open"
+
+    def allow(self, key: str) -> bool:
+        return self.state(key) != "open"
+
+    def record_success(self, key: str) -> None:
+        with self._lock:
+            if self._state.pop(key, None) is None:
+                return
+        self._save()
+
+    def record_failure(self, key: str) -> None:
+        with self._lock:
+            entry = self._state.setdefault(key, {"failures": 0, "opened_at": None})
+            entry["failures"] += 1
+            if entry["failures"] >= self.failure_threshold:
+                entry["opened_at"] = time.time()
+                logger.warning(f"Circuit for {key} open after {entry['failures']} consecutive failures")
+        self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            payload = json.dumps(self._state)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{tmp_suffix()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        tmp.replace(self.path)
+
+
+class FetchControl:
+    """Caller-side handle on fetches running on its behalf in other threads.
+
+    `hedge` asks every request made through `run` (now and later) to race a
+    duplicate request; only the HTTP request is duplicated, the winner's
+    result is processed once. `cancel` stops the fetch: requests in flight
+    are abandoned, no further attempt or backoff happens, and side effects
+    wrapped in `guard` (cache, store and breaker writes) never run once
+    `cancel` has returned.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._hedging = False
+        self._cancelled = False
+        self.hedge_won = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def hedge(self) -> None:
+        with self._cond:
+            self._hedging = True
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def check(self) -> None:
+        if self._cancelled:
+            raise FetchCancelledError("Fetch cancelled by its caller")
+
+    @contextlib.contextmanager
+    def guard(self) -> Iterator[None]:
+        """Run the block only if not cancelled; `cancel` waits for it to finish."""
+
+        with self._cond:
+            self.check()
+            yield
+
+    def sleep(self, seconds: float) -> None:
+        """Back off for ``seconds``, returning early (raising) on `cancel`."""
+
+        with self._cond:
+            self._cond.wait_for(lambda: self._cancelled, timeout=seconds)
+        self.check()
+
+    def run(self, request: Callable[[], T]) -> T:
+        """Return ``request()``, hedged once `hedge` has been called.
+
+        ``request`` runs on daemon threads and must be free of side
+        effects: an abandoned duplicate may still be running afterwards.
+        """
+
+        finished: list[tuple[str, T | None, BaseException | None]] = []
+
+        def start(label: str) -> None:
+            def target() -> None:
+                try:
+                    outcome = (label, request(), None)
+                except BaseException as e:  # noqa: BLE001 - re-raised by run
+                    outcome = (label, None, e)
+                with self._cond:
+                    finished.append(outcome)
+                    self._cond.notify_all()
+
+            threading.Thread(target=target, daemon=True).start()
+
+        start("primary")
+        running, hedged = 1, False
+        with self._cond:
+            while True:
+                self._cond.wait_for(lambda: finished or self._cancelled or (self._hedging and not hedged))
+                self.check()
+                if self._hedging and not hedged:
+                    start("hedge")
+                    running, hedged = running + 1, True
+                    continue
+                label, result, error = finished.pop(0)
+                running -= 1
+                if error is None:
+                    self.hedge_won = self.hedge_won or label == "hedge"
+                    return result  # type: ignore[return-value]
+                if running == 0:
+                    raise error
+
+
+@dataclass
+class RetryPolicy:
+    """How `fetch_chartinspect_data` retries.
+
+    Attributes:
+        max_attempts: Attempts per fetch (including the first).
+        base_delay: Minimum backoff in seconds.
+        max_delay: Backoff cap in seconds.
+        deadline: Total seconds per fetch, backoff included (None → unbounded).
+        breaker: Optional circuit breaker shared across fetches and runs.
+        metrics: Attempt log for the current run.
+        seed: Seed for the jitter RNG (None → nondeterministic).
+        control: Optional caller handle to hedge or cancel fetches.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    deadline: float | None = 60.0
+    breaker: CircuitBreaker | None = None
+    metrics: FetchMetrics = field(default_factory=FetchMetrics)
+    seed: int | None = None
+    control: FetchControl | None = None
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        if self.base_delay < 0 or self.max_delay < self.base_delay:
+            raise ValueError("require 0 <= base_delay <= max_delay")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError("deadline must be > 0")
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    def next_delay(self, previous: float, error: BaseException | None = None) -> float:
+        """Decorrelated-jitter backoff following a sleep of ``previous`` seconds."""
+
+        with self._rng_lock:
+            delay = self._rng.uniform(self.base_delay, max(previous, self.base_delay) * 3)
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, self.max_delay)
+
+    def guard(self) -> contextlib.AbstractContextManager:
+        """Context for side effects that must not outlive a cancelled fetch."""
+
+        return self.control.guard() if self.control is not None else contextlib.nullcontext()
+
+
+__all__ = [
+    "AttemptRecord",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "FetchCancelledError",
+    "FetchControl",
+    "FetchMetrics",
+    "RetryPolicy",
+    "is_retryable",
+    "retry_after_seconds",
+]
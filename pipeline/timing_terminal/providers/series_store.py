@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+"""Local store of raw ChartInspect series for incremental fetching.
+
+The LTH series only ever grow by a day at a time, yet a full fetch
+downloads and parses the whole history since 2009. `RawSeriesStore` keeps
+the last fetched frame per metric (columnar ``.npz``, see `frame_store`) and
+`chartinspect.fetch_chartinspect_incremental` only asks for what is missing
+(a missing or torn file means a full fetch):
+
+- With ``since_param`` (the API's "from" query parameter name), the request
+  carries the latest stored timestamp minus `TAIL_OVERLAP_DAYS`, so payload
+  and parse time stay constant.
+- Without it, the full response is fetched (still subject to the response
+  cache) and trimmed locally before merging.
+
+The overlap re-fetches the last few days so provisional values revised
+upstream replace the stored ones. Merged rows keep the newest value per
+timestamp.
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from .frame_store import FRAME_READ_ERRORS, load_frame, save_frame
+
+TAIL_OVERLAP_DAYS = 2
+
+
+class RawSeriesStore:
+    """Per-metric on-disk copy of raw ChartInspect frames."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, metric_name: str) -> Path:
+        slug = re.sub(r"[^a-z0-9]+", "_", metric_name.lower()).strip("_")
+        return self.root / f"{slug}.npz"
+
+    def load(self, metric_name: str) -> pd.DataFrame | None:
+        try:
+            return load_frame(self._path(metric_name), index_name="date")
+        except FRAME_READ_ERRORS:
+            # Missing or torn (crash mid-write): fall back to a full fetch.
+            return None
+
+    def save(self, metric_name: str, frame: pd.DataFrame) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        save_frame(self._path(metric_name), frame)
+
+
+def merge_tail(local: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Merge freshly fetched rows into the stored frame (tail wins on overlap)."""
+
+    if tail.empty:
+        return local
+    merged = pd.concat([local[local.index < tail.index.min()], tail])
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index(kind="stable")
+
+
+__all__ = ["RawSeriesStore", "TAIL_OVERLAP_DAYS", "merge_tail"]
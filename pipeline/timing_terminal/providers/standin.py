@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+"""Local ChartInspect stand-in server with record/replay and fault injection.
+
+Provider tests and benchmarks need the real HTTP path (connections, retries,
+streaming parse, conditional requests) without touching the network.
+`ChartInspectStandIn` serves recorded or synthetic ChartInspect payloads
+from a background thread:
+
+- Payloads are keyed by request path (including the query string, e.g.
+  ``/onchain/lth-mvrv?timeframe=all``). `record_payloads` captures live
+  responses to a directory and `load_recordings` replays them;
+  `resize_payload` trims or extends a recording to any number of rows and
+  `synthetic_payloads` generates both metrics from scratch.
+- Responses carry an ``ETag`` and honour ``If-None-Match`` (304).
+- With ``since_param`` the named query parameter filters rows to
+  ``date >= value`` (epoch ms), mimicking an API-side lower bound.
+- `FaultConfig` injects latency, 5xx responses and truncated bodies.
+
+Run standalone with ``python -m timing_terminal.providers.standin``.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Mapping
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+import requests
+
+from .chartinspect import METRIC_PATHS
+
+DAY_MS = 86_400_000
+DEFAULT_START_MS = 1_230_940_800_000  # 2009-01-03
+
+METRIC_COLUMNS = {"LTH-SOPR": "lth_sopr", "LTH-MVRV": "lth_mvrv"}
+
+
+@dataclass
+class FaultConfig:
+    """Faults injected by the stand-in.
+
+    Attributes:
+        latency: Seconds slept before each response.
+        jitter: Extra uniformly-random latency in ``[0, jitter]`` seconds.
+        error_rate: Fraction of requests answered with ``error_status``.
+        error_status: Status code for injected errors.
+        truncate_rate: Fraction of 200 responses whose body is cut in half
+            (``Content-Length`` still announces the full size).
+        seed: Seed for the fault RNG (None → nondeterministic).
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    truncate_rate: float = 0.0
+    seed: int | None = None
+
+
+@dataclass
+class RequestRecord:
+    path: str
+    status: int
+    if_none_match: str | None = None
+    fault: str | None = None
+    # time.monotonic() when the handler started / logged its response.
+    started: float = 0.0
+    finished: float = 0.0
+
+
+def _normalize(path: str, since_param: str | None) -> tuple[str, str | None]:
+    """Split the lower-bound parameter off a request path."""
+
+    parts = urlsplit(path)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    since = None
+    if since_param:
+        since = next((v for k, v in query if k == since_param), None)
+        query = [(k, v) for k, v in query if k != since_param]
+    return (f"{parts.path}?{urlencode(query)}" if query else parts.path), since
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        self.server.owner._handle(self)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "ChartInspectStandIn"
+
+
+class ChartInspectStandIn:
+    """Threaded local HTTP server replaying ChartInspect payloads."""
+
+    def __init__(
+        self,
+        payloads: Mapping[str, bytes] | None = None,
+        faults: FaultConfig | None = None,
+        since_param: str | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.payloads: dict[str, bytes] = dict(payloads or {})
+        self.faults = faults or FaultConfig()
+        self.since_param = since_param
+        self.requests: list[RequestRecord] = []
+        self._rng = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.owner = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        return '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+    def start(self) -> "ChartInspectStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ChartInspectStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _draw(self) -> tuple[float, float, float]:
+        with self._lock:
+            return self._rng.random(), self._rng.random(), self._rng.random()
+
+    def _log(self, record: RequestRecord, started: float) -> None:
+        record.started, record.finished = started, time.monotonic()
+        with self._lock:
+            self.requests.append(record)
+
+    def _handle(self, handler: _Handler) -> None:
+        started = time.monotonic()
+        f = self.faults
+        jitter_u, error_u, truncate_u = self._draw()
+        delay = f.latency + f.jitter * jitter_u
+        if delay > 0:
+            time.sleep(delay)
+
+        path, since = _normalize(handler.path, self.since_param)
+        if_none_match = handler.headers.get("If-None-Match")
+        body = self.payloads.get(path)
+
+        if error_u < f.error_rate:
+            self._log(RequestRecord(handler.path, f.error_status, if_none_match, "error"), started)
+            self._send(handler, f.error_status, b'{"error": "injected"}')
+            return
+        if body is None:
+            self._log(RequestRecord(handler.path, 404, if_none_match), started)
+            self._send(handler, 404, b'{"error": "not found"}')
+            return
+
+        if since is not None:
+            body = _filter_since(body, int(since))
+        etag = self.etag(body)
+        if if_none_match == etag:
+            self._log(RequestRecord(handler.path, 304, if_none_match), started)
+            self._send(handler, 304, b"", etag=etag)
+            return
+
+        if truncate_u < f.truncate_rate:
+            self._log(RequestRecord(handler.path, 200, if_none_match, "truncate"), started)
+            self._send(handler, 200, body, etag=etag, truncate=True)
+            return
+        self._log(RequestRecord(handler.path, 200, if_none_match), started)
+        self._send(handler, 200, body, etag=etag)
+
+    @staticmethod
+    def _send(handler: _Handler, status: int, body: bytes, etag: str | None = None, truncate: bool = False) -> None:
+        handler.send_response(status)
+        if etag:
+            handler.send_header("ETag", etag)
+        if status != 304:
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(body)))
+        else:
+            handler.send_header("Content-Length", "0")
+        if truncate:
+            handler.send_header("Connection", "close")
+            handler.close_connection = True
+        handler.end_headers()
+        if status != 304:
+            handler.wfile.write(body[: len(body) // 2] if truncate else body)
+        handler.wfile.flush()
+
+
+def _filter_since(body: bytes, since_ms: int) -> bytes:
+    payload = json.loads(body)
+    payload["data"] = [row for row in payload["data"] if row["date"] >= since_ms]
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def synthetic_payloads(rows: int, seed: int = 0, start_ms: int = DEFAULT_START_MS) -> dict[str, bytes]:
+    """Generate LTH-SOPR/LTH-MVRV payloads of ``rows`` daily records each."""
+
+    rng = np.random.default_rng(seed)
+    dates = (start_ms + np.arange(rows, dtype="int64") * DAY_MS).tolist()
+    price = (1000.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.03, rows)))).round(2).tolist()
+    series = {
+        "LTH-SOPR": (1.0 + np.cumsum(rng.normal(0, 0.01, rows)) / 10).round(6).tolist(),
+        "LTH-MVRV": (2.0 + np.abs(np.cumsum(rng.normal(0, 0.05, rows)))).round(6).tolist(),
+    }
+    payloads = {}
+    for metric, values in series.items():
+        column = METRIC_COLUMNS[metric]
+        data = [{"date": d, column: v, "btc_price": p} for d, v, p in zip(dates, values, price)]
+        payloads[METRIC_PATHS[metric]] = json.dumps({"data": data}, separators=(",", ":")).encode("utf-8")
+    return payloads
+
+
+def resize_payload(body: bytes, rows: int) -> bytes:
+    """Trim a recorded payload to its last ``rows`` records, or extend it.
+
+    Extension prepends earlier days (one per day before the first record)
+    cycling through the recorded values, so the most recent data stays real.
+    """
+
+    payload = json.loads(body)
+    data = payload["data"]
+    if not data:
+        raise ValueError("cannot resize an empty payload")
+    if rows <= len(data):
+        payload["data"] = data[len(data) - rows :]
+    else:
+        first = data[0]["date"]
+        missing = rows - len(data)
+        extra = [dict(data[i % len(data)], date=first - (missing - i) * DAY_MS) for i in range(missing)]
+        payload["data"] = extra + data
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _recording_name(path: str) -> str:
+    return hashlib.sha256(path.encode("utf-8")).hexdigest()[:16] + ".json"
+
+
+def record_payloads(base_url: str, directory: Path, paths: Mapping[str, str] = METRIC_PATHS) -> None:
+    """Fetch ``paths`` from ``base_url`` and store the raw bodies for replay."""
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    index = {}
+    with requests.Session() as session:
+        for path in paths.values():
+            response = session.get(f"{base_url}{path}", timeout=60)
+            response.raise_for_status()
+            name = _recording_name(path)
+            (directory / name).write_bytes(response.content)
+            index[path] = name
+    (directory / "index.json").write_text(json.dumps(index, indent=2), encoding="utf-8")
+
+
+def load_recordings(directory: Path, rows: int | None = None) -> dict[str, bytes]:
+    """Load payloads saved by `record_payloads`, optionally resized to ``rows``."""
+
+    directory = Path(directory)
+    index = json.loads((directory / "index.json").read_text(encoding="utf-8"))
+    payloads = {path: (directory / name).read_bytes() for path, name in index.items()}
+    if rows is not None:
+        payloads = {path: resize_payload(body, rows) for path, body in payloads.items()}
+    return payloads
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recordings", type=Path, help="replay payloads from this directory")
+    parser.add_argument("--record-from", help="record from this base URL into --recordings, then exit")
+    parser.add_argument("--rows", type=int, default=None, help="resize (or synthesize) payloads to N rows")
+    parser.add_argument("--since-param", default=None)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.record_from:
+        if args.recordings is None:
+            parser.error("--record-from requires --recordings")
+        record_payloads(args.record_from, args.recordings)
+        print(f"Recorded {len(METRIC_PATHS)} payloads to {args.recordings}")
+        return
+
+    if args.recordings is not None:
+        payloads = load_recordings(args.recordings, args.rows)
+    else:
+        payloads = synthetic_payloads(args.rows or 6000, seed=args.seed or 0)
+    faults = FaultConfig(args.latency, args.jitter, args.error_rate, 503, args.truncate_rate, args.seed)
+    standin = ChartInspectStandIn(payloads, faults, since_param=args.since_param, port=args.port)
+    print(f"ChartInspect stand-in on {standin.base_url} (TT_CHARTINSPECT_BASE_URL)")
+    with standin:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+__all__ = [
+    "ChartInspectStandIn",
+    "FaultConfig",
+    "RequestRecord",
+    "load_recordings",
+    "record_payloads",
+    "resize_payload",
+    "synthetic_payloads",
+]
+
+
+if __name__ == "__main__":
+    main()
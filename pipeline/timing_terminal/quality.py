@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Iterable
 
-from .models import PhasePoint, DataQuality
+from .models import PhaseFrame, PhasePoint, DataQuality
 
 
 @dataclass
@@ -20,7 +20,7 @@ class DataQualityConfig:
 
 
 def evaluate_data_quality(
-    points: Iterable[PhasePoint],
+    points: Iterable[PhasePoint] | PhaseFrame,
     *,
     now: datetime | None = None,
     config: DataQualityConfig | None = None,
@@ -34,15 +34,21 @@ def evaluate_data_quality(
     - Else → "complete"
     """
 
-    pts = list(points)
     if config is None:
         config = DataQualityConfig()
 
-    if not pts:
+    if isinstance(points, PhaseFrame):
+        count = len(points)
+        latest_ts = points.latest_timestamp()
+    else:
+        pts = list(points)
+        count = len(pts)
+        latest_ts = max((p.timestamp for p in pts), default=None)
+
+    if latest_ts is None:
         return "stale"
 
     # Determine age of the latest point
-    latest_ts = max(p.timestamp for p in pts)
     if latest_ts.tzinfo is None:
         latest_ts = latest_ts.replace(tzinfo=timezone.utc)
 
@@ -55,7 +61,7 @@ def evaluate_data_quality(
     if age > timedelta(hours=config.max_age_hours):
         return "stale"
 
-    if len(pts) < config.expected_point_count:
+    if count < config.expected_point_count:
         return "partial"
 
     return "complete"  # type: ignore[return-value]
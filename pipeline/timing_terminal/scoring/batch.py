@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+"""Multi-series LSD scoring across a process pool.
+
+The pipeline scores one SOPR/MVRV pair, but research and calibration runs
+score many cohorts and metric variants (alternate LTH definitions, MVRV
+sources, ...) with the same `compute_lsd` logic. The kernel is pure-Python
+per step and therefore GIL-bound, so `compute_lsd_batch` fans independent
+series out over a `ProcessPoolExecutor`.
+
+Inputs are packed once into a shared-memory float64 buffer (all SOPR values
+followed by all MVRV values, addressed by per-series offsets). Workers attach
+to it by name and write results into a second shared output buffer, so no
+DataFrames or arrays are pickled per task — only names, offsets and scalar
+parameters.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Sequence
+
+import numpy as np
+
+from .kernel import LSDKernel
+from .lsd import _smooth_in_place
+from .smoothing import EdgePolicy
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to a block owned (and unlinked) by the creating process.
+
+    Pool workers share the parent's resource tracker, so a plain attach only
+    re-registers an already tracked name; Python >= 3.13 can skip it.
+    """
+
+    try:
+        return SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        return SharedMemory(name=name)
+
+
+def _score_into(
+    sopr: np.ndarray,
+    mvrv: np.ndarray,
+    out: np.ndarray,
+    params: dict,
+    edge: EdgePolicy,
+) -> None:
+    LSDKernel(**params).run(sopr, mvrv, out=out)
+    _smooth_in_place(out, window=21, poly_order=3, edge=edge)
+
+
+def _score_slice(
+    in_name: str,
+    out_name: str,
+    total: int,
+    offset: int,
+    length: int,
+    params: dict,
+    edge: EdgePolicy,
+) -> None:
+    shm_in = _attach(in_name)
+    shm_out = _attach(out_name)
+    try:
+        inputs = np.ndarray((2, total), dtype="float64", buffer=shm_in.buf)
+        outputs = np.ndarray((total,), dtype="float64", buffer=shm_out.buf)
+        end = offset + length
+        _score_into(inputs[0, offset:end], inputs[1, offset:end], outputs[offset:end], params, edge)
+        del inputs, outputs
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+
+def compute_lsd_batch(
+    series: Sequence[tuple[Sequence[float] | np.ndarray, Sequence[float] | np.ndarray]],
+    *,
+    max_workers: int | None = None,
+    lookback_window: int = 365 * 2,
+    mvrv_weight: float = 0.6,
+    sopr_weight: float = 0.4,
+    capitulation_threshold: float = 0.95,
+    euphoria_threshold: float = 4.0,
+    edge: EdgePolicy = "centred",
+) -> np.ndarray:
+    """Score many independent (lth_sopr, lth_mvrv) pairs with `compute_lsd` logic.
+
+    Args:
+        series: One ``(lth_sopr, lth_mvrv)`` pair per cohort/variant. Pairs may
+            have different lengths; within a pair both must match.
+        max_workers: Process count (defaults to ``os.cpu_count()``). With one
+            worker, or one series, scoring runs in-process.
+        lookback_window, mvrv_weight, sopr_weight, capitulation_threshold,
+        euphoria_threshold, edge: As for `compute_lsd`.
+
+    Returns:
+        float64 array of shape ``(len(series), max_length)``; row i holds the
+        LSD values for pair i, right-padded with NaN.
+    """
+
+    pairs = [
+        (np.asarray(sopr, dtype="float64"), np.asarray(mvrv, dtype="float64"))
+        for sopr, mvrv in series
+    ]
+    for sopr, mvrv in pairs:
+        if sopr.shape != mvrv.shape:
+            raise ValueError("lth_sopr and lth_mvrv must have the same length")
+
+    lengths = np.array([sopr.shape[0] for sopr, _ in pairs], dtype="int64")
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype("int64") if len(pairs) else lengths
+    total = int(lengths.sum())
+    result = np.full((len(pairs), int(lengths.max()) if len(pairs) else 0), np.nan)
+
+    params = dict(
+        lookback_window=lookback_window,
+        mvrv_weight=mvrv_weight,
+        sopr_weight=sopr_weight,
+        capitulation_threshold=capitulation_threshold,
+        euphoria_threshold=euphoria_threshold,
+    )
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(pairs) <= 1 or total == 0:
+        for row, (sopr, mvrv) in enumerate(pairs):
+            _score_into(sopr, mvrv, result[row, : sopr.shape[0]], params, edge)
+        return result
+
+    shm_in = SharedMemory(create=True, size=2 * total * 8)
+    shm_out = SharedMemory(create=True, size=total * 8)
+    try:
+        inputs = np.ndarray((2, total), dtype="float64", buffer=shm_in.buf)
+        outputs = np.ndarray((total,), dtype="float64", buffer=shm_out.buf)
+        for (sopr, mvrv), offset, length in zip(pairs, offsets.tolist(), lengths.tolist()):
+            inputs[0, offset : offset + length] = sopr
+            inputs[1, offset : offset + length] = mvrv
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(pairs))) as pool:
+            futures = [
+                pool.submit(
+                    _score_slice, shm_in.name, shm_out.name, total, offset, length, params, edge
+                )
+                for offset, length in zip(offsets.tolist(), lengths.tolist())
+            ]
+            for future in futures:
+                future.result()
+
+        for row, (offset, length) in enumerate(zip(offsets.tolist(), lengths.tolist())):
+            result[row, :length] = outputs[offset : offset + length]
+        del inputs, outputs
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+        shm_out.close()
+        shm_out.unlink()
+
+    return result
+
+
+__all__ = ["compute_lsd_batch"]
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+"""Content-addressed on-disk cache for computed LSD series.
+
+Research scripts, backfills and the nightly job often recompute identical
+LSD series from identical inputs. `ArrayCache` stores results as compact
+``.npy`` arrays keyed by a SHA-256 of the input arrays plus every parameter,
+so a rerun with unchanged upstream data is a single file read.
+
+- Keys cover dtype, shape and raw bytes of each input array, the parameter
+  values and a per-function namespace (bump the version suffix when the
+  computation changes).
+- The cache is size-bounded: after each write, least-recently-used entries
+  (by file mtime, refreshed on every hit) are evicted until the total size
+  is within ``max_bytes``.
+- Hit/miss/eviction counters are available via `ArrayCache.stats`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..fileutil import fsync_write, tmp_suffix
+from .lsd import _savitzky_golay_smooth, compute_lsd
+from .smoothing import EdgePolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class ArrayCache:
+    """Size-bounded LRU cache of float arrays on disk."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.stats = CacheStats()
+
+    @staticmethod
+    def make_key(namespace: str, arrays: Sequence[np.ndarray], params: dict) -> str:
+        h = hashlib.sha256()
+        h.update(namespace.encode("utf-8"))
+        # repr() keeps floats exact, sort_keys keeps the key order-independent
+        h.update(json.dumps(params, sort_keys=True, default=repr).encode("utf-8"))
+        for arr in arrays:
+            arr = np.ascontiguousarray(arr)
+            h.update(f"{arr.dtype.str}{arr.shape}".encode("utf-8"))
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npy"
+
+    def get(self, key: str) -> np.ndarray | None:
+        path = self._path(key)
+        try:
+            arr = np.load(path, allow_pickle=False)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except (OSError, ValueError, EOFError) as exc:
+            # Torn or corrupt entry: drop it so the next put() rewrites it.
+            logger.warning(f"Discarding unreadable cache entry {path}: {exc}")
+            path.unlink(missing_ok=True)
+            self.stats.misses += 1
+            return None
+        # Refresh mtime so eviction is least-recently-used, not least-recently-written.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats.hits += 1
+        return arr
+
+    def put(self, key: str, arr: np.ndarray) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{tmp_suffix()}.tmp")
+        fsync_write(tmp, lambda fh: np.save(fh, np.ascontiguousarray(arr), allow_pickle=False))
+        tmp.replace(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*.npy"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats.evictions += 1
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        for path in self.root.glob("*/*.npy"):
+            path.unlink(missing_ok=True)
+
+
+def cached_compute_lsd(
+    lth_sopr: Iterable[float] | pd.Series,
+    lth_mvrv: Iterable[float] | pd.Series,
+    *,
+    cache: ArrayCache | None = None,
+    lookback_window: int = 365 * 2,
+    mvrv_weight: float = 0.6,
+    sopr_weight: float = 0.4,
+    capitulation_threshold: float = 0.95,
+    euphoria_threshold: float = 4.0,
+    edge: EdgePolicy = "centred",
+) -> pd.Series:
+    """`compute_lsd` with an optional content-addressed cache in front of it."""
+
+    params = dict(
+        lookback_window=lookback_window,
+        mvrv_weight=mvrv_weight,
+        sopr_weight=sopr_weight,
+        capitulation_threshold=capitulation_threshold,
+        euphoria_threshold=euphoria_threshold,
+        edge=edge,
+    )
+    sopr_s = pd.Series(lth_sopr)
+    mvrv_s = pd.Series(lth_mvrv)
+    if cache is None:
+        return compute_lsd(sopr_s, mvrv_s, **params)
+
+    key = cache.make_key(
+        "compute_lsd/v1",
+        [sopr_s.to_numpy(dtype="float64"), mvrv_s.to_numpy(dtype="float64")],
+        params,
+    )
+    values = cache.get(key)
+    if values is not None:
+        return pd.Series(values, index=sopr_s.index)
+
+    result = compute_lsd(sopr_s, mvrv_s, **params)
+    cache.put(key, result.to_numpy(dtype="float64"))
+    return result
+
+
+def cached_savitzky_golay_smooth(
+    series: pd.Series,
+    window: int = 21,
+    poly_order: int = 3,
+    edge: EdgePolicy = "centred",
+    *,
+    cache: ArrayCache | None = None,
+) -> pd.Series:
+    """`lsd._savitzky_golay_smooth` with an optional cache in front of it."""
+
+    if cache is None:
+        return _savitzky_golay_smooth(series, window, poly_order, edge=edge)
+
+    params = dict(window=window, poly_order=poly_order, edge=edge)
+    key = cache.make_key("savitzky_golay_smooth/v1", [series.to_numpy(dtype="float64")], params)
+    values = cache.get(key)
+    if values is not None:
+        return pd.Series(values, index=series.index, name=series.name)
+
+    result = _savitzky_golay_smooth(series, window, poly_order, edge=edge)
+    cache.put(key, result.to_numpy(dtype="float64"))
+    return result
+
+
+__all__ = [
+    "ArrayCache",
+    "CacheStats",
+    "cached_compute_lsd",
+    "cached_savitzky_golay_smooth",
+]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+"""Fused two-series LSD kernel.
+
+`compute_lsd` used to run two independent rolling-rank passes (MVRV, SOPR)
+and then build several full-length temporary Series for weighting, regime
+masks, multipliers and clipping. `LSDKernel` does all of that per step in a
+single pass over the aligned inputs and writes the unsmoothed score straight
+into one preallocated float64 buffer.
+
+Per-step arithmetic is the same float64 sequence as the vectorized version
+(weighted sum, x0.5 on capitulation, x1.2 on euphoria, clip to [0, 100]), so
+outputs are bit-identical. The kernel is also the stateful core of the
+incremental engine (`incremental.IncrementalLSD`).
+"""
+
+import numpy as np
+
+from .rolling_rank import RollingPercentileRank
+
+
+class LSDKernel:
+    """Stateful fused scorer for aligned (SOPR, MVRV) pairs."""
+
+    def __init__(
+        self,
+        lookback_window: int = 365 * 2,
+        mvrv_weight: float = 0.6,
+        sopr_weight: float = 0.4,
+        capitulation_threshold: float = 0.95,
+        euphoria_threshold: float = 4.0,
+    ) -> None:
+        min_periods = max(1, lookback_window // 2)
+        self.mvrv_rank = RollingPercentileRank(lookback_window, min_periods)
+        self.sopr_rank = RollingPercentileRank(lookback_window, min_periods)
+        self.mvrv_weight = float(mvrv_weight)
+        self.sopr_weight = float(sopr_weight)
+        self.capitulation_threshold = float(capitulation_threshold)
+        self.euphoria_threshold = float(euphoria_threshold)
+
+    def step(self, sopr: float, mvrv: float) -> float:
+        """Push one aligned pair and return its unsmoothed, clipped score."""
+
+        score = (self.mvrv_rank.push(mvrv) * self.mvrv_weight) + (
+            self.sopr_rank.push(sopr) * self.sopr_weight
+        )
+        # Capitulation: SOPR below threshold → down-weight score
+        if sopr < self.capitulation_threshold:
+            score = score * 0.5
+        # Euphoria: MVRV above threshold → up-weight score
+        if mvrv > self.euphoria_threshold:
+            score = score * 1.2
+        if score != score:
+            return score
+        return min(max(score, 0.0), 100.0)
+
+    def run(self, sopr: np.ndarray, mvrv: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """Score aligned arrays in one pass, writing into ``out``."""
+
+        n = sopr.shape[0]
+        if mvrv.shape[0] != n:
+            raise ValueError("lth_sopr and lth_mvrv must have the same length")
+        if out is None:
+            out = np.empty(n, dtype="float64")
+
+        step = self.step
+        for i, (s, m) in enumerate(zip(sopr.tolist(), mvrv.tolist())):
+            out[i] = step(s, m)
+        return out
+
+
+__all__ = ["LSDKernel"]
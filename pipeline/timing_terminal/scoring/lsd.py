@@ -18,49 +18,63 @@ from typing import Iterable
 import numpy as np
 import pandas as pd
 
+from .kernel import LSDKernel
+from .rolling_rank import rolling_percentile_rank
+from .smoothing import EdgePolicy, SavitzkyGolaySmoother
 
-def _savitzky_golay_smooth(series: pd.Series, window: int = 21, poly_order: int = 3) -> pd.Series:
+
+def _savitzky_golay_smooth(
+    series: pd.Series,
+    window: int = 21,
+    poly_order: int = 3,
+    edge: EdgePolicy = "centred",
+) -> pd.Series:
     """Apply Savitzky-Golay filter for smoothing while preserving peaks/troughs.
 
-    This matches the `market_phase_savgol` smoothing from the research script.
+    This matches the `market_phase_savgol` smoothing from the research script
+    (``edge="centred"``); see `smoothing.SavitzkyGolaySmoother` for the
+    causal and mirror edge policies.
     """
-    from scipy.signal import savgol_filter
+    smoother = SavitzkyGolaySmoother(window, poly_order, edge=edge)
+    smoothed = smoother.smooth(series)
+    if smoothed is series:
+        # Not enough valid data to smooth
+        return series
 
-    # Ensure window is odd
-    if window % 2 == 0:
-        window += 1
+    # Clip again after smoothing to ensure 0-100 range
+    return smoothed.clip(0.0, 100.0)
 
-    # Need at least window length of data
-    if len(series) < window:
-        return series
 
-    # Handle NaN values
-    valid_mask = ~series.isna()
-    if valid_mask.sum() < window:
-        return series
+def _smooth_in_place(
+    values: np.ndarray,
+    window: int = 21,
+    poly_order: int = 3,
+    edge: EdgePolicy = "centred",
+) -> np.ndarray:
+    """Buffer-based `_savitzky_golay_smooth`: smooths and clips ``values`` in place."""
+    smoother = SavitzkyGolaySmoother(window, poly_order, edge=edge)
+    if values.shape[0] < smoother.window:
+        return values
 
-    smoothed = series.copy()
-    smoothed[valid_mask] = savgol_filter(series[valid_mask], window, poly_order)
+    valid_mask = ~np.isnan(values)
+    if valid_mask.sum() < smoother.window:
+        return values
 
-    # Clip again after smoothing to ensure 0-100 range
-    return smoothed.clip(0.0, 100.0)
+    values[valid_mask] = smoother.smooth_values(values[valid_mask])
+    return np.clip(values, 0.0, 100.0, out=values)
 
 
 def _percentile_rank(series: pd.Series, window: int) -> pd.Series:
     """Rolling percentile rank of the latest value within the window.
 
     Returns values in [0, 100]. Uses a minimum window of window//2 to
-    avoid excessive NaNs at the beginning of the series.
+    avoid excessive NaNs at the beginning of the series. Backed by the
+    sorted-window engine in `rolling_rank` (O(log w) search plus an O(w)
+    list shift per step).
     """
 
-    def rank_pct(x: pd.Series) -> float:
-        if len(x) < 2 or pd.isna(x.iloc[-1]):
-            return np.nan
-        return float((x < x.iloc[-1]).sum()) / float(len(x)) * 100.0
-
-    return series.rolling(window=window, min_periods=max(1, window // 2)).apply(
-        rank_pct, raw=False
-    )
+    ranks = rolling_percentile_rank(series.to_numpy(dtype="float64"), window, max(1, window // 2))
+    return pd.Series(ranks, index=series.index)
 
 
 def compute_lsd(
@@ -71,6 +85,7 @@ def compute_lsd(
     sopr_weight: float = 0.4,
     capitulation_threshold: float = 0.95,
     euphoria_threshold: float = 4.0,
+    edge: EdgePolicy = "centred",
 ) -> pd.Series:
     """Compute Long-Term Holder Supply Dynamics (LSD) as a 0-100 series.
 
@@ -82,37 +97,33 @@ def compute_lsd(
     - Applies multiplicative adjustments in capitulation (low SOPR) and
       euphoria (high MVRV) regimes.
     - Clips the final scores into [0, 100].
+    - Smooths with Savitzky-Golay. ``edge="centred"`` is the canonical
+      series; ``edge="causal"`` yields a non-revising series whose
+      published values never change as new points arrive.
     """
 
-    lth_sopr_s = pd.Series(lth_sopr).astype("float64")
-    lth_mvrv_s = pd.Series(lth_mvrv).astype("float64")
+    lth_sopr_s = pd.Series(lth_sopr)
+    lth_mvrv_s = pd.Series(lth_mvrv)
 
     # Align indexes if they come in as Series with existing indices
     if len(lth_sopr_s) != len(lth_mvrv_s):
         raise ValueError("lth_sopr and lth_mvrv must have the same length")
 
-    # Rolling percentile ranks
-    mvrv_pct = _percentile_rank(lth_mvrv_s, lookback_window)
-    sopr_pct = _percentile_rank(lth_sopr_s, lookback_window)
-
-    # Weighted combination
-    base_score = (mvrv_pct * float(mvrv_weight)) + (sopr_pct * float(sopr_weight))
-
-    # Apply multipliers for extreme conditions
-    score = base_score.copy()
-
-    # Capitulation: SOPR below threshold → down-weight score
-    capitulation_mask = lth_sopr_s < float(capitulation_threshold)
-    score[capitulation_mask] = score[capitulation_mask] * 0.5
-
-    # Euphoria: MVRV above threshold → up-weight score
-    euphoria_mask = lth_mvrv_s > float(euphoria_threshold)
-    score[euphoria_mask] = score[euphoria_mask] * 1.2
-
-    # Clip to [0, 100]
-    score = score.clip(0.0, 100.0)
+    # Fused kernel: both rolling ranks, weighting, regime multipliers and
+    # clipping in one pass, written into a single preallocated buffer.
+    kernel = LSDKernel(
+        lookback_window,
+        mvrv_weight=mvrv_weight,
+        sopr_weight=sopr_weight,
+        capitulation_threshold=capitulation_threshold,
+        euphoria_threshold=euphoria_threshold,
+    )
+    score = kernel.run(
+        lth_sopr_s.to_numpy(dtype="float64"),
+        lth_mvrv_s.to_numpy(dtype="float64"),
+    )
 
-    # Apply Savitzky-Golay smoothing (canonical series per Story 1.6 AC3)
-    score = _savitzky_golay_smooth(score, window=21, poly_order=3)
+    # Apply Savitzky-Golay smoothing in place (canonical series per Story 1.6 AC3)
+    _smooth_in_place(score, window=21, poly_order=3, edge=edge)
 
-    return score
+    return pd.Series(score, index=lth_sopr_s.index)
@@ -10,10 +10,93 @@ incorporate real LTH SOPR and MVRV metrics from external providers.
 
 from typing import List, Optional, Sequence
 
+import numpy as np
+
 from ..models import PhasePoint
 from . import ScoringConfig
 
 
+def compute_phase_score_array(
+    btc_prices: Sequence[float] | np.ndarray,
+    config: ScoringConfig,
+    lth_values: Optional[Sequence[float] | np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Array-in/array-out phase score computation (0-100).
+
+    Same formula as `compute_phase_score`, evaluated as whole-array
+    operations: momentum against the price `momentum_window` periods ago
+    (shorter for early points), clipped to +/- `max_price_change_pct`,
+    mapped to [0, 100], optionally blended with a min-max normalized LTH
+    component, and clamped.
+
+    Args:
+        btc_prices: BTC prices in time order
+        config: ScoringConfig with scoring parameters
+        lth_values: Optional LTH-derived metric values aligned with btc_prices
+
+    Returns:
+        float64 array of phase scores, one per input price
+
+    Raises:
+        ValueError: If lth_values length does not match btc_prices
+    """
+    prices = np.asarray(btc_prices, dtype="float64")
+    n = prices.shape[0]
+
+    if n == 0:
+        return np.empty(0, dtype="float64")
+
+    if lth_values is not None and len(lth_values) != n:
+        raise ValueError("lth_series length must match phase_points length")
+
+    if n == 1:
+        # Single point: default to neutral zone (mid-range score)
+        return np.array([50.0])
+
+    # Price `window` periods ago; early points use the first available price.
+    lookback_idx = np.maximum(np.arange(n) - config.momentum_window, 0)
+    historical = prices[lookback_idx]
+    zero_hist = historical == 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_change_pct = ((prices - historical) / historical) * 100
+
+    # Cap at max_price_change_pct and map [-max, +max] to [0, 100]. NaN
+    # momentum (NaN/inf prices) clamps to -max, as the scalar
+    # max(-cap, min(change, cap)) of the original loop did.
+    cap = config.max_price_change_pct
+    normalized_change = np.where(np.isnan(price_change_pct), -cap, np.clip(price_change_pct, -cap, cap))
+    scores = 50.0 + (normalized_change / cap) * 50.0
+
+    # Optionally blend in a clipped min-max normalized LTH component
+    if lth_values is not None and config.lth_weight > 0.0:
+        lth = np.asarray(lth_values, dtype="float64")
+        # Builtin min()/max() semantics: NaNs are skipped unless the series
+        # starts with one, in which case the bound itself is NaN.
+        if np.isnan(lth[0]):
+            lth_min = lth_max = lth[0]
+        else:
+            lth_min = np.nanmin(lth)
+            lth_max = np.nanmax(lth)
+        if lth_max == lth_min:
+            # Flat series: treat as neutral 50.0
+            lth_normalized = np.full(n, 50.0)
+        else:
+            with np.errstate(invalid="ignore"):
+                lth_score = 0.0 + (lth - lth_min) / (lth_max - lth_min) * 100.0
+            # NaN components clamp to 100.0, as max(0.0, min(100.0, nan)) did.
+            lth_normalized = np.where(np.isnan(lth_score), 100.0, np.clip(lth_score, 0.0, 100.0))
+        w = max(0.0, min(1.0, config.lth_weight))
+        scores = (1.0 - w) * scores + w * lth_normalized
+
+    scores = np.clip(scores, 0.0, 100.0)
+
+    # Avoid division by zero: zero historical price scores neutral
+    scores[zero_hist] = 50.0
+    return scores
+
+
 def compute_phase_score(
     phase_points: List[PhasePoint],
     config: ScoringConfig,
@@ -27,7 +110,8 @@ def compute_phase_score(
     - Price increasing strongly → higher score (approaching distribution)
     - Price flat or declining → lower score (approaching retention/accumulation)
     
-    The calculation is deterministic and bounded to [0.0, 100.0].
+    The calculation is deterministic and bounded to [0.0, 100.0]. This is a
+    thin wrapper over `compute_phase_score_array`.
     
     Args:
         phase_points: List of PhasePoint objects with timestamp and btc_price
@@ -41,73 +125,5 @@ def compute_phase_score(
         This MVP formula will be enhanced in Story 1.4 when real LTH metrics
         (SOPR, MVRV) become available from external data providers.
     """
-    if not phase_points:
-        return []
-
-    if lth_series is not None and len(lth_series) != len(phase_points):
-        raise ValueError("lth_series length must match phase_points length")
-    
-    if len(phase_points) == 1:
-        # Single point: default to neutral zone (mid-range score)
-        return [50.0]
-    
-    scores = []
-    window = config.momentum_window
-    
-    # Pre-compute simple LTH normalization if provided and enabled.
-    # We normalize LTH values to [0.0, 100.0] using a clipped min-max range.
-    lth_normalized: Optional[List[float]] = None
-    if lth_series is not None and config.lth_weight > 0.0:
-        # Avoid division-by-zero in normalization by using a small epsilon band.
-        lth_min = min(lth_series)
-        lth_max = max(lth_series)
-        if lth_max == lth_min:
-            # Flat series: treat as neutral 50.0
-            lth_normalized = [50.0 for _ in lth_series]
-        else:
-            span = lth_max - lth_min
-            lth_normalized = []
-            for v in lth_series:
-                ratio = (v - lth_min) / span
-                lth_score = 0.0 + ratio * 100.0
-                lth_score = max(0.0, min(100.0, lth_score))
-                lth_normalized.append(lth_score)
-
-    for i, point in enumerate(phase_points):
-        # Calculate momentum relative to window periods ago
-        # For early points with insufficient history, use shorter window
-        lookback_idx = max(0, i - window)
-        current_price = point.btc_price
-        historical_price = phase_points[lookback_idx].btc_price
-        
-        # Avoid division by zero
-        if historical_price == 0:
-            scores.append(50.0)
-            continue
-        
-        # Calculate percentage price change
-        price_change_pct = ((current_price - historical_price) / historical_price) * 100
-        
-        # Normalize to 0-100 range
-        # Positive momentum → higher score, negative → lower score
-        # Cap at max_price_change_pct to prevent extreme outliers
-        normalized_change = max(
-            -config.max_price_change_pct,
-            min(price_change_pct, config.max_price_change_pct)
-        )
-        
-        # Map [-max_price_change_pct, +max_price_change_pct] to [0, 100]
-        score = 50.0 + (normalized_change / config.max_price_change_pct) * 50.0
-
-        # Optionally blend in LTH-derived component
-        if lth_normalized is not None:
-            lth_component = lth_normalized[i]
-            w = max(0.0, min(1.0, config.lth_weight))
-            score = (1.0 - w) * score + w * lth_component
-        
-        # Ensure bounded [0.0, 100.0]
-        score = max(0.0, min(100.0, score))
-        
-        scores.append(score)
-    
-    return scores
+    prices = np.fromiter((p.btc_price for p in phase_points), dtype="float64", count=len(phase_points))
+    return compute_phase_score_array(prices, config, lth_values=lth_series).tolist()
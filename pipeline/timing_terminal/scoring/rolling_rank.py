@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+"""Rolling percentile-rank engine.
+
+The LSD score ranks the latest LTH SOPR/MVRV value against a trailing
+window (default two years). The original implementation used
+``Series.rolling(...).apply(rank_pct, raw=False)``, which builds a pandas
+Series per window and runs a Python callback per row (O(n·w)).
+
+This engine keeps a sorted copy of the non-NaN values inside the window and
+answers each "how many values are strictly below the latest one" query with
+a binary search, so each step costs O(log w) comparisons plus an O(w)
+memmove to insert/remove a value in the sorted list (a C-level shift that
+is cheap next to per-window pandas objects). Semantics match the
+pandas-based reference exactly:
+
+- The window holds the last ``window`` raw values, NaNs included, and its
+  length (not the non-NaN count) is the denominator.
+- A result is only produced once the window holds at least ``min_periods``
+  non-NaN values; otherwise the result is NaN.
+- Windows of fewer than two values, or whose latest value is NaN, yield NaN.
+- Only values strictly lower than the latest value count towards the rank.
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Iterable
+
+import numpy as np
+
+
+class RollingPercentileRank:
+    """Stateful rolling percentile rank over a fixed-size trailing window.
+
+    Values are pushed one at a time via :meth:`push`, which returns the
+    percentile rank (0-100) of the pushed value within the current window.
+    The state can be exported/restored with :meth:`window_values` and
+    :meth:`from_window_values`, which makes the engine usable for
+    incremental (append-only) computation across runs.
+    """
+
+    def __init__(self, window: int, min_periods: int | None = None) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        if min_periods is None:
+            min_periods = max(1, window // 2)
+
+        self.window = int(window)
+        self.min_periods = int(min_periods)
+        self._values: deque[float] = deque()
+        self._sorted: list[float] = []
+
+    @classmethod
+    def from_window_values(
+        cls,
+        values: Iterable[float],
+        window: int,
+        min_periods: int | None = None,
+    ) -> "RollingPercentileRank":
+        """Rebuild an engine whose window holds ``values`` (oldest first)."""
+
+        engine = cls(window, min_periods)
+        for value in list(values)[-engine.window :]:
+            engine._append(float(value))
+        return engine
+
+    def window_values(self) -> list[float]:
+        """Return the raw values currently in the window, oldest first."""
+
+        return list(self._values)
+
+    def _append(self, value: float) -> None:
+        if len(self._values) == self.window:
+            evicted = self._values.popleft()
+            if evicted == evicted:  # not NaN
+                del self._sorted[bisect_left(self._sorted, evicted)]
+        self._values.append(value)
+        if value == value:
+            insort(self._sorted, value)
+
+    def push(self, value: float) -> float:
+        """Append ``value`` to the window and return its percentile rank."""
+
+        value = float(value)
+        self._append(value)
+
+        if len(self._sorted) < self.min_periods:
+            return np.nan
+        if len(self._values) < 2 or value != value:
+            return np.nan
+        return float(bisect_left(self._sorted, value)) / float(len(self._values)) * 100.0
+
+
+def rolling_percentile_rank(
+    values: Iterable[float] | np.ndarray,
+    window: int,
+    min_periods: int | None = None,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Rolling percentile rank (0-100) of each value within its trailing window.
+
+    Equivalent to the pandas reference
+    ``series.rolling(window, min_periods).apply(rank_pct, raw=False)`` but
+    O(n log w) comparisons plus an O(w) list shift per step, instead of a
+    pandas Series and Python callback per row. ``min_periods`` defaults to
+    ``max(1, window // 2)``.
+    """
+
+    arr = np.asarray(values, dtype="float64")
+    if out is None:
+        out = np.empty(arr.shape[0], dtype="float64")
+
+    engine = RollingPercentileRank(window, min_periods)
+    push = engine.push
+    for i, value in enumerate(arr.tolist()):
+        out[i] = push(value)
+    return out
+
+
+__all__ = ["RollingPercentileRank", "rolling_percentile_rank"]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+"""Savitzky-Golay smoothing engine with explicit edge policies.
+
+The canonical LSD series is smoothed with a centred Savitzky-Golay filter,
+which means the last ``window // 2`` published values are revised whenever
+new points arrive. `SavitzkyGolaySmoother` precomputes the filter
+coefficients once and supports three edge policies:
+
+- ``"centred"``: symmetric window in the interior; the first/last
+  ``window // 2`` values evaluate the polynomial fitted to the first/last
+  full window. Interior values are identical to
+  ``scipy.signal.savgol_filter(mode="interp")``; the edges use precomputed
+  dot-product coefficients instead of a per-call ``polyfit`` and agree to
+  within ~1e-10 on 0-100 scores.
+- ``"causal"``: each value is the endpoint of the polynomial fitted to the
+  trailing window, so published values never change once computed. The
+  first ``window - 1`` values are passed through unsmoothed.
+- ``"mirror"``: symmetric window with mirrored padding at both ends
+  (``savgol_filter(mode="mirror")``).
+
+`smooth_tail` recomputes only the trailing window when new points arrive,
+which is what the incremental LSD engine uses.
+"""
+
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+from scipy.ndimage import convolve1d
+from scipy.signal import savgol_coeffs
+
+EdgePolicy = Literal["centred", "causal", "mirror"]
+EDGE_POLICIES: tuple[EdgePolicy, ...] = ("centred", "causal", "mirror")
+
+
+class SavitzkyGolaySmoother:
+    """Savitzky-Golay filter with precomputed coefficients."""
+
+    def __init__(self, window: int = 21, poly_order: int = 3, edge: EdgePolicy = "centred") -> None:
+        if edge not in EDGE_POLICIES:
+            raise ValueError(f"edge must be one of {EDGE_POLICIES}, got {edge!r}")
+        # Ensure window is odd
+        if window % 2 == 0:
+            window += 1
+
+        self.window = int(window)
+        self.poly_order = int(poly_order)
+        self.edge: EdgePolicy = edge
+        self.half = self.window // 2
+
+        # Centred convolution kernel (same as savgol_filter uses internally).
+        self._conv = savgol_coeffs(self.window, self.poly_order)
+        # Row p evaluates the polynomial fitted to a full window at position p.
+        self._dot = np.vstack(
+            [savgol_coeffs(self.window, self.poly_order, pos=p, use="dot") for p in range(self.window)]
+        )
+
+    @property
+    def revision_depth(self) -> int:
+        """How many trailing outputs change when a new point is appended."""
+
+        return 0 if self.edge == "causal" else self.half
+
+    def smooth_values(self, values: np.ndarray) -> np.ndarray:
+        """Smooth NaN-free values along the last axis (length >= window)."""
+
+        x = np.asarray(values, dtype="float64")
+        n = x.shape[-1]
+        if n < self.window:
+            raise ValueError("need at least `window` values to smooth")
+
+        w, h = self.window, self.half
+        if self.edge == "mirror":
+            return convolve1d(x, self._conv, axis=-1, mode="mirror")
+
+        if self.edge == "centred":
+            y = convolve1d(x, self._conv, axis=-1, mode="constant")
+            if h:
+                y[..., :h] = x[..., :w] @ self._dot[:h].T
+                y[..., n - h :] = x[..., n - w :] @ self._dot[w - h :].T
+            return y
+
+        # causal
+        y = x.copy()
+        windows = np.lib.stride_tricks.sliding_window_view(x, w, axis=-1)
+        y[..., w - 1 :] = windows @ self._dot[w - 1]
+        return y
+
+    def smooth(self, series: pd.Series) -> pd.Series:
+        """Smooth the non-NaN values of ``series``, leaving NaNs in place.
+
+        Series with fewer than ``window`` valid values are returned as-is.
+        """
+
+        if len(series) < self.window:
+            return series
+
+        valid_mask = ~series.isna()
+        if valid_mask.sum() < self.window:
+            return series
+
+        smoothed = series.copy()
+        smoothed[valid_mask] = self.smooth_values(series[valid_mask].to_numpy(dtype="float64"))
+        return smoothed
+
+    def smooth_tail(self, tail: np.ndarray, new: np.ndarray) -> np.ndarray:
+        """Smooth appended values given the preceding ``window - 1`` values.
+
+        Returns ``revision_depth + len(new)`` values: the revised trailing
+        outputs of the existing series followed by the outputs for ``new``.
+        They equal the last values of `smooth_values` over the full series.
+        """
+
+        tail = np.asarray(tail, dtype="float64")
+        if tail.shape[-1] != self.window - 1:
+            raise ValueError("tail must hold exactly `window - 1` values")
+        segment = np.concatenate([tail, np.asarray(new, dtype="float64")], axis=-1)
+        return self.smooth_values(segment)[..., tail.shape[-1] - self.revision_depth :]
+
+
+__all__ = ["EDGE_POLICIES", "EdgePolicy", "SavitzkyGolaySmoother"]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+"""Vectorized parameter-grid sweep for LSD calibration.
+
+Calibrating `compute_lsd` one parameter combination at a time repeats the
+expensive rolling percentile ranks for every combination. The ranks only
+depend on `lookback_window`, so `sweep_lsd` computes them once per lookback
+and evaluates the weight/threshold grid as broadcast NumPy operations.
+
+Each row of the result equals the corresponding `compute_lsd` call: the
+weighting, multipliers and clipping use the same elementwise float64
+operations, and smoothing uses the same Savitzky-Golay engine (applied
+along the time axis of the whole block).
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rolling_rank import rolling_percentile_rank
+from .smoothing import SavitzkyGolaySmoother
+
+PARAM_COLUMNS = [
+    "lookback_window",
+    "mvrv_weight",
+    "sopr_weight",
+    "capitulation_threshold",
+    "euphoria_threshold",
+]
+
+
+@dataclass
+class LSDSweepResult:
+    """LSD scores for every parameter combination of a sweep.
+
+    Attributes:
+        params: One row per combination (columns: `PARAM_COLUMNS`).
+        scores: Array of shape (len(params), len(index)); row i is the LSD
+            series for ``params.iloc[i]``.
+        index: Time index shared by all rows.
+    """
+
+    params: pd.DataFrame
+    scores: np.ndarray
+    index: pd.Index
+
+    def series(self, row: int) -> pd.Series:
+        """Return row ``row`` as a Series aligned to :attr:`index`."""
+
+        return pd.Series(self.scores[row], index=self.index)
+
+
+def _smooth_block(block: np.ndarray, window: int = 21, poly_order: int = 3) -> np.ndarray:
+    """Row-wise equivalent of `lsd._savitzky_golay_smooth` for a 2-D block."""
+
+    valid = ~np.isnan(block)
+    # NaNs come from the rank warm-up, which is shared by every row of a
+    # lookback block; fall back to per-row smoothing if that ever differs.
+    if not (valid == valid[:1]).all():
+        return np.vstack([_smooth_block(row[None, :], window, poly_order) for row in block])
+
+    mask = valid[0]
+    if mask.sum() < window:
+        return block
+    block[:, mask] = SavitzkyGolaySmoother(window, poly_order).smooth_values(block[:, mask])
+    return np.clip(block, 0.0, 100.0, out=block)
+
+
+def sweep_lsd(
+    lth_sopr: Iterable[float] | pd.Series,
+    lth_mvrv: Iterable[float] | pd.Series,
+    lookback_windows: Sequence[int] = (365 * 2,),
+    weights: Sequence[tuple[float, float]] = ((0.6, 0.4),),
+    capitulation_thresholds: Sequence[float] = (0.95,),
+    euphoria_thresholds: Sequence[float] = (4.0,),
+    *,
+    smooth: bool = True,
+    dtype: str = "float64",
+) -> LSDSweepResult:
+    """Evaluate LSD over the full parameter grid.
+
+    Args:
+        lth_sopr: LTH SOPR series (aligned with `lth_mvrv`).
+        lth_mvrv: LTH MVRV series.
+        lookback_windows: Rolling-rank lookbacks to evaluate.
+        weights: ``(mvrv_weight, sopr_weight)`` pairs.
+        capitulation_thresholds: SOPR thresholds for the 0.5 multiplier.
+        euphoria_thresholds: MVRV thresholds for the 1.2 multiplier.
+        smooth: Apply the canonical Savitzky-Golay smoothing (as
+            `compute_lsd` does).
+        dtype: dtype of the returned score matrix; ``"float32"`` halves
+            memory for very large grids.
+
+    Returns:
+        LSDSweepResult with rows ordered as the Cartesian product of
+        lookback × weights × capitulation × euphoria.
+    """
+
+    sopr_s = pd.Series(lth_sopr).astype("float64")
+    mvrv_s = pd.Series(lth_mvrv).astype("float64")
+    if len(sopr_s) != len(mvrv_s):
+        raise ValueError("lth_sopr and lth_mvrv must have the same length")
+
+    sopr = sopr_s.to_numpy()
+    mvrv = mvrv_s.to_numpy()
+
+    w = np.asarray(weights, dtype="float64").reshape(-1, 2)
+    cap = np.asarray(capitulation_thresholds, dtype="float64")
+    eup = np.asarray(euphoria_thresholds, dtype="float64")
+
+    # Multipliers are exactly 1.0 outside their regime, so x * 1.0 == x and
+    # the result matches compute_lsd's masked in-place multiplication.
+    cap_mult = np.where(sopr[None, :] < cap[:, None], 0.5, 1.0)  # (C, T)
+    eup_mult = np.where(mvrv[None, :] > eup[:, None], 1.2, 1.0)  # (E, T)
+
+    n_combos = len(w) * len(cap) * len(eup)
+    scores = np.empty((len(lookback_windows) * n_combos, len(sopr)), dtype=dtype)
+
+    for block_idx, lookback in enumerate(lookback_windows):
+        min_periods = max(1, int(lookback) // 2)
+        mvrv_pct = rolling_percentile_rank(mvrv, int(lookback), min_periods)
+        sopr_pct = rolling_percentile_rank(sopr, int(lookback), min_periods)
+
+        base = (mvrv_pct[None, :] * w[:, 0:1]) + (sopr_pct[None, :] * w[:, 1:2])  # (W, T)
+        block = base[:, None, None, :] * cap_mult[None, :, None, :]
+        block = block * eup_mult[None, None, :, :]
+        block = np.clip(block, 0.0, 100.0).reshape(n_combos, len(sopr))
+
+        if smooth:
+            block = _smooth_block(block)
+
+        scores[block_idx * n_combos : (block_idx + 1) * n_combos] = block
+
+    params = pd.DataFrame(
+        [
+            (int(lb), float(mw), float(sw), float(c), float(e))
+            for lb, (mw, sw), c, e in product(lookback_windows, w.tolist(), cap.tolist(), eup.tolist())
+        ],
+        columns=PARAM_COLUMNS,
+    )
+    return LSDSweepResult(params=params, scores=scores, index=sopr_s.index)
+
+
+__all__ = ["LSDSweepResult", "PARAM_COLUMNS", "sweep_lsd"]
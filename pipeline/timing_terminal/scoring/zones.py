@@ -9,9 +9,11 @@ This module maps phase scores (0-100) to decision-making zones:
 The <20 and >80 zones are decision-critical and trigger enhanced monitoring.
 """
 
-from typing import List
+from typing import List, Sequence
 
-from ..models import PhasePoint, Zone
+import numpy as np
+
+from ..models import ZONE_CODES, PhaseFrame, PhasePoint, Zone
 from . import ScoringConfig
 
 
@@ -83,3 +85,59 @@ def enrich_phase_points_with_zones(
         )
     
     return enriched
+
+
+def classify_zone_codes(
+    phase_scores: Sequence[float] | np.ndarray,
+    config: ScoringConfig
+) -> np.ndarray:
+    """
+    Vectorized `classify_zone` returning int8 zone codes (see `ZONE_CODES`).
+    
+    Args:
+        phase_scores: Array of scores in range [0.0, 100.0]
+        config: ScoringConfig with zone boundary thresholds
+        
+    Returns:
+        int8 array of zone codes, one per score
+    """
+    scores = np.asarray(phase_scores, dtype="float64")
+    codes = np.full(scores.shape, ZONE_CODES["neutral"], dtype="int8")
+    # Assign distribution first so retention wins on overlapping thresholds,
+    # matching the if/elif order in classify_zone.
+    codes[scores > config.distribution_threshold] = ZONE_CODES["distribution"]
+    codes[scores < config.retention_threshold] = ZONE_CODES["retention"]
+    return codes
+
+
+def enrich_phase_frame_with_zones(
+    frame: PhaseFrame,
+    phase_scores: Sequence[float] | np.ndarray,
+    config: ScoringConfig
+) -> PhaseFrame:
+    """
+    Columnar counterpart of `enrich_phase_points_with_zones`.
+    
+    Args:
+        frame: PhaseFrame with timestamp and btc_price columns
+        phase_scores: Computed phase scores (same length as frame)
+        config: ScoringConfig for zone classification
+        
+    Returns:
+        New PhaseFrame with phase_score and zone_code populated
+        
+    Raises:
+        ValueError: If frame and phase_scores have different lengths
+    """
+    scores = np.asarray(phase_scores, dtype="float64")
+    if len(frame) != scores.shape[0]:
+        raise ValueError(
+            f"Mismatch: {len(frame)} phase_points but {scores.shape[0]} scores"
+        )
+    
+    return PhaseFrame(
+        timestamp=frame.timestamp,
+        btc_price=frame.btc_price,
+        phase_score=scores,
+        zone_code=classify_zone_codes(scores, config),
+    )